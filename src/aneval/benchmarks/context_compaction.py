@@ -0,0 +1,123 @@
+"""Compare full-article and compacted (BM25, token-budgeted) contexts for the judge and Geval.
+
+    python -m aneval.benchmarks.context_compaction --articles 10 --budget 400
+    python -m aneval.benchmarks.context_compaction --articles 10 --budget 400 --live   # real API calls
+
+Reports prompt tokens and latency for both modes, plus how closely the compacted run agrees with the
+full one: Geval rank agreement and token-F1 between judge answers. The fake Geval grader ranks a summary
+by the share of its words found in the document it is shown, so rank agreement drops when compaction
+hides what the summary talks about. The fake judge answers the same thing whatever the context: answer
+F1 is only meaningful with `--live`.
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+from collections import Counter
+from aneval.benchmarks.judge_batching import DEFAULT_QUESTIONS, fake_judge_reply
+from aneval.llms.cache import ResponseCache
+from aneval.llms.fake import FakeAsyncOpenAI, FakeGenerativeModel
+from aneval.llms.gemini import GeminiLLM
+from aneval.llms.gpt5o import GPT5oLLM
+from aneval.llms.telemetry import collect_calls, telemetry_disabled
+from aneval.prompts.judge import LLM_JUDGE_COMPARE_PROMPT, LLM_JUDGE_PROMPT
+from aneval.services.geval_service import run_geval_parallel
+from aneval.services.judge_service import JudgeStats, run_llm_judge
+from aneval.services.news_service import iter_summarized_articles
+from aneval.services.retrieval import tokenize
+
+GEVAL_PROMPT_RE = re.compile(r"Source Text:\s*(.*?)\s*Summary:\s*(.*?)\s*Evaluation Form", re.DOTALL)
+
+def token_f1(a: str, b: str) -> float:
+    a_tokens, b_tokens = Counter(tokenize(a)), Counter(tokenize(b))
+    overlap = sum((a_tokens & b_tokens).values())
+    if not overlap:
+        return float(a_tokens == b_tokens)
+    precision, recall = overlap / sum(a_tokens.values()), overlap / sum(b_tokens.values())
+    return 2 * precision * recall / (precision + recall)
+
+def fake_geval_rank(prompt: str) -> int:
+    """1-5 by the share of the summary's words that appear in the document the grader was shown."""
+    match = GEVAL_PROMPT_RE.search(prompt)
+    if match is None:
+        return 3
+    document, summary = set(tokenize(match.group(1))), set(tokenize(match.group(2)))
+    coverage = len(summary & document) / len(summary) if summary else 1.0
+    return 1 + round(4 * coverage)
+
+def fake_clients(latency, token_latency):
+    gemini = GeminiLLM(api_key="fake", model_name="fake-gemini", temperature=0.0, cache=ResponseCache(bypass=True),
+                       model=FakeGenerativeModel(latency, responder=fake_judge_reply, token_latency=token_latency))
+    gpt = GPT5oLLM(api_key="fake", model_name="fake-gpt", cache=ResponseCache(bypass=True),
+                   client=FakeAsyncOpenAI(latency, token_latency=token_latency, ranker=fake_geval_rank))
+    return gemini, gpt
+
+async def run_mode(gemini, gpt, articles, questions, batched, context_budget):
+    stats = JudgeStats()
+    judge, geval = [], []
+    start = time.perf_counter()
+    with collect_calls() as calls:
+        for article in articles:
+            summary_answers, article_answers, compare = await run_llm_judge(
+                gemini, article.summary, article.full_text, questions, LLM_JUDGE_PROMPT, LLM_JUDGE_COMPARE_PROMPT,
+                batched=batched, stats=stats, context_budget=context_budget,
+            )
+            judge.append(summary_answers + article_answers + [compare])
+        judge_seconds = time.perf_counter() - start
+        for article in articles:
+            ranks = await run_geval_parallel(gpt, article.full_text, article.summary, context_budget)
+            geval.append({metric: r.rank for metric, r in ranks.items()})
+    geval_calls = [c for c in calls if c.operation == "geval-metric"]
+    return {
+        "judge_prompt_tokens": stats.prompt_tokens,
+        "judge_seconds": judge_seconds,
+        "geval_input_tokens": sum(c.input_tokens or 0 for c in geval_calls),
+        "geval_seconds": time.perf_counter() - start - judge_seconds,
+    }, judge, geval
+
+def run(input_path, n_articles, context_budget, latency, token_latency, batched=True, live=False,
+        questions=DEFAULT_QUESTIONS):
+    articles = [a for _, a in zip(range(n_articles), iter_summarized_articles(input_path, unique=True))]
+    if live:
+        from aneval.llms.registry import get_llm_registry
+        registry = get_llm_registry()
+        gemini, gpt, runner = registry.gemini(), registry.openai(), registry.run
+    else:
+        gemini, gpt = fake_clients(latency, token_latency)
+        def runner(coro):
+            # Fake-backend calls stay out of the production telemetry sink
+            with telemetry_disabled():
+                return asyncio.run(coro)
+    full, full_judge, full_geval = runner(run_mode(gemini, gpt, articles, questions, batched, None))
+    compact, compact_judge, compact_geval = runner(run_mode(gemini, gpt, articles, questions, batched, context_budget))
+
+    rank_pairs = [(f[m], c[m]) for f, c in zip(full_geval, compact_geval) for m in f]
+    f1s = [token_f1(a, b) for f, c in zip(full_judge, compact_judge) for a, b in zip(f, c)]
+    saved = lambda key: 1 - compact[key] / full[key] if full[key] else 0.0
+    return {
+        "articles": len(articles),
+        "context_budget": context_budget,
+        "full": full,
+        "compact": compact,
+        "judge_prompt_tokens_saved": saved("judge_prompt_tokens"),
+        "judge_latency_saved": saved("judge_seconds"),
+        "geval_input_tokens_saved": saved("geval_input_tokens"),
+        "geval_latency_saved": saved("geval_seconds"),
+        "geval_rank_exact_agreement": sum(a == b for a, b in rank_pairs) / len(rank_pairs) if rank_pairs else 0.0,
+        "geval_rank_mean_abs_diff": sum(abs(a - b) for a, b in rank_pairs) / len(rank_pairs) if rank_pairs else 0.0,
+        "judge_answer_token_f1": sum(f1s) / len(f1s) if f1s else 0.0,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default="stock_news_summarized.json")
+    parser.add_argument("--articles", type=int, default=10)
+    parser.add_argument("--budget", type=int, default=400, help="Token budget for compacted contexts.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fixed seconds per fake call.")
+    parser.add_argument("--token-latency", type=float, default=0.2, help="Fake seconds per 1k prompt tokens.")
+    parser.add_argument("--per-question", dest="batched", action="store_false", help="Per-question judge calls.")
+    parser.add_argument("--live", action="store_true", help="Use the real Gemini and GPT-5 clients (costs money).")
+    args = parser.parse_args()
+    print(json.dumps(run(args.input, args.articles, args.budget, args.latency, args.token_latency, args.batched,
+                         args.live), indent=2))
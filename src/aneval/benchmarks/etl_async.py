@@ -0,0 +1,58 @@
+"""Compare sequential and async ETL throughput against a fake Gemini backend.
+
+    python -m aneval.benchmarks.etl_async --latency 0.2 --concurrency 16
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from aneval.etl import news_summarizer_etl as etl
+from aneval.llms.cache import ResponseCache
+from aneval.llms.fake import FakeGenerativeModel
+from aneval.llms.gemini import GeminiLLM
+from aneval.llms.telemetry import telemetry_disabled
+from aneval.services.store import EvalStore
+
+def fake_llm(latency):
+    return GeminiLLM(api_key="fake", model_name="fake-gemini", temperature=0.0,
+                     model=FakeGenerativeModel(latency), cache=ResponseCache(bypass=True))
+
+def run(input_path, latency, concurrency, rpm=0):
+    with tempfile.TemporaryDirectory() as tmp, telemetry_disabled():
+        start = time.perf_counter()
+        sync_results = etl.run_etl(llm=fake_llm(latency), input_path=input_path, output_path=Path(tmp) / "sync.json",
+                                   store=EvalStore(Path(tmp) / "sync.sqlite"))
+        sync_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        async_results = asyncio.run(etl.run_etl_async(
+            llm=fake_llm(latency), input_path=input_path, output_path=Path(tmp) / "async.json",
+            concurrency=concurrency, rpm=rpm, store=EvalStore(Path(tmp) / "async.sqlite"),
+        ))
+        async_elapsed = time.perf_counter() - start
+
+    assert [r["link"] for r in sync_results] == [r["link"] for r in async_results]
+    n = len(sync_results)
+    return {
+        "articles": n,
+        "sync_seconds": sync_elapsed,
+        "async_seconds": async_elapsed,
+        "sync_articles_per_second": n / sync_elapsed,
+        "async_articles_per_second": n / async_elapsed,
+        "speedup": sync_elapsed / async_elapsed,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default=str(etl.INPUT_PATH))
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds the fake backend sleeps per call.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rpm", type=float, default=0)
+    args = parser.parse_args()
+    report = run(args.input, args.latency, args.concurrency, args.rpm)
+    print(
+        f"\n{report['articles']} articles | sequential: {report['sync_seconds']:.2f}s "
+        f"({report['sync_articles_per_second']:.1f}/s) | async: {report['async_seconds']:.2f}s "
+        f"({report['async_articles_per_second']:.1f}/s) | speedup x{report['speedup']:.1f}"
+    )
@@ -0,0 +1,70 @@
+"""Sampled Geval: adaptive early stopping vs a fixed number of samples per metric, on a fake grader.
+
+    python -m aneval.benchmarks.geval_sampling --articles 10 --samples 20 --spread 0.8
+
+The fake grader draws each rank around a true score per article and metric (normal with `--spread`,
+rounded to 1-5). Both modes score the same prompts. The report gives GPT-5 calls and time per mode, how
+far the adaptive means are from the fixed-N means, how often the adaptive 95% interval covers the true
+score, and how often the adaptive mean is within the tolerance of it.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import numpy as np
+from aneval.llms.cache import ResponseCache
+from aneval.llms.fake import FakeAsyncOpenAI
+from aneval.llms.gpt5o import GPT5oLLM
+from aneval.llms.telemetry import telemetry_disabled
+from aneval.services.geval_service import GEVAL_METRICS, GEVAL_TOLERANCE, sample_geval_metric
+
+async def score_all(graders, samples, **sampling):
+    start = time.perf_counter()
+    estimates = await asyncio.gather(*(sample_geval_metric(llm, f"prompt {i}", max_samples=samples, **sampling)
+                                       for i, llm in enumerate(graders)))
+    return estimates, time.perf_counter() - start
+
+def run(n_articles=10, samples=20, spread=0.8, latency=0.2, tolerance=None, seed=7):
+    tolerance = GEVAL_TOLERANCE if tolerance is None else tolerance
+    rng = random.Random(seed)
+    truths = [rng.uniform(1.5, 4.5) for _ in range(n_articles * len(GEVAL_METRICS))]
+    def graders():
+        # One fake backend per (article, metric), so each has its own true score
+        return [GPT5oLLM(api_key="fake", model_name="fake-gpt", cache=ResponseCache(bypass=True),
+                         client=FakeAsyncOpenAI(latency, rank=truth, rank_spread=spread, seed=seed + i))
+                for i, truth in enumerate(truths)]
+    with telemetry_disabled():
+        fixed, fixed_seconds = asyncio.run(score_all(graders(), samples, min_samples=samples, tolerance=0.0))
+        adaptive, adaptive_seconds = asyncio.run(score_all(graders(), samples, tolerance=tolerance))
+
+    # The true score is what the rounded, clipped draws average to, not the unrounded center
+    draws = np.clip(np.rint(np.random.default_rng(seed).normal(truths, spread, (20000, len(truths)))), 1, 5)
+    expected = draws.mean(axis=0)
+    fixed_calls = sum(e.samples for e in fixed)
+    adaptive_calls = sum(e.samples for e in adaptive)
+    differences = np.abs([a.mean - f.mean for a, f in zip(adaptive, fixed)])
+    errors = np.abs([a.mean - t for a, t in zip(adaptive, expected)])
+    covered = [a.mean - a.half_width <= t <= a.mean + a.half_width for a, t in zip(adaptive, expected)]
+    return {
+        "metric_scores": len(truths),
+        "max_samples": samples,
+        "fixed": {"calls": fixed_calls, "seconds": fixed_seconds},
+        "adaptive": {"calls": adaptive_calls, "seconds": adaptive_seconds,
+                     "samples_min": min(e.samples for e in adaptive), "samples_max": max(e.samples for e in adaptive)},
+        "calls_saved": 1 - adaptive_calls / fixed_calls,
+        "mean_abs_difference": float(differences.mean()),
+        "max_abs_difference": float(differences.max()),
+        "interval_coverage": float(np.mean(covered)),
+        "within_tolerance": float(np.mean(errors <= tolerance)),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=20, help="Fixed-N baseline and adaptive maximum.")
+    parser.add_argument("--spread", type=float, default=0.8, help="Standard deviation of the fake grader's ranks.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per fake GPT-5 call.")
+    parser.add_argument("--tolerance", type=float, default=None, help="Default: GEVAL_TOLERANCE.")
+    args = parser.parse_args()
+    print(json.dumps(run(args.articles, args.samples, args.spread, args.latency, args.tolerance), indent=2))
@@ -0,0 +1,48 @@
+"""News ingestion against a local stand-in news server: cold, unchanged and incremental runs.
+
+    python -m aneval.benchmarks.ingest --tickers 7 --items 20 --latency 0.2 --concurrency 8
+
+A cold run is timed one request at a time and with `--concurrency` requests in flight. Then the concurrent
+run's state is reused twice: once with no new items (every feed should answer 304 and no page be
+downloaded) and once after `--new` items were published per ticker (only those should be downloaded).
+"""
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from aneval.services.fake_news_server import FakeNewsServer
+from aneval.services.news_ingest import IngestState, ingest
+
+COUNTERS = ("requests", "not_modified", "pages", "bytes_sent")
+
+def counted_run(server, tickers, dataset_path, state_path, concurrency):
+    before = {name: getattr(server, name) for name in COUNTERS}
+    report = ingest(tickers, dataset_path, state=IngestState(state_path), feed_url=server.feed_url,
+                    concurrency=concurrency, max_per_ticker=0)
+    result = {name: getattr(server, name) - before[name] for name in COUNTERS}
+    result.update(seconds=report.seconds, added=report.added, failed=report.failed)
+    return result
+
+def run(n_tickers=7, items=20, latency=0.2, concurrency=8, new=2):
+    tickers = [f"T{i:02d}" for i in range(n_tickers)]
+    with tempfile.TemporaryDirectory() as tmp, FakeNewsServer(tickers, items=items, latency=latency) as server:
+        tmp = Path(tmp)
+        report = {"sequential": counted_run(server, tickers, tmp / "seq.json", tmp / "seq.sqlite", 1)}
+        report["concurrent"] = counted_run(server, tickers, tmp / "news.json", tmp / "state.sqlite", concurrency)
+        report["unchanged"] = counted_run(server, tickers, tmp / "news.json", tmp / "state.sqlite", concurrency)
+        for ticker in tickers:
+            server.publish(ticker, new)
+        report["incremental"] = counted_run(server, tickers, tmp / "news.json", tmp / "state.sqlite", concurrency)
+        report["articles"] = sum(len(v) for v in json.loads((tmp / "news.json").read_text()).values())
+    report["speedup"] = report["sequential"]["seconds"] / report["concurrent"]["seconds"]
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=7)
+    parser.add_argument("--items", type=int, default=20, help="Items per ticker feed at the start.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds the server takes per article page.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--new", type=int, default=2, help="Items published per ticker before the incremental run.")
+    args = parser.parse_args()
+    print(json.dumps(run(args.tickers, args.items, args.latency, args.concurrency, args.new), indent=2))
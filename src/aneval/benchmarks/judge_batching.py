@@ -0,0 +1,51 @@
+"""Compare per-question and batched LLM-as-a-Judge calls against a fake Gemini backend.
+
+    python -m aneval.benchmarks.judge_batching --articles 10 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import re
+from aneval.llms.cache import ResponseCache
+from aneval.llms.fake import FakeGenerativeModel
+from aneval.llms.gemini import GeminiLLM
+from aneval.llms.telemetry import telemetry_disabled
+from aneval.prompts.judge import LLM_JUDGE_COMPARE_PROMPT, LLM_JUDGE_DEFAULT_QUESTIONS, LLM_JUDGE_PROMPT
+from aneval.services.judge_service import JudgeStats, compare_judge_modes, run_llm_judge
+from aneval.services.news_service import iter_summarized_articles
+
+DEFAULT_QUESTIONS = LLM_JUDGE_DEFAULT_QUESTIONS
+
+def fake_judge_reply(prompt, generation_config):
+    if generation_config.get("response_mime_type") == "application/json":
+        count = len(re.findall(r"^\d+\. ", prompt.split("Questions:")[-1], flags=re.MULTILINE))
+        return json.dumps({"answers": [f"Fake answer {i + 1}." for i in range(count)]})
+    return "Fake answer."
+
+def fake_llm(latency):
+    return GeminiLLM(api_key="fake", model_name="fake-gemini", temperature=0.0,
+                     model=FakeGenerativeModel(latency, responder=fake_judge_reply),
+                     cache=ResponseCache(bypass=True))
+
+async def run_mode(llm, articles, questions, batched):
+    stats = JudgeStats()
+    for article in articles:
+        await run_llm_judge(llm, article.summary, article.full_text, questions, LLM_JUDGE_PROMPT,
+                            LLM_JUDGE_COMPARE_PROMPT, batched=batched, stats=stats)
+    return stats
+
+def run(input_path, n_articles, latency, questions=DEFAULT_QUESTIONS):
+    articles = [a for _, a in zip(range(n_articles), iter_summarized_articles(input_path))]
+    with telemetry_disabled():
+        per_question = asyncio.run(run_mode(fake_llm(latency), articles, questions, batched=False))
+        batched = asyncio.run(run_mode(fake_llm(latency), articles, questions, batched=True))
+    return compare_judge_modes(per_question, batched)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default="stock_news_summarized.json")
+    parser.add_argument("--articles", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds the fake backend sleeps per call.")
+    args = parser.parse_args()
+    report = run(args.input, args.articles, args.latency)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,106 @@
+"""Compare the judge's final step in its two modes: LLM comparison vs embedding similarity of the answers.
+
+    python -m aneval.benchmarks.judge_compare --articles 10
+    python -m aneval.benchmarks.judge_compare --articles 10 --live   # real Gemini and Voyage calls
+
+The answers are computed once per article and shared by both modes, so only the comparison differs.
+Reports its calls, tokens, cost and latency per mode. With `--live` it also reports how well the
+embedding scores track the LLM's 1-5 scores (Pearson correlation); offline, both sides' fake answers
+are identical and the scores say nothing.
+"""
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+from aneval.benchmarks.judge_batching import DEFAULT_QUESTIONS, fake_judge_reply
+from aneval.llms.cache import ResponseCache
+from aneval.llms.embedding_cache import EmbeddingCache
+from aneval.llms.fake import FakeGenerativeModel, FakeVoyageClient
+from aneval.llms.gemini import GeminiLLM
+from aneval.llms.telemetry import collect_calls, telemetry_disabled
+from aneval.llms.voyage import VoyageEmbedder
+from aneval.prompts.judge import LLM_JUDGE_COMPARE_PROMPT, LLM_JUDGE_PROMPT
+from aneval.services.judge_service import (
+    compare_answers_embedding,
+    evaluate_summary_vs_article_async,
+    parse_compare_scores,
+    run_llm_judge_batched,
+)
+from aneval.services.news_service import iter_summarized_articles
+
+def fake_clients(latency, embed_latency):
+    gemini = GeminiLLM(api_key="fake", model_name="fake-gemini", temperature=0.0, cache=ResponseCache(bypass=True),
+                       model=FakeGenerativeModel(latency, responder=fake_judge_reply))
+    embedder = VoyageEmbedder(model_name="fake-voyage", client=FakeVoyageClient(embed_latency),
+                              cache=EmbeddingCache(bypass=True))
+    return gemini, embedder
+
+def mode_totals(calls, seconds):
+    return {
+        "calls": len(calls),
+        "input_tokens": sum(c.input_tokens or 0 for c in calls),
+        "output_tokens": sum(c.output_tokens or 0 for c in calls),
+        "cost_usd": sum(c.cost_usd or 0.0 for c in calls),
+        "seconds": seconds,
+    }
+
+def correlation(a, b):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    if len(a) < 3 or a.std() == 0 or b.std() == 0:
+        return None
+    return float(np.corrcoef(a, b)[0, 1])
+
+async def run_modes(gemini, embedder, articles, questions):
+    llm_calls, embed_calls, scores = [], [], []
+    llm_seconds = embed_seconds = 0.0
+    for article in articles:
+        summary_answers, article_answers = await run_llm_judge_batched(
+            gemini, article.summary, article.full_text, questions, LLM_JUDGE_PROMPT
+        )
+        with collect_calls() as calls:
+            start = time.perf_counter()
+            verdict = await evaluate_summary_vs_article_async(gemini, summary_answers, article_answers,
+                                                              LLM_JUDGE_COMPARE_PROMPT)
+            llm_seconds += time.perf_counter() - start
+        llm_calls += calls
+        with collect_calls() as calls:
+            start = time.perf_counter()
+            comparison = await compare_answers_embedding(embedder, summary_answers, article_answers)
+            embed_seconds += time.perf_counter() - start
+        embed_calls += calls
+        scores.append((parse_compare_scores(verdict), comparison))
+    return mode_totals(llm_calls, llm_seconds), mode_totals(embed_calls, embed_seconds), scores
+
+def run(input_path, n_articles, latency, embed_latency, live=False, questions=DEFAULT_QUESTIONS):
+    articles = [a for _, a in zip(range(n_articles), iter_summarized_articles(input_path, unique=True))]
+    if live:
+        from aneval.llms.registry import get_llm_registry
+        registry = get_llm_registry()
+        gemini, embedder, runner = registry.gemini(), registry.voyage(), registry.run
+    else:
+        gemini, embedder = fake_clients(latency, embed_latency)
+        def runner(coro):
+            # Fake-backend calls stay out of the production telemetry sink
+            with telemetry_disabled():
+                return asyncio.run(coro)
+    llm_mode, embedding_mode, scores = runner(run_modes(gemini, embedder, articles, questions))
+
+    report = {"articles": len(articles), "llm": llm_mode, "embedding": embedding_mode,
+              "latency_saved": 1 - embedding_mode["seconds"] / llm_mode["seconds"] if llm_mode["seconds"] else 0.0}
+    for metric in ("Relevance", "Consistency"):
+        pairs = [(llm[metric], getattr(emb, metric.lower())) for llm, emb in scores
+                 if metric in llm and getattr(emb, metric.lower()) is not None]
+        report[f"{metric.lower()}_pairs"] = len(pairs)
+        report[f"{metric.lower()}_correlation"] = correlation(*zip(*pairs)) if pairs else None
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default="stock_news_summarized.json")
+    parser.add_argument("--articles", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=1.5, help="Seconds per fake Gemini call.")
+    parser.add_argument("--embed-latency", type=float, default=0.15, help="Seconds per fake embedding request.")
+    parser.add_argument("--live", action="store_true", help="Use the real Gemini and Voyage clients (costs money).")
+    args = parser.parse_args()
+    print(json.dumps(run(args.input, args.articles, args.latency, args.embed_latency, args.live), indent=2))
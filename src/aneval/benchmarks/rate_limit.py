@@ -0,0 +1,66 @@
+"""Drive the retry/rate-control layer against a local server that returns 429s over its quota.
+
+    python -m aneval.benchmarks.rate_limit --requests 200 --server-rpm 1200 --window 2 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import time
+import requests
+from aneval.llms.fake_server import FakeLLMServer
+from aneval.llms.rate_limit import RateLimiter
+from aneval.llms.retry import RetryPolicy, call_with_retries_async
+
+async def run_requests(url, n_requests, concurrency, limiter, policy):
+    session = requests.Session()
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    def post():
+        response = session.post(url, json={"prompt": "hello"}, timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            try:
+                await call_with_retries_async(lambda: asyncio.to_thread(post), policy=policy, limiter=limiter,
+                                              label="fake")
+            except requests.HTTPError:
+                failures += 1
+
+    await asyncio.gather(*(one() for _ in range(n_requests)))
+    return failures
+
+def run(n_requests=200, server_rpm=600, latency=0.05, concurrency=32, client_rpm=0, error_rate=0.0, window=60.0):
+    with FakeLLMServer(rpm=server_rpm, latency=latency, error_rate=error_rate, window=window) as server:
+        limiter = RateLimiter(client_rpm)
+        policy = RetryPolicy(max_attempts=8, base_delay=0.1, max_delay=10)
+        start = time.perf_counter()
+        failures = asyncio.run(run_requests(server.url, n_requests, concurrency, limiter, policy))
+        elapsed = time.perf_counter() - start
+        return {
+            "requests": n_requests,
+            "failed": failures,
+            "server_requests": server.requests,
+            "server_429s": server.throttled,
+            "server_500s": server.errors,
+            "elapsed_seconds": elapsed,
+            "requests_per_minute": (n_requests - failures) / elapsed * 60,
+            "learned_rpm": limiter.rpm,
+            "client_throttles": limiter.throttles,
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--server-rpm", type=float, default=600)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--client-rpm", type=float, default=0, help="Starting budget (0 = learn from 429s).")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--window", type=float, default=60.0, help="Server quota window in seconds.")
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests, args.server_rpm, args.latency, args.concurrency, args.client_rpm,
+                         args.error_rate, args.window), indent=2))
@@ -0,0 +1,74 @@
+"""Sharded ETL against fake Gemini backends: several worker processes, one of them killed mid-run.
+
+    python -m aneval.benchmarks.sharded_etl --workers 3 --articles 120 --latency 0.2 --kill-after 2
+
+Each worker process gets its own fake backend and RPM budget, like workers with separate API keys. The
+killed worker's batch is reclaimed by another worker once its lease expires. The merge must still end
+with every article summarized.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+from aneval.etl import news_summarizer_etl as etl
+from aneval.etl.sharded_etl import WorkTable, merge_run, plan_run, print_workers, run_worker_async
+from aneval.llms.cache import ResponseCache
+from aneval.llms.fake import FakeGenerativeModel
+from aneval.llms.gemini import NEWS_SUMMARY_PROMPT, GeminiLLM
+from aneval.llms.telemetry import telemetry_disabled
+from aneval.services.store import EvalStore
+
+RUN_ID = "bench"
+
+def fake_worker(work_db, worker, latency, rpm, concurrency, lease_seconds):
+    llm = GeminiLLM(api_key="fake", model_name="fake-gemini", temperature=0.0, cache=ResponseCache(bypass=True),
+                    model=FakeGenerativeModel(latency, rpm=rpm), max_concurrency=concurrency)
+    with telemetry_disabled():
+        asyncio.run(run_worker_async(WorkTable(work_db, lease_seconds=lease_seconds), RUN_ID, worker, llm,
+                                     concurrency, rpm))
+
+def run(input_path, n_articles, workers, latency, rpm, concurrency, batch_size, lease_seconds, kill_after):
+    with tempfile.TemporaryDirectory() as tmp:
+        work_db = Path(tmp) / "work.sqlite"
+        table = WorkTable(work_db, lease_seconds=lease_seconds)
+        store = EvalStore(Path(tmp) / "store.sqlite")
+        planned = plan_run(table, store, RUN_ID, NEWS_SUMMARY_PROMPT, "fake-gemini", input_path,
+                           limit=n_articles, batch_size=batch_size)
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=fake_worker, args=(work_db, f"worker-{i}", latency, rpm, concurrency,
+                                                               lease_seconds))
+                     for i in range(workers)]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        if kill_after:
+            time.sleep(kill_after)
+            # SIGKILL: no chance to release its lease, as if the host went away
+            processes[0].kill()
+            print(f"Killed worker-0 after {kill_after}s")
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        report = merge_run(table, store, RUN_ID, Path(tmp) / "summarized.json")
+    report.update(planned=planned, seconds=elapsed, reclaimed=sum(w["reclaimed"] for w in report["workers"]))
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default=str(etl.INPUT_PATH))
+    parser.add_argument("--articles", type=int, default=120)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds the fake backend sleeps per call.")
+    parser.add_argument("--rpm", type=float, default=0, help="Fake quota per worker (0 = none).")
+    parser.add_argument("--concurrency", type=int, default=8, help="In-flight calls per worker.")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--lease-seconds", type=float, default=3)
+    parser.add_argument("--kill-after", type=float, default=1.0, help="Kill the first worker after N seconds (0 = never).")
+    args = parser.parse_args()
+    report = run(args.input, args.articles, args.workers, args.latency, args.rpm, args.concurrency, args.batch_size,
+                 args.lease_seconds, args.kill_after)
+    print_workers(report.pop("workers"))
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,137 @@
+"""Startup profile of the Streamlit app: import time per module, and cold vs rerun time of the script.
+
+    python -m aneval.benchmarks.startup                    # imports of src/frontend/app.py, in fresh interpreters
+    python -m aneval.benchmarks.startup --app              # also run the script twice with Streamlit's AppTest
+    python -m aneval.benchmarks.startup --compare bench_results/startup-<previous>.json
+
+Imports are timed with `python -X importtime` in a new interpreter per repeat, so nothing is already
+cached. The report lists the slowest modules by cumulative time and flags provider SDKs that got imported
+at startup; they should only load when a client is first created. Results are written to
+`bench_results/startup-<timestamp>.json`.
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Same directory as aneval.benchmarks.suite, which is not imported here: it would load what is being measured
+BENCH_DIR = Path("bench_results")
+APP_PATH = Path("src/frontend/app.py")
+# Should not be imported until a client for that provider is created
+LAZY_MODULES = ("google.generativeai", "openai", "voyageai", "httpx", "aneval.etl.news_summarizer_etl")
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def app_imports(path=APP_PATH):
+    """Modules imported at the top level of the app script, in order."""
+    modules = []
+    for node in ast.parse(Path(path).read_text()).body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+def profile_imports(modules):
+    """(wall seconds, {module: (self s, cumulative s, depth)}) for importing `modules` in a fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, ["src", os.getenv("PYTHONPATH")])))
+    code = "; ".join(f"import {m}" for m in modules) or "pass"
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    timings = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            timings[name] = (int(own) / 1e6, int(cumulative) / 1e6, len(indent) // 2)
+    return wall, timings
+
+def profile_app_runs(path=APP_PATH, reruns=3):
+    """Seconds for the first run of the script in this process and for each rerun after it."""
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(str(path), default_timeout=120)
+    durations = []
+    for _ in range(reruns + 1):
+        start = time.perf_counter()
+        app.run()
+        durations.append(time.perf_counter() - start)
+    if app.exception:
+        raise RuntimeError(f"The app raised: {app.exception[0].message}")
+    return {"cold_run_seconds": durations[0], "rerun_seconds": statistics.median(durations[1:])}
+
+def run(modules, repeat=3, top=15, app=False):
+    runs = [profile_imports(modules) for _ in range(repeat)]
+    baseline = statistics.median(profile_imports([])[0] for _ in range(repeat))
+    walls = [wall for wall, _ in runs]
+    timings = min(runs, key=lambda r: r[0])[1]
+    requested = {m: round(timings[m][1], 4) for m in modules if m in timings}
+    slowest = sorted(timings.items(), key=lambda item: -item[1][1])[:top]
+    report = {
+        "modules": modules,
+        "repeat": repeat,
+        "wall_seconds": statistics.median(walls),
+        "interpreter_seconds": baseline,
+        "import_seconds": max(0.0, statistics.median(walls) - baseline),
+        "modules_loaded": len(timings),
+        "cumulative_by_module": requested,
+        "slowest": [{"module": name, "self": round(own, 4), "cumulative": round(cumulative, 4), "depth": depth}
+                    for name, (own, cumulative, depth) in slowest],
+        "eager_imports": [m for m in LAZY_MODULES if m in timings],
+    }
+    if app:
+        report.update(profile_app_runs())
+    return report
+
+def compare_runs(current: dict, previous: dict) -> dict:
+    keys = ("import_seconds", "cold_run_seconds", "rerun_seconds")
+    deltas = {k: current[k] - previous[k] for k in keys if k in current and k in previous}
+    for module, seconds in current["cumulative_by_module"].items():
+        if module in previous.get("cumulative_by_module", {}):
+            deltas[module] = seconds - previous["cumulative_by_module"][module]
+    return deltas
+
+def print_report(report: dict, deltas: dict = None) -> None:
+    deltas = deltas or {}
+    def delta(key):
+        return f" ({deltas[key]:+.3f}s)" if key in deltas else ""
+    print(f"Imports: {report['import_seconds']:.3f}s{delta('import_seconds')} over a "
+          f"{report['interpreter_seconds']:.3f}s interpreter start, {report['modules_loaded']} modules")
+    for key in ("cold_run_seconds", "rerun_seconds"):
+        if key in report:
+            print(f"{key.replace('_seconds', '').replace('_', ' ').capitalize()}: {report[key]:.3f}s{delta(key)}")
+    print("\nImported by the app (cumulative):")
+    for module, seconds in report["cumulative_by_module"].items():
+        print(f"  {seconds:8.3f}s{delta(module):>12}  {module}")
+    print("\nSlowest modules (cumulative / self):")
+    for row in report["slowest"]:
+        print(f"  {row['cumulative']:8.3f}s {row['self']:8.3f}s  {'  ' * row['depth']}{row['module']}")
+    if report["eager_imports"]:
+        print(f"\nWarning: imported at startup but meant to be lazy: {', '.join(report['eager_imports'])}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", help="Modules to profile (default: the app's top-level imports).")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters to time; the median is reported.")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list.")
+    parser.add_argument("--app", action="store_true", help="Also time a cold run and reruns of the app script.")
+    parser.add_argument("--output", default=None, help="Results JSON path (default: bench_results/startup-<timestamp>.json).")
+    parser.add_argument("--compare", default=None, help="Previous results JSON to diff against.")
+    args = parser.parse_args()
+    report = run(args.modules or app_imports(), args.repeat, args.top, args.app)
+    deltas = compare_runs(report, json.loads(Path(args.compare).read_text())) if args.compare else None
+    if deltas is not None:
+        report["compared_to"] = {"path": args.compare, "deltas": deltas}
+    output = Path(args.output or BENCH_DIR / f"startup-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print_report(report, deltas)
+    print(f"Results written to {output}")
@@ -0,0 +1,232 @@
+"""Offline benchmark suite: ETL, LLM-as-a-Judge and Geval against simulated LLM backends.
+
+    python -m aneval.benchmarks.suite --articles 40 --latency 0.2 --latency-kind lognormal --error-rate 0.02
+    python -m aneval.benchmarks.suite --compare bench_results/<previous>.json
+
+Each flow reports throughput, p50/p95 latency per operation, peak traced memory and backend call
+counts. Results are written as JSON so runs can be compared after a performance change.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from aneval.benchmarks.judge_batching import DEFAULT_QUESTIONS, fake_judge_reply
+from aneval.etl import news_summarizer_etl as etl
+from aneval.llms.cache import ResponseCache
+from aneval.llms.fake import FakeAsyncOpenAI, FakeGenerativeModel, FakeLatency
+from aneval.llms.gemini import GeminiLLM
+from aneval.llms.gpt5o import GPT5oLLM
+from aneval.llms.retry import RetryPolicy
+from aneval.llms.telemetry import telemetry_disabled
+from aneval.models.response.llm_news_article import FAILED_SUMMARY
+from aneval.prompts.judge import LLM_JUDGE_COMPARE_PROMPT, LLM_JUDGE_PROMPT
+from aneval.services.geval_service import run_geval_parallel
+from aneval.services.judge_service import run_llm_judge
+from aneval.services.news_service import iter_summarized_articles
+from aneval.services.store import EvalStore
+
+BENCH_DIR = Path("bench_results")
+FLOWS = ("etl", "judge", "geval")
+
+@dataclass
+class BenchConfig:
+    input_path: str = str(etl.INPUT_PATH)
+    summarized_path: str = "stock_news_summarized.json"
+    articles: int = 40
+    latency: float = 0.2
+    latency_kind: str = "lognormal"
+    latency_spread: float = 0.5
+    error_rate: float = 0.0
+    gemini_rpm: float = 0
+    openai_rpm: float = 0
+    concurrency: int = 16
+    judge_batched: bool = True
+    retry_base_delay: float = 0.05
+    seed: int = 7
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def timed_async(fn, latencies):
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return wrapper
+
+def fake_gemini(config, seed_offset=0):
+    model = FakeGenerativeModel(
+        FakeLatency(config.latency, config.latency_kind, config.latency_spread, seed=config.seed + seed_offset),
+        responder=fake_judge_reply, error_rate=config.error_rate, rpm=config.gemini_rpm, seed=config.seed + seed_offset,
+    )
+    llm = GeminiLLM(api_key="fake", model_name="fake-gemini", temperature=0.0, model=model,
+                    cache=ResponseCache(bypass=True), max_concurrency=config.concurrency,
+                    retry_policy=RetryPolicy(base_delay=config.retry_base_delay))
+    return llm, model
+
+def fake_gpt(config, seed_offset=0):
+    client = FakeAsyncOpenAI(
+        FakeLatency(config.latency, config.latency_kind, config.latency_spread, seed=config.seed + seed_offset),
+        error_rate=config.error_rate, rpm=config.openai_rpm, seed=config.seed + seed_offset,
+    )
+    llm = GPT5oLLM(api_key="fake", model_name="fake-gpt", client=client, cache=ResponseCache(bypass=True),
+                   retry_policy=RetryPolicy(base_delay=config.retry_base_delay))
+    return llm, client
+
+def measure(run):
+    """Run `run()` and return (result, elapsed seconds, peak traced bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = run()
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+def flow_report(items, elapsed, latencies, peak, backend, failed=0):
+    return {
+        "items": items,
+        "failed": failed,
+        "elapsed_seconds": elapsed,
+        "throughput_per_second": items / elapsed if elapsed else 0.0,
+        "latency_p50_seconds": percentile(latencies, 0.50),
+        "latency_p95_seconds": percentile(latencies, 0.95),
+        "peak_memory_bytes": peak,
+        "backend_calls": backend.calls,
+        "backend_errors": backend.errors,
+        "backend_429s": backend.throttled,
+    }
+
+def bench_etl(config):
+    llm, model = fake_gemini(config, seed_offset=1)
+    latencies = []
+    llm.summarize_news_article_async = timed_async(llm.summarize_news_article_async, latencies)
+    with tempfile.TemporaryDirectory() as tmp:
+        results, elapsed, peak = measure(lambda: asyncio.run(etl.run_etl_async(
+            llm=llm, input_path=config.input_path, output_path=Path(tmp) / "summarized.json",
+            concurrency=config.concurrency, rpm=config.gemini_rpm, store=EvalStore(Path(tmp) / "bench.sqlite"),
+        )))
+    failed = sum(r["summary"] == FAILED_SUMMARY for r in results)
+    return flow_report(len(results), elapsed, latencies, peak, model, failed)
+
+def load_articles(config):
+    return [a for _, a in zip(range(config.articles), iter_summarized_articles(config.summarized_path))]
+
+async def run_bounded(items, concurrency, fn, latencies):
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    async def one(item):
+        nonlocal failed
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await fn(item)
+            except Exception:
+                failed += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(item) for item in items))
+    return failed
+
+def bench_judge(config):
+    articles = load_articles(config)
+    llm, model = fake_gemini(config, seed_offset=2)
+    latencies = []
+    judge = lambda a: run_llm_judge(llm, a.summary, a.full_text, DEFAULT_QUESTIONS, LLM_JUDGE_PROMPT,
+                                    LLM_JUDGE_COMPARE_PROMPT, batched=config.judge_batched)
+    failed, elapsed, peak = measure(lambda: asyncio.run(run_bounded(articles, config.concurrency, judge, latencies)))
+    return flow_report(len(articles), elapsed, latencies, peak, model, failed)
+
+def bench_geval(config):
+    articles = load_articles(config)
+    llm, client = fake_gpt(config, seed_offset=3)
+    latencies = []
+    geval = lambda a: run_geval_parallel(llm, a.full_text, a.summary)
+    failed, elapsed, peak = measure(lambda: asyncio.run(run_bounded(articles, config.concurrency, geval, latencies)))
+    return flow_report(len(articles), elapsed, latencies, peak, client, failed)
+
+def run_suite(config: BenchConfig, flows=FLOWS) -> dict:
+    runners = {"etl": bench_etl, "judge": bench_judge, "geval": bench_geval}
+    results = {}
+    # Fake-backend calls stay out of the production telemetry sink
+    with telemetry_disabled():
+        for flow in flows:
+            print(f"Running {flow} benchmark...")
+            results[flow] = runners[flow](config)
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": asdict(config),
+        "results": results,
+    }
+
+def compare_runs(current: dict, previous: dict) -> dict:
+    """Relative change per flow and metric (positive = larger than the previous run)."""
+    deltas = {}
+    for flow, metrics in current["results"].items():
+        before = previous.get("results", {}).get(flow)
+        if not before:
+            continue
+        deltas[flow] = {
+            name: (value - before[name]) / before[name]
+            for name, value in metrics.items()
+            if isinstance(value, (int, float)) and before.get(name)
+        }
+    return deltas
+
+def print_report(report: dict, deltas: dict = None) -> None:
+    for flow, m in report["results"].items():
+        print(
+            f"{flow:>6}: {m['items']} items in {m['elapsed_seconds']:.2f}s "
+            f"({m['throughput_per_second']:.1f}/s) | p50 {m['latency_p50_seconds']*1000:.0f}ms "
+            f"p95 {m['latency_p95_seconds']*1000:.0f}ms | peak mem {m['peak_memory_bytes']/1e6:.1f} MB | "
+            f"{m['backend_calls']} calls, {m['backend_errors']} 500s, {m['backend_429s']} 429s, {m['failed']} failed"
+        )
+        for name, change in (deltas or {}).get(flow, {}).items():
+            if name in ("throughput_per_second", "latency_p50_seconds", "latency_p95_seconds", "peak_memory_bytes"):
+                print(f"        {name}: {change:+.1%} vs previous")
+
+if __name__ == "__main__":
+    defaults = BenchConfig()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flows", nargs="+", choices=FLOWS, default=list(FLOWS))
+    parser.add_argument("--input", dest="input_path", default=defaults.input_path)
+    parser.add_argument("--summarized", dest="summarized_path", default=defaults.summarized_path)
+    parser.add_argument("--articles", type=int, default=defaults.articles, help="Articles for the judge/Geval flows.")
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="Median fake latency in seconds.")
+    parser.add_argument("--latency-kind", choices=("fixed", "uniform", "lognormal"), default=defaults.latency_kind)
+    parser.add_argument("--latency-spread", type=float, default=defaults.latency_spread)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Fraction of calls failing with 500.")
+    parser.add_argument("--gemini-rpm", type=float, default=defaults.gemini_rpm, help="Fake Gemini quota (0 = none).")
+    parser.add_argument("--openai-rpm", type=float, default=defaults.openai_rpm, help="Fake OpenAI quota (0 = none).")
+    parser.add_argument("--concurrency", type=int, default=defaults.concurrency)
+    parser.add_argument("--per-question-judge", dest="judge_batched", action="store_false")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--output", default=None, help="Results JSON path (default: bench_results/<timestamp>.json).")
+    parser.add_argument("--compare", default=None, help="Previous results JSON to diff against.")
+    args = vars(parser.parse_args())
+    flows, output, compare_path = args.pop("flows"), args.pop("output"), args.pop("compare")
+    report = run_suite(BenchConfig(**args), flows)
+    deltas = compare_runs(report, json.loads(Path(compare_path).read_text())) if compare_path else None
+    if deltas is not None:
+        report["compared_to"] = {"path": compare_path, "deltas": deltas}
+    output = Path(output or BENCH_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print_report(report, deltas)
+    print(f"Results written to {output}")
@@ -0,0 +1,188 @@
+"""Headless Geval scoring of every stored summary on all four metrics.
+
+    python -m aneval.etl.geval_batch --concurrency 16
+    python -m aneval.etl.geval_batch --samples 20 --tolerance 0.25   # mean of up to 20 samples per metric
+
+Summaries are read from the evaluation store and each (summary, metric) score is written back as soon
+as it completes, so an interrupted run resumes where it stopped. Scores are kept per sampling mode: a
+`--samples 20` run does not count single-rank scores as done, and the other way round. One semaphore caps
+in-flight GPT-5 calls across all summaries and metrics.
+
+With `--samples N`, each metric's score is the mean of up to N sampled ranks. A metric stops drawing
+samples once its confidence interval is within `--tolerance` (see `sample_geval_metric`). The store keeps
+each mean with its sample count, interval half-width and rank distribution. The report compares the calls
+used with the N calls per metric that fixed sampling would make, and gives the mean half-width and the
+pooled rank distribution per metric.
+"""
+import argparse
+import asyncio
+import os
+import math
+import time
+from collections import Counter, defaultdict
+from dotenv import load_dotenv
+from aneval.llms.gpt5o import GPT5oLLM
+from aneval.services.geval_service import (
+    GEVAL_METRICS,
+    GEVAL_TOLERANCE,
+    fill_geval_prompt,
+    geval_document,
+    sample_geval_metric,
+)
+from aneval.services.lexical_metrics import GEVAL_GATES, GevalGates, compute_metrics, gate_report
+from aneval.services.news_service import content_id
+from aneval.services.retrieval import CONTEXT_TOKEN_BUDGET
+from aneval.services.store import get_eval_store
+
+load_dotenv()
+
+GEVAL_CONCURRENCY = int(os.getenv("GEVAL_CONCURRENCY", 16))
+
+class BoundedLLM:
+    """`llm.answer_prompt_async` with at most `semaphore`'s worth of calls in flight."""
+
+    def __init__(self, llm, semaphore: asyncio.Semaphore):
+        self.llm = llm
+        self.semaphore = semaphore
+
+    async def answer_prompt_async(self, prompt: str, sample: int = 0):
+        async with self.semaphore:
+            return await self.llm.answer_prompt_async(prompt, sample=sample)
+
+async def run_geval_batch(llm=None, store=None, concurrency=None, limit=None, metrics=None, context_budget=None,
+                          summary_model=None, gates=None, samples=1, tolerance=None):
+    """Score every stored summary (optionally only those by `summary_model`); returns a report.
+
+    With `context_budget` (tokens), each article is compacted to its lead and the passages closest to it.
+    Summaries rejected by the lexical `gates` (default: `GevalGates()` unless GEVAL_GATES=0; pass False to
+    disable) are not sent to the LLM. With `samples` > 1, each score is a sampled mean (see module docs).
+    """
+    store = store or get_eval_store()
+    concurrency = concurrency or GEVAL_CONCURRENCY
+    metrics = list(metrics or GEVAL_METRICS)
+    llm = llm or GPT5oLLM()
+    semaphore = asyncio.Semaphore(concurrency)
+    done = store.geval_done(llm.model_name, context_budget, samples)
+    gates = (GevalGates() if GEVAL_GATES else None) if gates is None else (gates or None)
+
+    # Summaries belong to cluster representatives, so near-duplicates are never scored twice
+    summaries = list(store.iter_summaries(model=summary_model, limit=limit))
+    reasons = [None] * len(summaries)
+    gate_stats = None
+    if gates is not None:
+        texts = [article.summary for _, article in summaries]
+        reasons = gates.reasons(texts, compute_metrics(texts, [article.full_text for _, article in summaries]))
+        gate_stats = gate_report(reasons, len(metrics))
+        print(f"Lexical gates: {gate_stats['skipped']} of {len(summaries)} summaries skipped "
+              f"{gate_stats['skipped_by_reason']}, up to {gate_stats['llm_calls_saved']} LLM calls saved")
+
+    jobs = []
+    pending_per_article = defaultdict(int)
+    article_count = 0
+    for idx, ((summary_id, article), reason) in enumerate(zip(summaries, reasons)):
+        if reason is not None:
+            continue
+        article_count += 1
+        document = None
+        for metric in metrics:
+            if (summary_id, metric, content_id(GEVAL_METRICS[metric])) not in done:
+                document = document or geval_document(article.full_text, context_budget)
+                jobs.append((idx, summary_id, article, document, metric))
+                pending_per_article[idx] += 1
+
+    print(
+        f"Loaded {article_count} summaries from {store.path}: {len(jobs)} metric scores to compute, "
+        f"{article_count * len(metrics) - len(jobs)} already stored (concurrency={concurrency})"
+    )
+
+    bounded = BoundedLLM(llm, semaphore)
+    # metric -> sampled calls made, metric scores they produced, finite interval half-widths and sampled ranks
+    calls_used, sampled = defaultdict(int), defaultdict(int)
+    half_widths, histograms = defaultdict(list), defaultdict(Counter)
+
+    async def score(idx, summary_id, article, document, metric):
+        try:
+            prompt = fill_geval_prompt(GEVAL_METRICS[metric], document, article.summary)
+            if samples > 1:
+                estimate = await sample_geval_metric(bounded, prompt, max_samples=samples, tolerance=tolerance)
+                calls_used[metric] += estimate.samples
+                sampled[metric] += 1
+                if math.isfinite(estimate.half_width):
+                    half_widths[metric].append(estimate.half_width)
+                histograms[metric].update(estimate.ranks)
+                return idx, summary_id, article, metric, estimate, None
+            result = await bounded.answer_prompt_async(prompt)
+            return idx, summary_id, article, metric, result.rank, None
+        except Exception as e:
+            return idx, summary_id, article, metric, None, e
+
+    start = time.perf_counter()
+    scored = failed = articles_finished = 0
+    for next_result in asyncio.as_completed([score(*job) for job in jobs]):
+        idx, summary_id, article, metric, score, error = await next_result
+        pending_per_article[idx] -= 1
+        if error is not None:
+            # Not stored, so the next run retries it
+            failed += 1
+            print(f"    {metric} failed for '{article.title[:40]}': {error}")
+            continue
+        store.add_geval_scores([(summary_id, metric, GEVAL_METRICS[metric], score)], llm.model_name, context_budget,
+                               samples)
+        scored += 1
+        if pending_per_article[idx] == 0:
+            articles_finished += 1
+            elapsed = time.perf_counter() - start
+            print(f"[{articles_finished}/{len(pending_per_article)}] {article.title[:60]} "
+                  f"({articles_finished / elapsed:.2f} articles/s)")
+
+    elapsed = time.perf_counter() - start
+    report = {
+        "articles": article_count,
+        "gates": gate_stats,
+        "articles_scored": articles_finished,
+        "scores_computed": scored,
+        "scores_failed": failed,
+        "elapsed_seconds": elapsed,
+        "articles_per_second": articles_finished / elapsed if elapsed else 0.0,
+        "mean_rank": store.mean_geval_ranks(llm.model_name, samples),
+    }
+    if samples > 1:
+        # Failed metrics are left out: their samples are not known
+        fixed = sum(sampled.values()) * samples
+        report["sampling"] = {
+            "max_samples": samples,
+            "tolerance": GEVAL_TOLERANCE if tolerance is None else tolerance,
+            "calls_used": sum(calls_used.values()),
+            "calls_fixed": fixed,
+            "calls_saved": 1 - sum(calls_used.values()) / fixed if fixed else 0.0,
+            "mean_samples": {metric: calls_used[metric] / sampled[metric] for metric in sampled},
+            "mean_half_width": {metric: sum(widths) / len(widths) for metric, widths in half_widths.items() if widths},
+            "distribution": {metric: {rank: count / sum(counts.values()) for rank, count in sorted(counts.items())}
+                             for metric, counts in histograms.items()},
+        }
+        print(f"Sampling: {report['sampling']['calls_used']} GPT-5 calls instead of {fixed} "
+              f"({report['sampling']['calls_saved']:.0%} saved by early stopping)")
+    print(
+        f"Geval batch complete in {elapsed:.1f}s: {articles_finished} articles "
+        f"({report['articles_per_second']:.2f} articles/s), {scored} scores, {failed} failed. "
+        f"Results in {store.path}"
+    )
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score every stored summary on all four Geval metrics.")
+    parser.add_argument("--db", default=None, help="Evaluation store (default: EVAL_DB_PATH).")
+    parser.add_argument("--summary-model", default=None, help="Only score summaries made by this model.")
+    parser.add_argument("--concurrency", type=int, default=GEVAL_CONCURRENCY, help="Max in-flight GPT-5 calls.")
+    parser.add_argument("--limit", type=int, default=None, help="Only score the first N summaries.")
+    parser.add_argument("--no-gates", dest="gates", action="store_const", const=False, default=None,
+                        help="Send every summary to the LLM, even those the lexical gates reject.")
+    parser.add_argument("--context-budget", type=int, default=CONTEXT_TOKEN_BUDGET,
+                        help="Compact each article to this many tokens of relevant passages (0 = full article).")
+    parser.add_argument("--samples", type=int, default=1, help="Max sampled ranks per metric (1 = one rank).")
+    parser.add_argument("--tolerance", type=float, default=GEVAL_TOLERANCE,
+                        help="Stop sampling a metric once its 95%% confidence interval is within +/- this.")
+    args = parser.parse_args()
+    asyncio.run(run_geval_batch(store=get_eval_store(args.db), concurrency=args.concurrency, limit=args.limit,
+                                context_budget=args.context_budget, summary_model=args.summary_model,
+                                gates=args.gates, samples=args.samples, tolerance=args.tolerance))
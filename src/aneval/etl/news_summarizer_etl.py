@@ -1,11 +1,14 @@
+import argparse
+import asyncio
 import json
 import os
-import time
 from pathlib import Path
 from dotenv import load_dotenv
-from aneval.services.news_service import load_news_articles
-from aneval.llms.gemini import GeminiLLM, NEWS_SUMMARY_PROMPT
-from aneval.models.response.llm_news_article import LLMNewsArticle
+from aneval.services.news_service import DedupReport, load_news_articles
+from aneval.services.store import get_eval_store
+from aneval.llms.gemini import GeminiLLM, NEWS_SUMMARY_PROMPT, to_llm_news_article
+from aneval.llms.rate_limit import get_rate_limiter
+from aneval.models.response.llm_news_article import FAILED_SUMMARY, LLMNewsArticle
 
 # Load environment variables
 load_dotenv()
@@ -13,54 +16,158 @@ load_dotenv()
 # Configurable paths and parameters
 INPUT_PATH = Path(os.getenv("STOCK_NEWS_INPUT_PATH", "stock_news.json"))
 OUTPUT_PATH = Path(os.getenv("STOCK_NEWS_OUTPUT_PATH", "stock_news_summarized.json"))
-BATCH_SIZE = 10
-RETRIES = 2
+# Async mode: max in-flight summarizations and Gemini requests-per-minute budget (0 = unlimited)
+CONCURRENCY = int(os.getenv("ETL_CONCURRENCY", 8))
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", 0))
+# Summarize one representative per near-duplicate cluster and copy its summary to the rest
+ETL_DEDUP = os.getenv("ETL_DEDUP", "1").lower() not in ("0", "false", "no", "")
+
+def load_articles(input_path, dedupe, limit=None):
+    report = DedupReport()
+    articles = load_news_articles(str(input_path), dedupe=dedupe, report=report)
+    if limit is not None:
+        articles = articles[:limit]
+    if dedupe:
+        print(report)
+    return articles
 
 def save_progress(articles, output_path):
-    """Save the current progress to the output JSON file."""
-    with open(output_path, "w") as f:
+    """Write the summarized articles to the output JSON file (atomically, via a temp file)."""
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp_path, "w") as f:
         json.dump(articles, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
     print(f"Progress saved: {len(articles)} articles summarized.")
 
-def summarize_article_with_retries(llm, article, prompt, retries=2):
-    """Try to summarize an article, retrying on failure."""
-    for attempt in range(1, retries + 1):
-        try:
-            return llm.summarize_news_article(article, prompt=prompt)
-        except Exception as e:
-            print(f"    Attempt {attempt} failed: {e}")
-            if attempt < retries:
-                print("    Retrying in 5 seconds...")
-                time.sleep(5)
-    # If all attempts fail, return a placeholder
-    print("    All attempts failed. Marked as 'AI could not generate'.")
+def summary_jobs(store, articles, prompt, model_name):
+    """Register `articles` in the store; returns the summaries still to make and each article's summary owner.
+
+    Near-duplicates (and the same story under several tickers) share their cluster representative's
+    summary, so there is one job per representative without a stored summary for this prompt and model.
+    """
+    article_ids = store.add_articles(articles)
+    owner_ids = [article.cluster_id or article_id for article, article_id in zip(articles, article_ids)]
+    done = store.summaries_for(owner_ids, prompt, model_name)
+    jobs = {}
+    for article, owner_id in zip(articles, owner_ids):
+        if owner_id not in done:
+            jobs.setdefault(owner_id, article)
+    return list(jobs.items()), owner_ids
+
+def write_output(store, articles, owner_ids, prompt, model_name, output_path):
+    """Write the summarized articles, in input order, as the JSON file the dashboard tools read."""
+    summaries = store.summaries_for(owner_ids, prompt, model_name)
+    results = [
+        to_llm_news_article(article, summaries.get(owner_id, FAILED_SUMMARY)).dict()
+        for article, owner_id in zip(articles, owner_ids)
+    ]
+    save_progress(results, output_path)
+    return results
+
+def failed_summary(article, quiet=False):
+    """Placeholder returned when every summarization attempt failed."""
+    if not quiet:
+        print(f"    All attempts failed. Marked as '{FAILED_SUMMARY}'.")
     return LLMNewsArticle(
         title=getattr(article, "title", ""),
         link=getattr(article, "link", ""),
         ticker=getattr(article, "ticker", ""),
         full_text=getattr(article, "full_text", ""),
-        summary="AI could not generate"
+        summary=FAILED_SUMMARY
     )
 
-def run_etl(custom_prompt=None):
-    articles = load_news_articles(str(INPUT_PATH))
-    llm = GeminiLLM()
-    summarized = []
+def summarize_article_with_retries(llm, article, prompt):
+    """Summarize an article; throttling and transient errors are retried with backoff by the LLM client."""
+    try:
+        return llm.summarize_news_article(article, prompt=prompt)
+    except Exception as e:
+        print(f"    Summarization failed: {e}")
+    # If all attempts fail, return a placeholder
+    return failed_summary(article)
 
-    prompt = custom_prompt if custom_prompt else NEWS_SUMMARY_PROMPT
+async def summarize_article_with_retries_async(llm, article, prompt):
+    """Async variant of `summarize_article_with_retries`."""
+    try:
+        return await llm.summarize_news_article_async(article, prompt=prompt)
+    except Exception as e:
+        print(f"    Summarization failed for '{getattr(article, 'title', '')[:40]}': {e}")
+    return failed_summary(article)
 
-    print(f"Loaded {len(articles)} articles from {INPUT_PATH}")
+def run_etl(custom_prompt=None, llm=None, input_path=None, output_path=None, dedupe=None, store=None, limit=None):
+    input_path = Path(input_path or INPUT_PATH)
+    output_path = Path(output_path or OUTPUT_PATH)
+    articles = load_articles(input_path, ETL_DEDUP if dedupe is None else dedupe, limit)
+    llm = llm or GeminiLLM()
+    store = store or get_eval_store()
+
+    prompt = custom_prompt if custom_prompt else NEWS_SUMMARY_PROMPT
+    model_name = getattr(llm, "model_name", "")
+    jobs, owner_ids = summary_jobs(store, articles, prompt, model_name)
 
-    for idx, article in enumerate(articles, 1):
-        print(f"[{idx}/{len(articles)}] Summarizing: {getattr(article, 'title', '')[:60]}...")
-        summary_obj = summarize_article_with_retries(llm, article, prompt, retries=RETRIES)
-        summarized.append(summary_obj.dict())
+    print(f"Loaded {len(articles)} articles from {input_path} ({len(set(owner_ids)) - len(jobs)} already summarized in {store.path})")
 
-        if idx % BATCH_SIZE == 0 or idx == len(articles):
-            save_progress(summarized, OUTPUT_PATH)
+    for idx, (owner_id, article) in enumerate(jobs, 1):
+        print(f"[{idx}/{len(jobs)}] Summarizing: {getattr(article, 'title', '')[:60]}...")
+        summary_obj = summarize_article_with_retries(llm, article, prompt)
+        # Failures are not stored, so a rerun retries them
+        if summary_obj.summary != FAILED_SUMMARY:
+            store.add_summaries([(owner_id, summary_obj.summary)], prompt, model_name)
 
-    print(f"ETL complete. Summarized {len(summarized)} articles. Results saved to {OUTPUT_PATH}")
+    summarized = write_output(store, articles, owner_ids, prompt, model_name, output_path)
+    print(f"ETL complete. Summarized {len(summarized)} articles. Results saved to {output_path}")
     return summarized
 
+async def run_etl_async(custom_prompt=None, llm=None, input_path=None, output_path=None,
+                        concurrency=None, rpm=None, dedupe=None, store=None, limit=None):
+    """Summarize articles concurrently, at most `concurrency` in flight and `rpm` requests per minute.
+
+    Each summary is stored as soon as it finishes; the JSON output keeps the input order.
+    """
+    input_path = Path(input_path or INPUT_PATH)
+    output_path = Path(output_path or OUTPUT_PATH)
+    concurrency = concurrency or CONCURRENCY
+    rpm = GEMINI_RPM if rpm is None else rpm
+    articles = load_articles(input_path, ETL_DEDUP if dedupe is None else dedupe, limit)
+    llm = llm or GeminiLLM(max_concurrency=concurrency)
+    store = store or get_eval_store()
+    # The client's adaptive limiter starts from this budget and backs off on throttling
+    get_rate_limiter(getattr(llm, "provider", "gemini"), getattr(llm, "model_name", ""), rpm)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    prompt = custom_prompt if custom_prompt else NEWS_SUMMARY_PROMPT
+    model_name = getattr(llm, "model_name", "")
+    jobs, owner_ids = summary_jobs(store, articles, prompt, model_name)
+
+    print(
+        f"Loaded {len(articles)} articles from {input_path} ({len(set(owner_ids)) - len(jobs)} already summarized "
+        f"in {store.path}, concurrency={concurrency}, rpm={rpm or 'unlimited'})"
+    )
+
+    async def worker(owner_id, article):
+        async with semaphore:
+            summary_obj = await summarize_article_with_retries_async(llm, article, prompt)
+        return owner_id, article, summary_obj
+
+    for count, next_result in enumerate(asyncio.as_completed([worker(o, a) for o, a in jobs]), 1):
+        owner_id, article, summary_obj = await next_result
+        if summary_obj.summary != FAILED_SUMMARY:
+            store.add_summaries([(owner_id, summary_obj.summary)], prompt, model_name)
+        print(f"[{count}/{len(jobs)}] Summarized: {getattr(article, 'title', '')[:60]}...")
+
+    results = write_output(store, articles, owner_ids, prompt, model_name, output_path)
+    print(f"ETL complete. Summarized {len(results)} articles. Results saved to {output_path}")
+    return results
+
 if __name__ == "__main__":
-    run_etl()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Summarize stock news articles with Gemini.")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Summarize articles concurrently.")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Max in-flight requests in async mode.")
+    parser.add_argument("--rpm", type=float, default=GEMINI_RPM, help="Gemini requests per minute budget (0 = unlimited).")
+    parser.add_argument("--no-dedup", dest="dedupe", action="store_false", default=ETL_DEDUP,
+                        help="Summarize near-duplicate articles separately.")
+    args = parser.parse_args()
+    if args.use_async:
+        asyncio.run(run_etl_async(concurrency=args.concurrency, rpm=args.rpm, dedupe=args.dedupe))
+    else:
+        run_etl(dedupe=args.dedupe)
@@ -0,0 +1,202 @@
+"""Compare summary prompts: summarize the corpus with each, judge every summary, rank the prompts.
+
+    python -m aneval.etl.prompt_sweep prompts/terse.txt prompts/analyst.txt --articles 20
+
+The built-in summary prompt is included as `default` unless `--no-baseline` is given. Each prompt file
+is one variant, named after the file.
+
+The article-side judge answers depend only on the article, the questions, the judge prompt and the
+model, so they are computed once per article and memoized in the evaluation store. Only the
+summary-side answers and the comparison are computed per variant. Summaries, answers and verdicts are
+all stored, so an interrupted sweep resumes where it stopped and a later sweep with new variants
+reuses the article answers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+from dotenv import load_dotenv
+from aneval.etl.news_summarizer_etl import CONCURRENCY, ETL_DEDUP, INPUT_PATH, load_articles, run_etl_async
+from aneval.llms.gemini import GeminiLLM, NEWS_SUMMARY_PROMPT
+from aneval.prompts.judge import LLM_JUDGE_COMPARE_PROMPT, LLM_JUDGE_DEFAULT_QUESTIONS, LLM_JUDGE_PROMPT
+from aneval.services.judge_service import (
+    JudgeStats,
+    answer_context,
+    embedding_compare_id,
+    parse_compare_scores,
+    run_llm_judge,
+)
+from aneval.services.news_service import content_id
+from aneval.services.retrieval import CONTEXT_TOKEN_BUDGET
+from aneval.services.store import get_eval_store, summary_key
+
+load_dotenv()
+
+SWEEP_OUTPUT_DIR = Path(os.getenv("SWEEP_OUTPUT_DIR", "prompt_sweep_results"))
+
+def load_prompt_variants(paths: List[str], baseline: bool = True) -> Dict[str, str]:
+    variants = {"default": NEWS_SUMMARY_PROMPT} if baseline else {}
+    for path in paths:
+        variants[Path(path).stem] = Path(path).read_text(encoding="utf-8").strip()
+    return variants
+
+def leaderboard(rows: List[dict]) -> List[dict]:
+    """One row per prompt: judged summaries and mean judge scores, best first."""
+    board = []
+    for name in dict.fromkeys(r["prompt"] for r in rows):
+        scores = [r["scores"] for r in rows if r["prompt"] == name and r["scores"]]
+        entry = {"prompt": name, "summaries": sum(r["prompt"] == name for r in rows), "judged": len(scores)}
+        for metric in ("Relevance", "Consistency"):
+            values = [s[metric] for s in scores if metric in s]
+            entry[metric.lower()] = sum(values) / len(values) if values else None
+        present = [v for v in (entry["relevance"], entry["consistency"]) if v is not None]
+        entry["overall"] = sum(present) / len(present) if present else None
+        board.append(entry)
+    return sorted(board, key=lambda e: -(e["overall"] or 0))
+
+async def run_prompt_sweep(variants: Dict[str, str], llm=None, judge_llm=None, store=None, input_path=None,
+                           limit=None, questions=None, judge_prompt=LLM_JUDGE_PROMPT,
+                           compare_prompt=LLM_JUDGE_COMPARE_PROMPT, batched=True, context_budget=None,
+                           concurrency=None, dedupe=None, memoize=True, output_dir=None, embedder=None):
+    """Summarize with every prompt in `variants`, judge each summary, and return a report with the leaderboard.
+
+    With `memoize=False` the article-side answers are recomputed for every variant (the old behaviour),
+    which is only useful to measure what memoization saves. With an `embedder`, summaries are scored by
+    embedding similarity of the answers instead of an LLM comparison call.
+    """
+    input_path = Path(input_path or INPUT_PATH)
+    output_dir = Path(output_dir or SWEEP_OUTPUT_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    questions = list(questions or LLM_JUDGE_DEFAULT_QUESTIONS)
+    concurrency = concurrency or CONCURRENCY
+    dedupe = ETL_DEDUP if dedupe is None else dedupe
+    llm = llm or GeminiLLM(max_concurrency=concurrency)
+    judge_llm = judge_llm or llm
+    store = store or get_eval_store()
+    model_name = llm.model_name
+    if embedder is not None:
+        compare_prompt = embedding_compare_id(embedder)
+
+    # --- 1. Summaries: one ETL run per variant, resumable through the store ---
+    for name, prompt in variants.items():
+        print(f"=== Summarizing with prompt '{name}' ===")
+        await run_etl_async(custom_prompt=prompt, llm=llm, input_path=input_path,
+                            output_path=output_dir / f"{name}.summarized.json", concurrency=concurrency,
+                            dedupe=dedupe, store=store, limit=limit)
+
+    # Judge each cluster representative once per variant, like the ETL summarizes it once
+    articles = load_articles(input_path, dedupe, limit)
+    article_ids = store.add_articles(articles)
+    owners = {}
+    for article, article_id in zip(articles, article_ids):
+        owners.setdefault(article.cluster_id or article_id, article)
+    summaries = {name: store.summaries_for(owners, prompt, model_name) for name, prompt in variants.items()}
+
+    # Verdicts already stored for this judge configuration are reused (an interrupted sweep resumes)
+    rows, pending = [], []
+    for name, found in summaries.items():
+        for owner_id, summary in found.items():
+            summary_id = summary_key(owner_id, content_id(variants[name]), model_name)
+            verdict = store.judge_verdict(summary_id, judge_llm.model_name, judge_prompt, compare_prompt, questions,
+                                          context_budget)
+            if verdict is None:
+                pending.append((name, owner_id, summary_id, summary))
+            else:
+                rows.append({"prompt": name, "summary_id": summary_id, "scores": parse_compare_scores(verdict)})
+
+    semaphore = asyncio.Semaphore(concurrency)
+    article_stats, summary_stats = JudgeStats(), JudgeStats()
+    start = time.perf_counter()
+
+    # --- 2. Article-side answers: once per article, memoized in the store ---
+    async def article_side(owner_id):
+        answers = store.article_answers(owner_id, judge_llm.model_name, judge_prompt, questions, batched,
+                                        context_budget)
+        if answers is not None:
+            return owner_id, answers, True
+        async with semaphore:
+            answers = await answer_context(judge_llm, owners[owner_id].full_text, questions, judge_prompt, batched,
+                                           article_stats, context_budget)
+        store.add_article_answers(owner_id, judge_llm.model_name, judge_prompt, questions, answers, batched,
+                                  context_budget)
+        return owner_id, answers, False
+
+    article_answers, reused = {}, 0
+    if memoize:
+        pending_owners = dict.fromkeys(owner_id for _, owner_id, _, _ in pending)
+        for owner_id, answers, hit in await asyncio.gather(*(article_side(o) for o in pending_owners)):
+            article_answers[owner_id] = answers
+            reused += hit
+        print(f"Article answers: {len(article_answers) - reused} computed, {reused} reused from {store.path}")
+
+    # --- 3. Summary-side answers and comparison, per variant ---
+    async def judge(name, owner_id, summary_id, summary):
+        async with semaphore:
+            summary_answers, answers, verdict = await run_llm_judge(
+                judge_llm, summary, owners[owner_id].full_text, questions, judge_prompt, compare_prompt,
+                batched=batched, stats=summary_stats, context_budget=context_budget,
+                article_answers=article_answers.get(owner_id), embedder=embedder,
+            )
+        store.add_judge_result(summary_id, judge_llm.model_name, judge_prompt, compare_prompt, questions,
+                               summary_answers, answers, verdict, context_budget)
+        return {"prompt": name, "summary_id": summary_id, "scores": parse_compare_scores(verdict)}
+
+    rows += await asyncio.gather(*(judge(*job) for job in pending))
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "variants": list(variants),
+        "articles": len(owners),
+        "memoized": memoize,
+        "article_answer_sets_computed": len(article_answers) - reused if memoize else None,
+        "article_answer_sets_reused": reused if memoize else None,
+        "judge_calls": article_stats.calls + summary_stats.calls,
+        "judge_prompt_tokens": article_stats.prompt_tokens + summary_stats.prompt_tokens,
+        "judge_seconds": elapsed,
+        "leaderboard": leaderboard(rows),
+    }
+    with open(output_dir / "leaderboard.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def print_leaderboard(report: dict) -> None:
+    print(f"\n{report['articles']} articles x {len(report['variants'])} prompts | "
+          f"{report['judge_calls']} judge LLM calls, ~{report['judge_prompt_tokens']:,} prompt tokens, "
+          f"{report['judge_seconds']:.1f}s")
+    print(f"{'prompt':<24} {'judged':>7} {'relevance':>10} {'consistency':>12} {'overall':>8}")
+    fmt = lambda v: f"{v:.2f}" if v is not None else "-"
+    for e in report["leaderboard"]:
+        print(f"{e['prompt']:<24} {e['judged']:>3}/{e['summaries']:<3} {fmt(e['relevance']):>10} "
+              f"{fmt(e['consistency']):>12} {fmt(e['overall']):>8}")
+
+if __name__ == "__main__":
+    from aneval.llms.voyage import VoyageEmbedder
+    parser = argparse.ArgumentParser(description="Summarize with several prompts and rank them with the LLM judge.")
+    parser.add_argument("prompts", nargs="*", help="Summary prompt files, one variant each.")
+    parser.add_argument("--no-baseline", dest="baseline", action="store_false",
+                        help="Do not include the built-in summary prompt.")
+    parser.add_argument("--input", default=None, help="Raw news file (default: STOCK_NEWS_INPUT_PATH).")
+    parser.add_argument("--articles", type=int, default=None, help="Only use the first N articles.")
+    parser.add_argument("--questions-file", default=None, help="Judge questions, one per line.")
+    parser.add_argument("--per-question", dest="batched", action="store_false", help="Per-question judge calls.")
+    parser.add_argument("--context-budget", type=int, default=CONTEXT_TOKEN_BUDGET,
+                        help="Compact each article to this many tokens of relevant passages (0 = full article).")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Max in-flight requests.")
+    parser.add_argument("--embedding-compare", action="store_true",
+                        help="Score answers by Voyage embedding similarity instead of an LLM comparison call.")
+    parser.add_argument("--db", default=None, help="Evaluation store (default: EVAL_DB_PATH).")
+    parser.add_argument("--no-memo", dest="memoize", action="store_false",
+                        help="Recompute article-side answers for every prompt (to measure the savings; use a fresh --db).")
+    args = parser.parse_args()
+    questions = None
+    if args.questions_file:
+        questions = [q.strip() for q in Path(args.questions_file).read_text(encoding="utf-8").splitlines() if q.strip()]
+    print_leaderboard(asyncio.run(run_prompt_sweep(
+        load_prompt_variants(args.prompts, args.baseline), store=get_eval_store(args.db), input_path=args.input,
+        limit=args.articles, questions=questions, batched=args.batched, context_budget=args.context_budget,
+        concurrency=args.concurrency, memoize=args.memoize,
+        embedder=VoyageEmbedder() if args.embedding_compare else None,
+    )))
@@ -0,0 +1,438 @@
+"""Sharded ETL: several worker processes, on one host or on hosts sharing a filesystem, summarize one corpus.
+
+    python -m aneval.etl.sharded_etl --run nightly plan --batch-size 20
+    python -m aneval.etl.sharded_etl --run nightly work --worker a --env-file keys/a.env --rpm 60   # one per worker
+    python -m aneval.etl.sharded_etl --run nightly status
+    python -m aneval.etl.sharded_etl --run nightly merge
+
+`plan` registers the articles in the evaluation store and splits the ones still without a summary into
+batches in a shared SQLite work table (`ETL_WORK_DB`). Each worker leases one batch at a time for
+`ETL_LEASE_SECONDS` and renews the lease while it works. It writes the summaries back to the work table.
+A batch whose lease ran out is claimed again by the next worker that asks, for example when its worker
+crashed. After `ETL_MAX_LEASES` expired leases, the batch is marked failed. `merge` copies the summaries
+into the store, writes the summarized JSON and reports throughput per worker.
+
+Workers only need the work table. Each one uses its own API key, concurrency and RPM budget. The work
+table uses SQLite's rollback journal, not WAL, because WAL needs shared memory and does not work across hosts.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from aneval.etl.news_summarizer_etl import (
+    ETL_DEDUP,
+    INPUT_PATH,
+    OUTPUT_PATH,
+    load_articles,
+    summarize_article_with_retries_async,
+    summary_jobs,
+    write_output,
+)
+from aneval.llms.rate_limit import get_rate_limiter
+from aneval.models.news_article import NewsArticle
+from aneval.models.response.llm_news_article import FAILED_SUMMARY
+from aneval.services.store import EvalStore, get_eval_store
+
+load_dotenv()
+
+ETL_WORK_DB = Path(os.getenv("ETL_WORK_DB", "etl_work.sqlite"))
+ETL_BATCH_SIZE = int(os.getenv("ETL_BATCH_SIZE", 20))
+ETL_LEASE_SECONDS = float(os.getenv("ETL_LEASE_SECONDS", 120))
+# Expired leases a batch may have before it is marked failed (a batch that keeps killing its workers)
+ETL_MAX_LEASES = int(os.getenv("ETL_MAX_LEASES", 3))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS etl_runs (
+    run_id TEXT PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    model TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    dedupe INTEGER NOT NULL,
+    article_limit INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS etl_batches (
+    run_id TEXT NOT NULL REFERENCES etl_runs (run_id),
+    batch_id INTEGER NOT NULL,
+    articles TEXT NOT NULL,       -- JSON list of [summary owner id, article fields]
+    status TEXT NOT NULL,         -- 'pending', 'leased', 'done' or 'failed'
+    lease_id TEXT,                -- current lease; renewals and results must present it
+    worker TEXT,
+    lease_expires REAL,
+    leases INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run_id, batch_id)
+);
+CREATE TABLE IF NOT EXISTS etl_results (
+    run_id TEXT NOT NULL REFERENCES etl_runs (run_id),
+    owner_id TEXT NOT NULL,       -- article id of the cluster representative
+    summary TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_id, owner_id)
+);
+CREATE TABLE IF NOT EXISTS etl_workers (
+    run_id TEXT NOT NULL REFERENCES etl_runs (run_id),
+    worker TEXT NOT NULL,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    rpm REAL NOT NULL,
+    concurrency INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    batches INTEGER NOT NULL DEFAULT 0,
+    reclaimed INTEGER NOT NULL DEFAULT 0,
+    summarized INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    busy_seconds REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, worker)
+);
+"""
+
+@dataclass
+class EtlRun:
+    run_id: str
+    prompt: str
+    model: str
+    input_path: str
+    dedupe: bool
+    article_limit: Optional[int]
+
+@dataclass
+class Lease:
+    run_id: str
+    batch_id: int
+    lease_id: str
+    worker: str
+    articles: List[Tuple[str, NewsArticle]]
+    reclaimed_from: Optional[str] = None
+
+class WorkTable:
+    """The shared work table: runs, their batches and leases, results and per-worker counters."""
+
+    def __init__(self, path=None, lease_seconds: float = None, max_leases: int = None):
+        self.path = Path(path or ETL_WORK_DB)
+        self.lease_seconds = lease_seconds or ETL_LEASE_SECONDS
+        self.max_leases = max_leases or ETL_MAX_LEASES
+        self._conn = None
+        self._lock = threading.RLock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=60)
+            self._conn.execute("PRAGMA journal_mode=DELETE")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # --- Coordinator ---
+    def create_run(self, run: EtlRun, jobs: List[Tuple[str, NewsArticle]], batch_size: int) -> int:
+        """Add a run and its batches; returns the number of batches."""
+        now = time.time()
+        batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+        with self.transaction() as conn:
+            if conn.execute("SELECT 1 FROM etl_runs WHERE run_id = ?", (run.run_id,)).fetchone():
+                raise ValueError(f"Run '{run.run_id}' already exists in {self.path}")
+            conn.execute(
+                "INSERT INTO etl_runs (run_id, prompt, model, input_path, dedupe, article_limit, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run.run_id, run.prompt, run.model, run.input_path, int(run.dedupe), run.article_limit, now),
+            )
+            conn.executemany(
+                "INSERT INTO etl_batches (run_id, batch_id, articles, status, updated_at) VALUES (?, ?, ?, 'pending', ?)",
+                [(run.run_id, i, json.dumps([[owner_id, article.model_dump()] for owner_id, article in batch]), now)
+                 for i, batch in enumerate(batches)],
+            )
+        return len(batches)
+
+    def get_run(self, run_id: str) -> EtlRun:
+        rows = self._query("SELECT run_id, prompt, model, input_path, dedupe, article_limit FROM etl_runs "
+                           "WHERE run_id = ?", (run_id,))
+        if not rows:
+            raise LookupError(f"No run '{run_id}' in {self.path}; create it with `plan` first")
+        run_id, prompt, model, input_path, dedupe, limit = rows[0]
+        return EtlRun(run_id, prompt, model, input_path, bool(dedupe), limit)
+
+    def results(self, run_id: str) -> Dict[str, str]:
+        return dict(self._query("SELECT owner_id, summary FROM etl_results WHERE run_id = ?", (run_id,)))
+
+    def batch_counts(self, run_id: str) -> Dict[str, int]:
+        return dict(self._query("SELECT status, COUNT(*) FROM etl_batches WHERE run_id = ? GROUP BY status", (run_id,)))
+
+    def worker_report(self, run_id: str) -> List[dict]:
+        """Per-worker counters, with throughput over the worker's lifetime and over its busy time."""
+        columns = ("worker", "host", "pid", "rpm", "concurrency", "started_at", "last_seen", "batches", "reclaimed",
+                   "summarized", "failed", "busy_seconds")
+        rows = []
+        for values in self._query(f"SELECT {', '.join(columns)} FROM etl_workers WHERE run_id = ? ORDER BY started_at",
+                                  (run_id,)):
+            row = dict(zip(columns, values))
+            elapsed = row["last_seen"] - row["started_at"]
+            row["articles_per_minute"] = 60 * row["summarized"] / elapsed if elapsed > 0 else 0.0
+            row["busy_articles_per_minute"] = (60 * row["summarized"] / row["busy_seconds"]
+                                               if row["busy_seconds"] > 0 else 0.0)
+            rows.append(row)
+        return rows
+
+    # --- Workers ---
+    def register_worker(self, run_id: str, worker: str, rpm: float, concurrency: int) -> None:
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO etl_workers (run_id, worker, host, pid, rpm, concurrency, started_at, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (run_id, worker) DO UPDATE SET host = excluded.host, "
+                "pid = excluded.pid, rpm = excluded.rpm, concurrency = excluded.concurrency, last_seen = excluded.last_seen",
+                (run_id, worker, socket.gethostname(), os.getpid(), rpm or 0, concurrency, now, now),
+            )
+
+    def claim(self, run_id: str, worker: str) -> Optional[Lease]:
+        """Lease the next pending batch, or one whose lease has expired; None if there is none right now."""
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE etl_batches SET status = 'failed', lease_id = NULL, updated_at = ? "
+                "WHERE run_id = ? AND status = 'leased' AND lease_expires < ? AND leases >= ?",
+                (now, run_id, now, self.max_leases),
+            )
+            row = conn.execute(
+                "SELECT batch_id, articles, status, worker FROM etl_batches WHERE run_id = ? "
+                "AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                "ORDER BY status = 'leased', batch_id LIMIT 1",
+                (run_id, now),
+            ).fetchone()
+            if row is None:
+                return None
+            batch_id, articles, status, previous = row
+            lease_id = uuid.uuid4().hex
+            conn.execute(
+                "UPDATE etl_batches SET status = 'leased', lease_id = ?, worker = ?, lease_expires = ?, "
+                "leases = leases + 1, updated_at = ? WHERE run_id = ? AND batch_id = ?",
+                (lease_id, worker, now + self.lease_seconds, now, run_id, batch_id),
+            )
+            reclaimed = status == "leased"
+            if reclaimed:
+                conn.execute("UPDATE etl_workers SET reclaimed = reclaimed + 1 WHERE run_id = ? AND worker = ?",
+                             (run_id, worker))
+        return Lease(run_id, batch_id, lease_id, worker,
+                     [(owner_id, NewsArticle(**fields)) for owner_id, fields in json.loads(articles)],
+                     previous if reclaimed else None)
+
+    def renew(self, lease: Lease) -> bool:
+        """Extend the lease; False if it expired and another worker took the batch."""
+        now = time.time()
+        with self.transaction() as conn:
+            renewed = conn.execute(
+                "UPDATE etl_batches SET lease_expires = ?, updated_at = ? "
+                "WHERE run_id = ? AND batch_id = ? AND lease_id = ?",
+                (now + self.lease_seconds, now, lease.run_id, lease.batch_id, lease.lease_id),
+            ).rowcount
+            conn.execute("UPDATE etl_workers SET last_seen = ? WHERE run_id = ? AND worker = ?",
+                         (now, lease.run_id, lease.worker))
+        return bool(renewed)
+
+    def complete(self, lease: Lease, summaries: List[Tuple[str, str]], failed: int, busy_seconds: float) -> bool:
+        """Save the batch's summaries and mark it done; False (nothing saved) if the lease was lost."""
+        now = time.time()
+        with self.transaction() as conn:
+            done = conn.execute(
+                "UPDATE etl_batches SET status = 'done', lease_id = NULL, updated_at = ? "
+                "WHERE run_id = ? AND batch_id = ? AND lease_id = ?",
+                (now, lease.run_id, lease.batch_id, lease.lease_id),
+            ).rowcount
+            if not done:
+                return False
+            conn.executemany(
+                "INSERT OR REPLACE INTO etl_results (run_id, owner_id, summary, worker, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(lease.run_id, owner_id, summary, lease.worker, now) for owner_id, summary in summaries],
+            )
+            conn.execute(
+                "UPDATE etl_workers SET batches = batches + 1, summarized = summarized + ?, failed = failed + ?, "
+                "busy_seconds = busy_seconds + ?, last_seen = ? WHERE run_id = ? AND worker = ?",
+                (len(summaries), failed, busy_seconds, now, lease.run_id, lease.worker),
+            )
+        return True
+
+    def release(self, lease: Lease) -> None:
+        """Give a batch back right away (e.g. on Ctrl-C) instead of letting its lease expire."""
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE etl_batches SET status = 'pending', lease_id = NULL, leases = leases - 1, updated_at = ? "
+                "WHERE run_id = ? AND batch_id = ? AND lease_id = ?",
+                (time.time(), lease.run_id, lease.batch_id, lease.lease_id),
+            )
+
+def plan_run(table: WorkTable, store: EvalStore, run_id: str, prompt: str, model: str, input_path=None,
+             dedupe: bool = None, limit: Optional[int] = None, batch_size: int = None) -> dict:
+    """Register the corpus in the store and queue a batch per `batch_size` articles still to summarize."""
+    input_path = Path(input_path or INPUT_PATH)
+    dedupe = ETL_DEDUP if dedupe is None else dedupe
+    articles = load_articles(input_path, dedupe, limit)
+    jobs, owner_ids = summary_jobs(store, articles, prompt, model)
+    run = EtlRun(run_id, prompt, model, str(input_path), dedupe, limit)
+    batches = table.create_run(run, jobs, batch_size or ETL_BATCH_SIZE)
+    return {"run": run_id, "articles": len(articles), "already_summarized": len(set(owner_ids)) - len(jobs),
+            "to_summarize": len(jobs), "batches": batches}
+
+async def summarize_batch(llm, lease: Lease, prompt: str, semaphore: asyncio.Semaphore):
+    async def one(owner_id, article):
+        async with semaphore:
+            return owner_id, await summarize_article_with_retries_async(llm, article, prompt)
+    results = await asyncio.gather(*(one(owner_id, article) for owner_id, article in lease.articles))
+    # Failures are not saved, so a later run picks them up again
+    return [(owner_id, s.summary) for owner_id, s in results if s.summary != FAILED_SUMMARY]
+
+async def run_worker_async(table: WorkTable, run_id: str, worker: str, llm, concurrency: int = 8, rpm: float = None,
+                           poll_seconds: float = None) -> dict:
+    """Claim and summarize batches until the run has none left; returns this worker's counters."""
+    run = table.get_run(run_id)
+    # The client's adaptive limiter starts from this worker's budget and backs off on throttling
+    get_rate_limiter(getattr(llm, "provider", "gemini"), getattr(llm, "model_name", ""), rpm)
+    table.register_worker(run_id, worker, rpm, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    poll_seconds = poll_seconds or max(1.0, table.lease_seconds / 10)
+    while True:
+        lease = table.claim(run_id, worker)
+        if lease is None:
+            counts = table.batch_counts(run_id)
+            if not counts.get("pending") and not counts.get("leased"):
+                break
+            # Other workers hold the rest; wait in case one of them dies and its lease expires
+            await asyncio.sleep(poll_seconds)
+            continue
+        if lease.reclaimed_from:
+            print(f"[{worker}] Reclaimed batch {lease.batch_id} from {lease.reclaimed_from} (lease expired)")
+        start = time.perf_counter()
+
+        async def keep_leased():
+            while True:
+                await asyncio.sleep(table.lease_seconds / 3)
+                # In a thread: on a busy shared filesystem the write can wait for the lock for up to a minute,
+                # and the loop must keep serving the batch's summarizations meanwhile
+                if not await asyncio.to_thread(table.renew, lease):
+                    print(f"[{worker}] Lost the lease on batch {lease.batch_id}")
+                    return
+        renewer = asyncio.create_task(keep_leased())
+        try:
+            summaries = await summarize_batch(llm, lease, run.prompt, semaphore)
+        except BaseException:
+            table.release(lease)
+            raise
+        finally:
+            renewer.cancel()
+        elapsed = time.perf_counter() - start
+        failed = len(lease.articles) - len(summaries)
+        if table.complete(lease, summaries, failed, elapsed):
+            print(f"[{worker}] Batch {lease.batch_id}: {len(summaries)} summarized, {failed} failed in {elapsed:.1f}s")
+        else:
+            print(f"[{worker}] Batch {lease.batch_id} was taken over by another worker; its results were dropped")
+    return next(row for row in table.worker_report(run_id) if row["worker"] == worker)
+
+def merge_run(table: WorkTable, store: EvalStore, run_id: str, output_path=None) -> dict:
+    """Copy a run's summaries into the store and write the summarized JSON in input order."""
+    run = table.get_run(run_id)
+    output_path = Path(output_path or OUTPUT_PATH)
+    results = table.results(run_id)
+    store.add_summaries(results.items(), run.prompt, run.model)
+    articles = load_articles(run.input_path, run.dedupe, run.article_limit)
+    missing, owner_ids = summary_jobs(store, articles, run.prompt, run.model)
+    write_output(store, articles, owner_ids, run.prompt, run.model, output_path)
+    workers = table.worker_report(run_id)
+    started = min((w["started_at"] for w in workers), default=0.0)
+    finished = max((w["last_seen"] for w in workers), default=0.0)
+    summarized = sum(w["summarized"] for w in workers)
+    return {
+        "run": run_id,
+        "articles": len(articles),
+        "merged_summaries": len(results),
+        "still_missing": len(missing),
+        "batches": table.batch_counts(run_id),
+        "workers": workers,
+        "wall_seconds": finished - started,
+        "articles_per_minute": 60 * summarized / (finished - started) if finished > started else 0.0,
+        "output": str(output_path),
+    }
+
+def print_workers(workers: List[dict]) -> None:
+    print(f"{'worker':<24}{'host':<16}{'rpm':>6}{'conc':>6}{'batches':>9}{'reclaimed':>10}{'summarized':>11}"
+          f"{'failed':>8}{'per min':>9}{'busy/min':>10}")
+    for w in workers:
+        print(f"{w['worker'][:23]:<24}{w['host'][:15]:<16}{w['rpm']:>6g}{w['concurrency']:>6}{w['batches']:>9}"
+              f"{w['reclaimed']:>10}{w['summarized']:>11}{w['failed']:>8}{w['articles_per_minute']:>9.1f}"
+              f"{w['busy_articles_per_minute']:>10.1f}")
+
+if __name__ == "__main__":
+    from aneval.llms.gemini import GEMINI_DEFAULT_MODEL, NEWS_SUMMARY_PROMPT, GeminiLLM
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--work-db", default=str(ETL_WORK_DB), help="Shared work table (default: ETL_WORK_DB).")
+    parser.add_argument("--run", required=True, help="Run id shared by the plan, its workers and the merge.")
+    parser.add_argument("--lease-seconds", type=float, default=ETL_LEASE_SECONDS)
+    sub = parser.add_subparsers(dest="command", required=True)
+    plan = sub.add_parser("plan", help="Queue the articles without a summary as batches.")
+    plan.add_argument("--input", default=str(INPUT_PATH))
+    plan.add_argument("--db", default=None, help="Evaluation store (default: EVAL_DB_PATH).")
+    plan.add_argument("--prompt-file", default=None, help="Summary prompt (default: the built-in prompt).")
+    plan.add_argument("--model", default=os.getenv("GEMINI_LLM", GEMINI_DEFAULT_MODEL))
+    plan.add_argument("--batch-size", type=int, default=ETL_BATCH_SIZE)
+    plan.add_argument("--limit", type=int, default=None, help="Only the first N articles.")
+    plan.add_argument("--no-dedup", dest="dedupe", action="store_false", default=ETL_DEDUP)
+    work = sub.add_parser("work", help="Summarize batches until none are left.")
+    work.add_argument("--worker", default=f"{socket.gethostname()}-{os.getpid()}")
+    work.add_argument("--env-file", default=None,
+                      help="Worker's own .env (GEMINI_API_KEY, GEMINI_RPM, ETL_CONCURRENCY), loaded over the defaults.")
+    work.add_argument("--api-key-env", default="GEMINI_API_KEY", help="Environment variable holding the API key.")
+    work.add_argument("--concurrency", type=int, default=None)
+    work.add_argument("--rpm", type=float, default=None, help="Requests per minute for this worker (0 = unlimited).")
+    sub.add_parser("status", help="Batch counts and per-worker throughput.")
+    merge = sub.add_parser("merge", help="Copy the summaries into the store and write the summarized JSON.")
+    merge.add_argument("--db", default=None, help="Evaluation store (default: EVAL_DB_PATH).")
+    merge.add_argument("--output", default=str(OUTPUT_PATH))
+    args = parser.parse_args()
+
+    table = WorkTable(args.work_db, lease_seconds=args.lease_seconds)
+    if args.command == "plan":
+        prompt = Path(args.prompt_file).read_text() if args.prompt_file else NEWS_SUMMARY_PROMPT
+        print(json.dumps(plan_run(table, get_eval_store(args.db), args.run, prompt, args.model, args.input,
+                                  args.dedupe, args.limit, args.batch_size), indent=2))
+    elif args.command == "work":
+        if args.env_file:
+            load_dotenv(args.env_file, override=True)
+        concurrency = args.concurrency or int(os.getenv("ETL_CONCURRENCY", 8))
+        rpm = args.rpm if args.rpm is not None else float(os.getenv("GEMINI_RPM", 0))
+        llm = GeminiLLM(api_key=os.getenv(args.api_key_env), model_name=table.get_run(args.run).model,
+                        max_concurrency=concurrency)
+        stats = asyncio.run(run_worker_async(table, args.run, args.worker, llm, concurrency, rpm))
+        print_workers([stats])
+    elif args.command == "status":
+        print(json.dumps(table.batch_counts(args.run)), f"{len(table.results(args.run))} summaries")
+        print_workers(table.worker_report(args.run))
+    else:
+        report = merge_run(table, get_eval_store(args.db), args.run, args.output)
+        print_workers(report.pop("workers"))
+        print(json.dumps(report, indent=2))
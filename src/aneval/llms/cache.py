@@ -0,0 +1,135 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", ".aneval_cache/llm_responses.sqlite"))
+CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", 256))
+CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0").lower() in ("1", "true", "yes")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    temperature TEXT NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """SQLite-backed cache of raw LLM responses with LRU eviction by total size and a TTL.
+
+    Entries are keyed by provider, model, temperature and a hash of the full prompt.
+    Set `bypass` (or `LLM_CACHE_BYPASS=1`) to skip the cache; the database is only opened on first use.
+    """
+
+    def __init__(self, path=None, max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None,
+                 bypass: Optional[bool] = None):
+        self.path = Path(path or CACHE_PATH)
+        self.max_bytes = int(CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.ttl_seconds = CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.bypass = CACHE_BYPASS if bypass is None else bypass
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature, prompt: str) -> str:
+        return hashlib.sha256(f"{provider}\x1f{model}\x1f{temperature}\x1f{prompt_hash(prompt)}".encode("utf-8")).hexdigest()
+
+    def get(self, provider: str, model: str, temperature, prompt: str) -> Optional[str]:
+        if self.bypass:
+            return None
+        key = self.make_key(provider, model, temperature, prompt)
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, provider: str, model: str, temperature, prompt: str, value: str) -> None:
+        if self.bypass:
+            return
+        key = self.make_key(provider, model, temperature, prompt)
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, str(temperature), prompt_hash(prompt), value, size, now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        # Drop the least recently used entries until the cache fits in max_bytes
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM responses")
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        entries, size = (0, 0) if self.bypass else self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "bypass": self.bypass,
+        }
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache shared by all LLM clients."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
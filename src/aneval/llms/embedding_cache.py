@@ -0,0 +1,111 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence
+import numpy as np
+from dotenv import load_dotenv
+from aneval.llms.cache import CACHE_BYPASS
+
+load_dotenv()
+
+EMBEDDING_CACHE_PATH = Path(os.getenv("EMBEDDING_CACHE_PATH", ".aneval_cache/embeddings.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    input_type TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,         -- float32, native byte order
+    created_at REAL NOT NULL
+);
+"""
+
+class EmbeddingCache:
+    """SQLite-backed store of embedding vectors keyed by provider, model, input type and a hash of the text.
+
+    Embeddings are deterministic, so entries never expire. Set `bypass` (or `LLM_CACHE_BYPASS=1`) to skip it.
+    """
+
+    def __init__(self, path=None, bypass: Optional[bool] = None):
+        self.path = Path(path or EMBEDDING_CACHE_PATH)
+        self.bypass = CACHE_BYPASS if bypass is None else bypass
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    @staticmethod
+    def make_key(provider: str, model: str, input_type: str, text: str) -> str:
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{provider}\x1f{model}\x1f{input_type}\x1f{text_hash}".encode("utf-8")).hexdigest()
+
+    def get_many(self, provider: str, model: str, input_type: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Cached vector for each text, or None where there is none."""
+        if self.bypass:
+            return [None] * len(texts)
+        keys = [self.make_key(provider, model, input_type, t) for t in texts]
+        found = {}
+        with self._lock:
+            unique = list(dict.fromkeys(keys))
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                found.update(self.conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+        vectors = [np.frombuffer(found[k], dtype=np.float32) if k in found else None for k in keys]
+        hits = sum(v is not None for v in vectors)
+        self.hits += hits
+        self.misses += len(vectors) - hits
+        return vectors
+
+    def set_many(self, provider: str, model: str, input_type: str, texts: Sequence[str],
+                 vectors: Sequence[np.ndarray]) -> None:
+        if self.bypass:
+            return
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            rows.append((self.make_key(provider, model, input_type, text), provider, model, input_type, len(vector),
+                         vector.tobytes(), now))
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def stats(self) -> dict:
+        entries, size = (0, 0) if self.bypass else self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "bypass": self.bypass,
+        }
+
+_default_cache: Optional[EmbeddingCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide embedding cache shared by all embedders."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache()
+        return _default_cache
@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+class FakeLatency:
+    """Latency distribution for fake backends: `fixed`, `uniform` (median ± spread) or `lognormal`."""
+
+    def __init__(self, median: float = 0.5, kind: str = "fixed", spread: float = 0.5, seed: int = None):
+        self.median = median
+        self.kind = kind
+        self.spread = spread
+        self.random = random.Random(seed)
+
+    def sample(self) -> float:
+        if self.kind == "uniform":
+            return max(0.0, self.random.uniform(self.median * (1 - self.spread), self.median * (1 + self.spread)))
+        if self.kind == "lognormal":
+            # `spread` is sigma of the underlying normal; the median of the lognormal is `median`
+            return self.random.lognormvariate(math.log(self.median), self.spread) if self.median > 0 else 0.0
+        return self.median
+
+class FakeAPIError(Exception):
+    """Shaped like the SDK errors: an HTTP `status_code` and a `response` with headers."""
+
+    def __init__(self, status_code: int, retry_after: float = None):
+        super().__init__(f"Fake API error {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": f"{retry_after:.3f}"} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+class FakeBackend:
+    """Shared behavior of the fake clients: sampled latency, random 500s and an RPM quota (429s).
+
+    `token_latency` adds seconds per 1k prompt tokens, so prompt size shows up in latency.
+    """
+
+    def __init__(self, latency=0.5, error_rate: float = 0.0, rpm: float = 0, seed: int = None,
+                 token_latency: float = 0.0):
+        self.latency = latency if isinstance(latency, FakeLatency) else FakeLatency(latency)
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.rpm = rpm
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0
+        self._accepted = deque()
+        self._lock = threading.Lock()
+
+    def _admit(self, prompt: str = "") -> float:
+        """Count the call, raise a 429/500 if it should fail, else return how long it takes."""
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            if self.rpm:
+                while self._accepted and now - self._accepted[0] >= 60:
+                    self._accepted.popleft()
+                if len(self._accepted) >= self.rpm:
+                    self.throttled += 1
+                    raise FakeAPIError(429, retry_after=60 - (now - self._accepted[0]))
+                self._accepted.append(now)
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.errors += 1
+                raise FakeAPIError(500)
+            prefill = self.token_latency * fake_tokens(prompt) / 1000 if prompt else 0.0
+            return self.latency.sample() + prefill
+
+# Share of a streamed fake call's latency spent before its first chunk
+FAKE_TTFT_SHARE = 0.25
+
+def fake_chunks(text: str, words: int = 3) -> list:
+    """`text` split into pieces of a few words each, as a streamed reply would arrive."""
+    return re.findall(r"(?:\s*\S+){1,%d}\s*" % words, text) or [text]
+
+class FakeStream:
+    """Async iterator (and async context manager) over `items`, paced like a reply streamed over `delay` seconds."""
+
+    def __init__(self, items, delay: float):
+        self.items = list(items)
+        self.delay = delay
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        first = self.delay * FAKE_TTFT_SHARE if len(self.items) > 1 else self.delay
+        rest = (self.delay - first) / max(len(self.items) - 1, 1)
+        for i, item in enumerate(self.items):
+            await asyncio.sleep(first if i == 0 else rest)
+            yield item
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+def fake_tokens(text) -> int:
+    # Same chars-per-token heuristic the judge uses for its prompt estimates
+    return max(1, len(str(text)) // 4)
+
+class FakeResponse:
+    def __init__(self, text: str, prompt: str = ""):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(prompt_token_count=fake_tokens(prompt),
+                                              candidates_token_count=fake_tokens(text))
+
+class FakeGenerativeModel(FakeBackend):
+    """Local stand-in for `genai.GenerativeModel` that sleeps instead of calling the API.
+
+    `responder(prompt, generation_config) -> str` overrides the fixed `text` reply.
+    """
+
+    def __init__(self, latency=0.5, text: str = "Fake summary.", responder=None, error_rate: float = 0.0,
+                 rpm: float = 0, seed: int = None, token_latency: float = 0.0):
+        super().__init__(latency, error_rate, rpm, seed, token_latency)
+        self.text = text
+        self.responder = responder
+
+    def _reply(self, prompt, generation_config):
+        text = self.responder(prompt, generation_config or {}) if self.responder else self.text
+        return FakeResponse(text, prompt)
+
+    def generate_content(self, prompt, generation_config=None):
+        time.sleep(self._admit(prompt))
+        return self._reply(prompt, generation_config)
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        delay = self._admit(prompt)
+        if stream:
+            response = self._reply(prompt, generation_config)
+            chunks = FakeStream([SimpleNamespace(text=c) for c in fake_chunks(response.text)], delay)
+            # Like the SDK's streamed response: iterate for chunks, then read the usage of the whole reply
+            chunks.usage_metadata = response.usage_metadata
+            return chunks
+        await asyncio.sleep(delay)
+        return self._reply(prompt, generation_config)
+
+class FakeParsedResponse:
+    def __init__(self, output_parsed, input=()):
+        self.output_parsed = output_parsed
+        self.usage = SimpleNamespace(input_tokens=sum(fake_tokens(m["content"]) for m in input),
+                                     output_tokens=fake_tokens(output_parsed.model_dump_json()))
+
+class FakeResponses:
+    def __init__(self, client):
+        self.client = client
+
+    async def parse(self, model, input, text_format):
+        prompt = "\n".join(m["content"] for m in input)
+        await asyncio.sleep(self.client._admit(prompt))
+        return FakeParsedResponse(text_format(rank=self.client.sample_rank(prompt)), input)
+
+    async def create(self, model, input, stream=False):
+        prompt = "\n".join(m["content"] for m in input)
+        delay = self.client._admit(prompt)
+        text = self.client.text
+        response = SimpleNamespace(output_text=text, usage=SimpleNamespace(input_tokens=fake_tokens(prompt),
+                                                                           output_tokens=fake_tokens(text)))
+        if not stream:
+            await asyncio.sleep(delay)
+            return response
+        events = [SimpleNamespace(type="response.output_text.delta", delta=c) for c in fake_chunks(text)]
+        return FakeStream(events + [SimpleNamespace(type="response.completed", response=response)], delay)
+
+class FakeAsyncOpenAI(FakeBackend):
+    """Local stand-in for `AsyncOpenAI` exposing only `responses.parse` and `responses.create`.
+
+    With `rank_spread`, each parsed rank is drawn around `rank` (normal, rounded, clipped to 1-5), the
+    way repeated samples of a real grader disagree. `ranker(prompt) -> int` overrides both.
+    """
+
+    def __init__(self, latency=0.5, rank: int = 4, error_rate: float = 0.0, rpm: float = 0, seed: int = None,
+                 token_latency: float = 0.0, text: str = "Fake reply.", rank_spread: float = 0.0, ranker=None):
+        super().__init__(latency, error_rate, rpm, seed, token_latency)
+        self.rank = rank
+        self.rank_spread = rank_spread
+        self.ranker = ranker
+        self.text = text
+        self.responses = FakeResponses(self)
+
+    def sample_rank(self, prompt: str = "") -> int:
+        if self.ranker is not None:
+            return self.ranker(prompt)
+        if not self.rank_spread:
+            return self.rank
+        with self._lock:
+            return min(5, max(1, round(self.random.gauss(self.rank, self.rank_spread))))
+
+def fake_embedding(text: str, dim: int = 256) -> list:
+    """Deterministic bag-of-words vector: each word and word pair adds to a hashed dimension.
+
+    Texts that share wording get a high cosine similarity, unrelated texts a low one.
+    """
+    words = re.findall(r"\w+", text.lower())
+    vector = [0.0] * dim
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        digest = hashlib.sha256(feature.encode("utf-8")).digest()
+        vector[int.from_bytes(digest[:4], "little") % dim] += 1.0 if digest[4] & 1 else -1.0
+    return vector
+
+class FakeVoyageClient(FakeBackend):
+    """Local stand-in for `voyageai.AsyncClient` exposing only `embed`, with `fake_embedding` vectors."""
+
+    def __init__(self, latency=0.1, dim: int = 256, error_rate: float = 0.0, rpm: float = 0, seed: int = None,
+                 token_latency: float = 0.0):
+        super().__init__(latency, error_rate, rpm, seed, token_latency)
+        self.dim = dim
+        self.texts_embedded = 0
+
+    async def embed(self, texts, model=None, input_type=None):
+        await asyncio.sleep(self._admit("\n".join(texts)))
+        self.texts_embedded += len(texts)
+        return SimpleNamespace(embeddings=[fake_embedding(t, self.dim) for t in texts],
+                               total_tokens=sum(fake_tokens(t) for t in texts))
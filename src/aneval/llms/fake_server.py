@@ -0,0 +1,103 @@
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeLLMServer:
+    """Local HTTP stand-in for an LLM API that enforces a requests-per-minute quota.
+
+    The quota is enforced over a sliding `window` (60s by default; shorten it for quick runs).
+    Requests over the quota get a 429 with `Retry-After` / `retry-after-ms` headers; a fraction
+    `error_rate` get a 500. Everything else sleeps `latency` seconds and returns `{"text": ...}`.
+
+        with FakeLLMServer(rpm=300) as server:
+            requests.post(server.url)
+    """
+
+    def __init__(self, rpm: float = 600, latency: float = 0.05, error_rate: float = 0.0, text: str = "ok",
+                 window: float = 60.0):
+        self.rpm = rpm
+        self.window = window
+        self.latency = latency
+        self.error_rate = error_rate
+        self.text = text
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self._accepted = deque()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1/generate"
+
+    def _admit(self):
+        """Sliding-window quota; returns None if admitted, else seconds until a slot frees up."""
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            while self._accepted and now - self._accepted[0] >= self.window:
+                self._accepted.popleft()
+            if self.rpm and len(self._accepted) >= self.rpm * self.window / 60:
+                self.throttled += 1
+                return self.window - (now - self._accepted[0])
+            self._accepted.append(now)
+            return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                wait = server._admit()
+                if wait is not None:
+                    self._reply(429, {"error": "rate limit exceeded"}, {
+                        "Retry-After": str(math.ceil(wait)),
+                        "retry-after-ms": str(int(wait * 1000)),
+                    })
+                    return
+                if server.error_rate and random.random() < server.error_rate:
+                    with server._lock:
+                        server.errors += 1
+                    self._reply(500, {"error": "internal error"})
+                    return
+                time.sleep(server.latency)
+                self._reply(200, {"text": server.text})
+
+            def _reply(self, status, body, headers=None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,6 +1,13 @@
+import asyncio
 import os
+import time
+import weakref
+from typing import AsyncIterator
 from dotenv import load_dotenv
-import google.generativeai as genai
+from aneval.llms.cache import ResponseCache, get_response_cache
+from aneval.llms.rate_limit import get_rate_limiter
+from aneval.llms.retry import RetryPolicy, call_with_retries, call_with_retries_async
+from aneval.llms.telemetry import track_call
 from aneval.models.response.llm_news_article import LLMNewsArticle
 
 load_dotenv()  # Load variables from .env
@@ -12,37 +19,165 @@ NEWS_SUMMARY_PROMPT = (
     "Do not copy text verbatim. Focus on what is new, surprising, or actionable. "
     "Avoid generic statements. Be specific, insightful, and objective."
 )
+GEMINI_DEFAULT_MODEL = "gemini-2.5-flash"
+GEMINI_DEFAULT_TEMP = 0.7
+# Max concurrent in-flight async requests per GeminiLLM instance
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 16))
 
 class GeminiLLM:
-    def __init__(self, api_key: str = None, model_name: str = None, temperature: float = None):
+    provider = "gemini"
+
+    def __init__(self, api_key: str = None, model_name: str = None, temperature: float = None, model=None,
+                 cache: ResponseCache = None, max_concurrency: int = None, retry_policy: RetryPolicy = None):
         if api_key is None:
             api_key = os.getenv("GEMINI_API_KEY")
         if model_name is None:
-            model_name = os.getenv("GEMINI_LLM", "gemini-2.5-flash")
+            model_name = os.getenv("GEMINI_LLM", GEMINI_DEFAULT_MODEL)
         if temperature is None:
             # Default to 0.7 if not set in env
-            temperature = float(os.getenv("GEMINI_TEMP", 0.7))
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model_name)
+            temperature = float(os.getenv("GEMINI_TEMP", GEMINI_DEFAULT_TEMP))
+        if model is None:
+            # Imported on first use: the SDK takes about a second to import
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            model = genai.GenerativeModel(model_name)
+        self.model = model
+        self.model_name = model_name
         self.temperature = temperature
+        self.cache = cache if cache is not None else get_response_cache()
+        self.max_concurrency = max_concurrency or GEMINI_MAX_CONCURRENCY
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.limiter = get_rate_limiter(self.provider, self.model_name)
+        # asyncio primitives are bound to one event loop, so keep one semaphore per running loop
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def _generation_config(self, json_mode: bool = False) -> dict:
+        config = {"temperature": self.temperature}
+        if json_mode:
+            config["response_mime_type"] = "application/json"
+        return config
+
+    @staticmethod
+    def _cache_prompt(prompt: str, json_mode: bool) -> str:
+        # JSON-mode responses differ from free-text ones for the same prompt
+        return f"application/json\x1f{prompt}" if json_mode else prompt
+
+    def generate(self, prompt: str, json_mode: bool = False, operation: str = "generate") -> str:
+        cache_prompt = self._cache_prompt(prompt, json_mode)
+        with track_call(self.provider, self.model_name, operation) as call:
+            cached = self.cache.get(self.provider, self.model_name, self.temperature, cache_prompt)
+            if cached is not None:
+                call.cache_hit = True
+                return cached
+            def attempt():
+                call.attempts += 1
+                return self.model.generate_content(prompt, generation_config=self._generation_config(json_mode))
+            response = call_with_retries(attempt, policy=self.retry_policy, limiter=self.limiter, label="Gemini")
+            call.set_usage(response)
+        text = response.text.strip()
+        self.cache.set(self.provider, self.model_name, self.temperature, cache_prompt, text)
+        return text
+
+    async def generate_async(self, prompt: str, json_mode: bool = False, operation: str = "generate") -> str:
+        cache_prompt = self._cache_prompt(prompt, json_mode)
+        with track_call(self.provider, self.model_name, operation) as call:
+            cached = self.cache.get(self.provider, self.model_name, self.temperature, cache_prompt)
+            if cached is not None:
+                call.cache_hit = True
+                return cached
+            async def attempt():
+                call.attempts += 1
+                async with self.semaphore:
+                    return await self.model.generate_content_async(prompt, generation_config=self._generation_config(json_mode))
+            response = await call_with_retries_async(attempt, policy=self.retry_policy, limiter=self.limiter, label="Gemini")
+            call.set_usage(response)
+        text = response.text.strip()
+        self.cache.set(self.provider, self.model_name, self.temperature, cache_prompt, text)
+        return text
+
+    async def stream_async(self, prompt: str, json_mode: bool = False,
+                           operation: str = "generate") -> AsyncIterator[str]:
+        """Yield the reply in pieces as it is generated; the whole reply is cached like `generate_async`'s.
+
+        A cached reply comes back as one piece. Failures before the stream starts are retried, later ones raise.
+        """
+        cache_prompt = self._cache_prompt(prompt, json_mode)
+        start = time.perf_counter()
+        with track_call(self.provider, self.model_name, operation) as call:
+            cached = self.cache.get(self.provider, self.model_name, self.temperature, cache_prompt)
+            if cached is not None:
+                call.cache_hit = True
+                yield cached
+                return
+            async def attempt():
+                call.attempts += 1
+                return await self.model.generate_content_async(
+                    prompt, generation_config=self._generation_config(json_mode), stream=True
+                )
+            parts = []
+            # The concurrency slot is held until the stream is consumed, not just until it starts
+            async with self.semaphore:
+                response = await call_with_retries_async(attempt, policy=self.retry_policy, limiter=self.limiter,
+                                                         label="Gemini")
+                async for chunk in response:
+                    text = chunk_text(chunk)
+                    if not text:
+                        continue
+                    if call.ttft_seconds is None:
+                        call.ttft_seconds = time.perf_counter() - start
+                    parts.append(text)
+                    yield text
+            call.set_usage(response)
+        self.cache.set(self.provider, self.model_name, self.temperature, cache_prompt, "".join(parts).strip())
 
-    def answer_question(self, context: str, question: str) -> str:
-        prompt = f"Context:\n{context}\n\nQuestion: {question}\nAnswer:"
-        response = self.model.generate_content(prompt, generation_config={"temperature": self.temperature})
-        return response.text.strip()
+    def answer_question(self, context: str, question: str, operation: str = "judge-answer") -> str:
+        return self.generate(build_question_prompt(context, question), operation=operation)
+
+    async def answer_question_async(self, context: str, question: str, operation: str = "judge-answer") -> str:
+        return await self.generate_async(build_question_prompt(context, question), operation=operation)
+
+    def stream_answer_async(self, context: str, question: str, operation: str = "judge-answer") -> AsyncIterator[str]:
+        return self.stream_async(build_question_prompt(context, question), operation=operation)
 
     def summarize_news_article(self, article, prompt: str = NEWS_SUMMARY_PROMPT) -> LLMNewsArticle:
-        prompt = (
-            f"{prompt}\n\n"
-            f"Article:\n{article.full_text}\n\n"
-            f"Summary:"
-        )
-        response = self.model.generate_content(prompt, generation_config={"temperature": self.temperature})
-        summary = response.text.strip()
-        return LLMNewsArticle(
-            title=article.title,
-            link=article.link,
-            ticker=article.ticker,
-            full_text=article.full_text,
-            summary=summary
-        )
\ No newline at end of file
+        summary = self.generate(build_summary_prompt(article, prompt), operation="summarize")
+        return to_llm_news_article(article, summary)
+
+    async def summarize_news_article_async(self, article, prompt: str = NEWS_SUMMARY_PROMPT) -> LLMNewsArticle:
+        summary = await self.generate_async(build_summary_prompt(article, prompt), operation="summarize")
+        return to_llm_news_article(article, summary)
+
+def chunk_text(chunk) -> str:
+    # The SDK raises instead of returning "" for chunks without text parts (e.g. the final one)
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+def build_question_prompt(context: str, question: str) -> str:
+    return f"Context:\n{context}\n\nQuestion: {question}\nAnswer:"
+
+def build_summary_prompt(article, prompt: str = NEWS_SUMMARY_PROMPT) -> str:
+    return (
+        f"{prompt}\n\n"
+        f"Article:\n{article.full_text}\n\n"
+        f"Summary:"
+    )
+
+def to_llm_news_article(article, summary: str) -> LLMNewsArticle:
+    return LLMNewsArticle(
+        title=article.title,
+        link=article.link,
+        ticker=article.ticker,
+        full_text=article.full_text,
+        summary=summary,
+        cluster_id=getattr(article, "cluster_id", None),
+    )
\ No newline at end of file
@@ -1,23 +1,91 @@
 import os
-from openai import AsyncOpenAI
+import time
+from typing import AsyncIterator
+from aneval.llms.cache import ResponseCache, get_response_cache
+from aneval.llms.rate_limit import get_rate_limiter
+from aneval.llms.retry import RetryPolicy, call_with_retries_async
+from aneval.llms.telemetry import track_call
 from aneval.models.response.geval_rank import GevalRank
 
+GPT_GEVAL_DEFAULT_MODEL = "gpt-5-2025-08-07"
+GEVAL_SYSTEM_PROMPT = "You are a helpful and precise evaluator. Respond only with the structured object."
+
 class GPT5oLLM:
-    def __init__(self, api_key: str = None, model_name: str = None):
+    provider = "openai"
+
+    def __init__(self, api_key: str = None, model_name: str = None, client=None, cache: ResponseCache = None,
+                 retry_policy: RetryPolicy = None):
         if api_key is None:
             api_key = os.getenv("OPENAI_API_KEY")
         if model_name is None:
-            model_name = os.getenv("GPT_GEVAL_LLM", "gpt-5-2025-08-07")
-        self.client = AsyncOpenAI(api_key=api_key)
+            model_name = os.getenv("GPT_GEVAL_LLM", GPT_GEVAL_DEFAULT_MODEL)
+        if client is None:
+            # Imported on first use, like the other provider SDKs
+            from openai import AsyncOpenAI
+            # Retries are handled by aneval.llms.retry so they share the adaptive limiter
+            client = AsyncOpenAI(api_key=api_key, max_retries=0)
+        self.client = client
         self.model_name = model_name
+        self.cache = cache if cache is not None else get_response_cache()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.limiter = get_rate_limiter(self.provider, self.model_name)
+
+    async def answer_prompt_async(self, prompt: str, operation: str = "geval-metric", sample: int = 0) -> GevalRank:
+        """`sample` numbers repeated draws of the same prompt, so each one is cached on its own (0 = single score)."""
+        # The system prompt and response schema are part of what the model sees, so they are part of the key
+        cache_prompt = f"{GEVAL_SYSTEM_PROMPT}\x1f{GevalRank.__name__}\x1f{prompt}"
+        if sample:
+            cache_prompt += f"\x1fsample {sample}"
+        with track_call(self.provider, self.model_name, operation) as call:
+            cached = self.cache.get(self.provider, self.model_name, None, cache_prompt)
+            if cached is not None:
+                call.cache_hit = True
+                return GevalRank.model_validate_json(cached)
+            def attempt():
+                call.attempts += 1
+                return self.client.responses.parse(
+                    model=self.model_name,
+                    input=[
+                        {"role": "system", "content": GEVAL_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    text_format=GevalRank,
+                )
+            response = await call_with_retries_async(attempt, policy=self.retry_policy, limiter=self.limiter,
+                                                     label="GPT-5")
+            call.set_usage(response)
+        result = response.output_parsed
+        self.cache.set(self.provider, self.model_name, None, cache_prompt, result.model_dump_json())
+        return result
 
-    async def answer_prompt_async(self, prompt: str) -> GevalRank:
-        response = await self.client.responses.parse(
-            model=self.model_name,
-            input=[
-                {"role": "system", "content": "You are a helpful and precise evaluator. Respond only with the structured object."},
-                {"role": "user", "content": prompt}
-            ],
-            text_format=GevalRank,
-        )
-        return response.output_parsed
\ No newline at end of file
+    async def stream_async(self, prompt: str, instructions: str = None,
+                           operation: str = "generate") -> AsyncIterator[str]:
+        """Yield a free-text reply in pieces as it is generated (see `GeminiLLM.stream_async`)."""
+        cache_prompt = f"{instructions or ''}\x1ftext\x1f{prompt}"
+        start = time.perf_counter()
+        with track_call(self.provider, self.model_name, operation) as call:
+            cached = self.cache.get(self.provider, self.model_name, None, cache_prompt)
+            if cached is not None:
+                call.cache_hit = True
+                yield cached
+                return
+            messages = [{"role": "system", "content": instructions}] if instructions else []
+            messages.append({"role": "user", "content": prompt})
+            def attempt():
+                call.attempts += 1
+                return self.client.responses.create(model=self.model_name, input=messages, stream=True)
+            stream = await call_with_retries_async(attempt, policy=self.retry_policy, limiter=self.limiter,
+                                                   label="GPT-5")
+            parts = []
+            async with stream:
+                async for event in stream:
+                    if event.type == "response.output_text.delta" and event.delta:
+                        if call.ttft_seconds is None:
+                            call.ttft_seconds = time.perf_counter() - start
+                        parts.append(event.delta)
+                        yield event.delta
+                    elif event.type == "response.completed":
+                        call.set_usage(event.response)
+                    elif event.type in ("response.failed", "error"):
+                        raise RuntimeError(f"GPT-5 stream failed: {event}")
+        self.cache.set(self.provider, self.model_name, None, cache_prompt, "".join(parts).strip())
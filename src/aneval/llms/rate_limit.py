@@ -0,0 +1,110 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+# Floor the adaptive rate never drops below, and the multiplicative cut applied on every throttle
+MIN_RPM = float(os.getenv("LLM_MIN_RPM", 6))
+THROTTLE_DECREASE = 0.5
+
+class RateLimiter:
+    """Adaptive token bucket (GCRA) for one provider/model.
+
+    `max_rpm` is the configured budget (0 = no budget). The effective `rpm` is cut in half on every
+    throttle and raised additively on every success, back up to `max_rpm`. With no budget the limiter
+    is open until the first throttle, then learns a rate from the requests it has actually seen.
+    """
+
+    def __init__(self, rpm: float = 0, burst: int = 1, min_rpm: float = MIN_RPM):
+        self.max_rpm = rpm or 0
+        self.rpm = rpm or 0
+        self.burst = max(1, burst)
+        self.min_rpm = min_rpm
+        self.throttles = 0
+        self._last_decrease = float("-inf")
+        self._throttle_rpm = 0.0  # rate in effect when the last throttle hit
+        self._tat = 0.0  # theoretical arrival time of the next request
+        self._recent = deque()  # request start times over the last minute
+        self._lock = threading.Lock()
+
+    @property
+    def interval(self) -> float:
+        return 60.0 / self.rpm if self.rpm and self.rpm > 0 else 0.0
+
+    def set_budget(self, rpm: float) -> None:
+        with self._lock:
+            self.max_rpm = rpm or 0
+            self.rpm = rpm or 0
+
+    def _observed_rpm(self, now: float) -> float:
+        # Requests per minute actually sent, measured over the span seen so far (at least one second)
+        while self._recent and now - self._recent[0] > 60:
+            self._recent.popleft()
+        if not self._recent:
+            return 0.0
+        return len(self._recent) * 60.0 / max(1.0, now - self._recent[0])
+
+    def _reserve(self) -> float:
+        # Reserve the next conforming slot and return how long the caller has to wait for it
+        with self._lock:
+            now = time.monotonic()
+            interval = self.interval
+            start = max(now, self._tat - (self.burst - 1) * interval)
+            self._tat = max(self._tat, start) + interval
+            self._recent.append(start)
+            return start - now
+
+    async def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """Multiplicative decrease, and hold every request until the server's retry-after has passed.
+
+        A burst of in-flight requests all failing together counts as one throttle: the rate is cut
+        at most once per cooldown (the retry-after hint, or one second).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.throttles += 1
+            if retry_after:
+                self._tat = max(self._tat, now + retry_after)
+            if now - self._last_decrease < max(1.0, retry_after or 0):
+                return
+            current = self.rpm or self._observed_rpm(now) or self.min_rpm
+            self._throttle_rpm = current
+            self.rpm = max(self.min_rpm, current * THROTTLE_DECREASE)
+            self._last_decrease = now
+
+    def on_success(self) -> None:
+        """Additive increase of ~5% of the budget (or of the last throttled rate) per second of traffic."""
+        with self._lock:
+            if not self.rpm or self.rpm == self.max_rpm:
+                return
+            step = max(1.0, 0.05 * (self.max_rpm or self._throttle_rpm)) * self.interval
+            self.rpm = min(self.max_rpm, self.rpm + step) if self.max_rpm else self.rpm + step
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider: str, model: str = "", rpm: Optional[float] = None) -> RateLimiter:
+    """Return the process-wide limiter for a provider/model, setting its budget if a positive `rpm` is given.
+
+    None or 0 leaves an existing limiter as it is, so a new run keeps the rate it learned from throttling.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get((provider, model))
+        if limiter is None:
+            limiter = _limiters[(provider, model)] = RateLimiter(rpm or 0)
+            return limiter
+    if rpm and rpm != limiter.max_rpm:
+        limiter.set_budget(rpm)
+    return limiter
@@ -0,0 +1,162 @@
+"""Process-wide registry of long-lived, keep-alive LLM clients.
+
+Async clients hold connection pools bound to the event loop they were first used on, so the registry
+owns one background event loop and runs every coroutine that uses its clients there:
+
+    registry = get_llm_registry()
+    results = registry.run(run_geval_parallel(registry.openai(), document, summary))
+
+`run` replaces `asyncio.run`, which would create (and close) a new loop, and with it new
+connections and TLS handshakes, on every call.
+"""
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import hashlib
+import os
+import threading
+from typing import Callable, Dict, Tuple
+from dotenv import load_dotenv
+from aneval.llms.gemini import GEMINI_DEFAULT_MODEL, GEMINI_DEFAULT_TEMP, GeminiLLM
+from aneval.llms.gpt5o import GPT_GEVAL_DEFAULT_MODEL, GPT5oLLM
+from aneval.llms.voyage import VOYAGE_DEFAULT_MODEL, VoyageEmbedder
+
+load_dotenv()  # Load variables from .env
+
+# Max connections (OpenAI) / in-flight requests (Gemini) per pooled client
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", 16))
+# Idle connections are kept open this long so they survive the gap between evaluations
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", 90))
+
+def _key_id(api_key: str) -> str:
+    # Keys are only used to tell clients apart; never keep them in the registry keys themselves
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+class LLMRegistry:
+    def __init__(self, pool_size: int = None, keepalive_seconds: float = None):
+        self.pool_size = pool_size or LLM_POOL_SIZE
+        self.keepalive_seconds = LLM_KEEPALIVE_SECONDS if keepalive_seconds is None else keepalive_seconds
+        self._clients: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._gemini_key = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="aneval-llm-loop", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro, timeout: float = None):
+        """Run `coro` on the registry loop and block until it finishes (safe from any thread).
+
+        The caller's context variables are carried over, so e.g. telemetry `collect_calls()` still works.
+        """
+        loop = self.loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            raise RuntimeError("LLMRegistry.run() called from its own event loop; await the coroutine instead")
+        context = contextvars.copy_context()
+        future = concurrent.futures.Future()
+
+        def start():
+            task = loop.create_task(coro, context=context)
+            def done(t):
+                if t.cancelled():
+                    future.cancel()
+                elif t.exception() is not None:
+                    future.set_exception(t.exception())
+                else:
+                    future.set_result(t.result())
+            task.add_done_callback(done)
+
+        loop.call_soon_threadsafe(start)
+        return future.result(timeout)
+
+    def _get(self, key: Tuple, factory: Callable):
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = factory()
+            return client
+
+    def gemini(self, model_name: str = None, api_key: str = None, temperature: float = None) -> GeminiLLM:
+        api_key = api_key or os.getenv("GEMINI_API_KEY")
+        model_name = model_name or os.getenv("GEMINI_LLM", GEMINI_DEFAULT_MODEL)
+        temperature = float(os.getenv("GEMINI_TEMP", GEMINI_DEFAULT_TEMP)) if temperature is None else temperature
+
+        def factory():
+            return GeminiLLM(api_key, model_name, temperature, model=self._gemini_model(api_key, model_name),
+                             max_concurrency=self.pool_size)
+        return self._get((GeminiLLM.provider, model_name, _key_id(api_key), temperature), factory)
+
+    def _gemini_model(self, api_key: str, model_name: str):
+        import google.generativeai as genai
+        # genai.configure is process-global: configure once, and only again if the key actually changes
+        if api_key != self._gemini_key:
+            if self._gemini_key is not None:
+                print("Warning: google-generativeai supports one API key per process; switching keys.")
+            genai.configure(api_key=api_key)
+            self._gemini_key = api_key
+        return genai.GenerativeModel(model_name)
+
+    def openai(self, model_name: str = None, api_key: str = None) -> GPT5oLLM:
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        model_name = model_name or os.getenv("GPT_GEVAL_LLM", GPT_GEVAL_DEFAULT_MODEL)
+
+        def factory():
+            return GPT5oLLM(api_key, model_name, client=self._openai_client(api_key))
+        return self._get((GPT5oLLM.provider, model_name, _key_id(api_key)), factory)
+
+    def _openai_client(self, api_key: str):
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size,
+                              keepalive_expiry=self.keepalive_seconds)
+        # Retries are handled by aneval.llms.retry so they share the adaptive limiter
+        return AsyncOpenAI(api_key=api_key, max_retries=0, http_client=DefaultAsyncHttpxClient(limits=limits))
+
+    def voyage(self, model_name: str = None, api_key: str = None) -> VoyageEmbedder:
+        api_key = api_key or os.getenv("VOYAGE_API_KEY")
+        model_name = model_name or os.getenv("VOYAGE_EMBED_MODEL", VOYAGE_DEFAULT_MODEL)
+        return self._get((VoyageEmbedder.provider, model_name, _key_id(api_key)),
+                         lambda: VoyageEmbedder(api_key, model_name))
+
+    def close(self) -> None:
+        """Close pooled connections and stop the background loop."""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+            loop, self._loop = self._loop, None
+        if loop is None or loop.is_closed():
+            return
+        async def close_clients():
+            for llm in clients:
+                close = getattr(getattr(llm, "client", None), "close", None)
+                if close is not None:
+                    await close()
+        try:
+            asyncio.run_coroutine_threadsafe(close_clients(), loop).result(timeout=5)
+        except Exception as e:
+            print(f"Error closing LLM clients: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_llm_registry() -> LLMRegistry:
+    """Process-wide registry, shared by every Streamlit session and script in this process."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMRegistry()
+            atexit.register(_registry.close)
+        return _registry
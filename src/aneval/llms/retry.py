@@ -0,0 +1,128 @@
+import asyncio
+import os
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from aneval.llms.rate_limit import RateLimiter
+
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", 4))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", 1.0))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", 60.0))
+
+THROTTLE_STATUS = 429
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+# Transport-level failures the SDKs raise without an HTTP status
+RETRYABLE_ERROR_NAMES = ("Timeout", "Connection", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError")
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = None, base_delay: float = None, max_delay: float = None):
+        self.max_attempts = max_attempts or LLM_MAX_ATTEMPTS
+        self.base_delay = LLM_RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = LLM_RETRY_MAX_DELAY if max_delay is None else max_delay
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff for 1-based `attempt`; a server retry-after hint is a floor."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+def error_status(exc: BaseException) -> Optional[int]:
+    """HTTP status of an SDK or `requests` error (openai: status_code, google api_core: code, voyageai: http_status)."""
+    for candidate in (getattr(exc, "status_code", None), getattr(exc, "code", None), getattr(exc, "http_status", None),
+                      getattr(getattr(exc, "response", None), "status_code", None)):
+        try:
+            status = int(candidate)
+        except (TypeError, ValueError):
+            continue
+        if 100 <= status < 600:
+            return status
+    return None
+
+def _parse_retry_after(value) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Server hint for how long to wait: Retry-After / retry-after-ms headers or a Gemini `retry_delay`."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is not None:
+        if headers.get("retry-after-ms") is not None:
+            ms = _parse_retry_after(headers.get("retry-after-ms"))
+            if ms is not None:
+                return ms / 1000
+        seconds = _parse_retry_after(headers.get("retry-after"))
+        if seconds is not None:
+            return seconds
+    match = re.search(r"retry_delay\s*\{\s*seconds:\s*(\d+)|retry in ([\d.]+)\s*s", str(exc), flags=re.IGNORECASE)
+    if match:
+        return float(match.group(1) or match.group(2))
+    return None
+
+def is_throttle(exc: BaseException) -> bool:
+    return error_status(exc) == THROTTLE_STATUS or type(exc).__name__ in ("RateLimitError", "ResourceExhausted")
+
+def is_retryable(exc: BaseException) -> bool:
+    """Throttling, server errors and transport failures are retryable; auth, validation and 4xx are fatal."""
+    if is_throttle(exc):
+        return True
+    status = error_status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    if isinstance(exc, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+        return True
+    return any(name in type(exc).__name__ for name in RETRYABLE_ERROR_NAMES)
+
+async def call_with_retries_async(fn, policy: RetryPolicy = None, limiter: RateLimiter = None, label: str = ""):
+    """Await `fn()` under `limiter`, retrying retryable errors with backoff and feeding throttles back to it."""
+    policy = policy or RetryPolicy()
+    for attempt in range(1, policy.max_attempts + 1):
+        if limiter is not None:
+            await limiter.acquire()
+        try:
+            result = await fn()
+        except Exception as e:
+            retry_after = retry_after_seconds(e)
+            if limiter is not None and is_throttle(e):
+                limiter.on_throttle(retry_after)
+            if attempt == policy.max_attempts or not is_retryable(e):
+                raise
+            delay = policy.backoff(attempt, retry_after)
+            print(f"    {label or 'LLM call'} attempt {attempt} failed ({e.__class__.__name__}); retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
+        if limiter is not None:
+            limiter.on_success()
+        return result
+
+def call_with_retries(fn, policy: RetryPolicy = None, limiter: RateLimiter = None, label: str = ""):
+    """Blocking variant of `call_with_retries_async`."""
+    policy = policy or RetryPolicy()
+    for attempt in range(1, policy.max_attempts + 1):
+        if limiter is not None:
+            limiter.acquire_sync()
+        try:
+            result = fn()
+        except Exception as e:
+            retry_after = retry_after_seconds(e)
+            if limiter is not None and is_throttle(e):
+                limiter.on_throttle(retry_after)
+            if attempt == policy.max_attempts or not is_retryable(e):
+                raise
+            delay = policy.backoff(attempt, retry_after)
+            print(f"    {label or 'LLM call'} attempt {attempt} failed ({e.__class__.__name__}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        if limiter is not None:
+            limiter.on_success()
+        return result
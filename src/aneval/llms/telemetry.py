@@ -0,0 +1,271 @@
+"""Per-call LLM telemetry: latency, time to first token, token usage, estimated cost, cache hits and retries.
+
+Every call made by the LLM clients is recorded once, as a line in a JSONL sink (`LLM_TELEMETRY_PATH`)
+and in in-process counters that render as Prometheus text. `collect_calls()` captures the records of
+one evaluation so the app can show where its time and money went.
+
+    python -m aneval.llms.telemetry .aneval_cache/llm_calls.jsonl > llm_calls.prom
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()  # Load variables from .env
+
+LLM_TELEMETRY_PATH = os.getenv("LLM_TELEMETRY_PATH", ".aneval_cache/llm_calls.jsonl")
+LLM_TELEMETRY_ENABLED = os.getenv("LLM_TELEMETRY_ENABLED", "1").lower() not in ("0", "false", "no", "")
+# Optional Prometheus textfile (node_exporter textfile collector) rewritten after every call
+LLM_METRICS_PATH = os.getenv("LLM_METRICS_PATH")
+
+# USD per million (input, output) tokens; extend or override with LLM_PRICES='{"model": [in, out]}'
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gpt-5": (1.25, 10.00),
+    "gpt-5-mini": (0.25, 2.00),
+    "voyage-3.5": (0.06, 0.0),
+    "voyage-3.5-lite": (0.02, 0.0),
+}
+MODEL_PRICES.update({k: tuple(v) for k, v in json.loads(os.getenv("LLM_PRICES", "{}")).items()})
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def model_price(model: str) -> Optional[Tuple[float, float]]:
+    # Dated snapshots (gpt-5-2025-08-07) are priced like their base model
+    if model in MODEL_PRICES:
+        return MODEL_PRICES[model]
+    matches = [name for name in MODEL_PRICES if model.startswith(name)]
+    return MODEL_PRICES[max(matches, key=len)] if matches else None
+
+def estimate_cost(model: str, input_tokens: Optional[int], output_tokens: Optional[int]) -> Optional[float]:
+    price = model_price(model)
+    if price is None or input_tokens is None:
+        return None
+    return (input_tokens * price[0] + (output_tokens or 0) * price[1]) / 1_000_000
+
+def usage_tokens(response) -> Tuple[Optional[int], Optional[int]]:
+    """(input, output) tokens from a Gemini `usage_metadata` or an OpenAI `usage` block."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        return getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        return getattr(usage, "input_tokens", None), getattr(usage, "output_tokens", None)
+    return None, None
+
+@dataclass
+class CallRecord:
+    provider: str
+    model: str
+    operation: str
+    timestamp: float = field(default_factory=time.time)
+    latency_seconds: float = 0.0
+    # Set by streaming calls at their first chunk; otherwise the whole reply arrives at once and it is the latency
+    ttft_seconds: Optional[float] = None
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    cost_usd: Optional[float] = None
+    cache_hit: bool = False
+    attempts: int = 0
+    retries: int = 0
+    error: Optional[str] = None
+    # The caller stopped waiting (closed a stream early or cancelled the task); not a failure
+    cancelled: bool = False
+
+    def set_usage(self, response) -> None:
+        self.input_tokens, self.output_tokens = usage_tokens(response)
+        self.cost_usd = estimate_cost(self.model, self.input_tokens, self.output_tokens)
+
+class Telemetry:
+    def __init__(self, path: str = None, enabled: bool = None, metrics_path: str = None):
+        self.path = path or LLM_TELEMETRY_PATH
+        self.enabled = LLM_TELEMETRY_ENABLED if enabled is None else enabled
+        self.metrics_path = metrics_path if metrics_path is not None else LLM_METRICS_PATH
+        self._lock = threading.Lock()
+        self._sink = None
+        self._counters = defaultdict(float)
+        # (metric, labels) -> bucket counts and sum
+        self._histograms = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+        self._sums = defaultdict(float)
+
+    def record(self, call: CallRecord) -> None:
+        for records in _collectors.get():
+            records.append(call)
+        if not self.enabled:
+            return
+        with self._lock:
+            self._aggregate(call)
+            if self._sink is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._sink = open(self.path, "a", encoding="utf-8")
+            self._sink.write(json.dumps(asdict(call)) + "\n")
+            self._sink.flush()
+            if self.metrics_path:
+                tmp = f"{self.metrics_path}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(self._render())
+                os.replace(tmp, self.metrics_path)
+
+    def _aggregate(self, call: CallRecord) -> None:
+        labels = (call.provider, call.model, call.operation)
+        status = "error" if call.error else "cancelled" if call.cancelled else "cache_hit" if call.cache_hit else "ok"
+        self._counters[("llm_calls_total", labels + (status,))] += 1
+        self._counters[("llm_retries_total", labels)] += call.retries
+        self._counters[("llm_input_tokens_total", labels)] += call.input_tokens or 0
+        self._counters[("llm_output_tokens_total", labels)] += call.output_tokens or 0
+        self._counters[("llm_cost_usd_total", labels)] += call.cost_usd or 0.0
+        # A cut-short call's latency is how long the caller waited, not how long the reply takes
+        if not call.cache_hit and not call.cancelled:
+            self._observe("llm_latency_seconds", labels, call.latency_seconds)
+            if call.ttft_seconds is not None:
+                self._observe("llm_ttft_seconds", labels, call.ttft_seconds)
+
+    def _observe(self, name: str, labels: tuple, value: float) -> None:
+        buckets = self._histograms[(name, labels)]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                buckets[i] += 1
+        buckets[-1] += 1
+        self._sums[(name, labels)] += value
+
+    def _render(self) -> str:
+        lines = []
+        names = sorted({name for name, _ in self._counters})
+        for name in names:
+            lines.append(f"# TYPE {name} counter")
+            for (metric, labels), value in sorted(self._counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{{{_labels(labels, name == 'llm_calls_total')}}} {value:g}")
+        for name in sorted({name for name, _ in self._histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), buckets in sorted(self._histograms.items()):
+                if metric != name:
+                    continue
+                base = _labels(labels)
+                for bound, count in zip(LATENCY_BUCKETS, buckets):
+                    lines.append(f'{name}_bucket{{{base},le="{bound:g}"}} {count}')
+                lines.append(f'{name}_bucket{{{base},le="+Inf"}} {buckets[-1]}')
+                lines.append(f"{name}_sum{{{base}}} {self._sums[(name, labels)]:g}")
+                lines.append(f"{name}_count{{{base}}} {buckets[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            return self._render()
+
+def _labels(values, with_status: bool = False) -> str:
+    names = ("provider", "model", "operation", "status") if with_status else ("provider", "model", "operation")
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+_collectors: ContextVar[tuple] = ContextVar("llm_call_collectors", default=())
+
+def get_telemetry() -> Telemetry:
+    """Process-wide telemetry sink configured from the environment."""
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry()
+        return _telemetry
+
+@contextmanager
+def telemetry_disabled():
+    """Keep the calls made inside this block out of the process-wide sink and counters.
+
+    For the offline benchmarks: fake-backend calls must not mix with real ones in LLM_TELEMETRY_PATH and the
+    Prometheus export. `collect_calls()` still sees them.
+    """
+    global _telemetry
+    with _telemetry_lock:
+        previous, _telemetry = _telemetry, Telemetry(enabled=False)
+    try:
+        yield
+    finally:
+        with _telemetry_lock:
+            _telemetry = previous
+
+@contextmanager
+def track_call(provider: str, model: str, operation: str, telemetry: Telemetry = None):
+    """Time one logical LLM call (cache lookup and all retries) and record it on exit, failed or not.
+
+    A stream closed early (GeneratorExit) or a cancelled task is recorded as cancelled, not as an error.
+    """
+    call = CallRecord(provider, model, operation)
+    start = time.perf_counter()
+    try:
+        yield call
+    except (GeneratorExit, asyncio.CancelledError):
+        call.cancelled = True
+        raise
+    except BaseException as e:
+        call.error = e.__class__.__name__
+        raise
+    finally:
+        call.latency_seconds = time.perf_counter() - start
+        if call.ttft_seconds is None and call.error is None and not call.cancelled:
+            call.ttft_seconds = call.latency_seconds
+        call.retries = max(0, call.attempts - 1)
+        (telemetry or get_telemetry()).record(call)
+
+@contextmanager
+def collect_calls():
+    """Collect the `CallRecord`s of every LLM call made inside this block (including its asyncio tasks)."""
+    records: List[CallRecord] = []
+    token = _collectors.set(_collectors.get() + (records,))
+    try:
+        yield records
+    finally:
+        _collectors.reset(token)
+
+def summarize_calls(records: List[CallRecord]) -> List[dict]:
+    """One row per provider/model/operation: calls, cache hits, retries, errors, cancellations, tokens, cost, latency.
+
+    `mean_ttft_seconds` is over the calls that were not cache hits (None if there were none).
+    """
+    rows, ttfts = {}, defaultdict(list)
+    for call in records:
+        key = (call.provider, call.model, call.operation)
+        row = rows.setdefault(key, {
+            "provider": call.provider, "model": call.model, "operation": call.operation, "calls": 0,
+            "cache_hits": 0, "retries": 0, "errors": 0, "cancelled": 0, "input_tokens": 0, "output_tokens": 0,
+            "cost_usd": 0.0, "latency_seconds": 0.0,
+        })
+        row["calls"] += 1
+        row["cache_hits"] += call.cache_hit
+        row["retries"] += call.retries
+        row["errors"] += call.error is not None
+        row["cancelled"] += call.cancelled
+        row["input_tokens"] += call.input_tokens or 0
+        row["output_tokens"] += call.output_tokens or 0
+        row["cost_usd"] += call.cost_usd or 0.0
+        row["latency_seconds"] += call.latency_seconds
+        if not call.cache_hit and call.ttft_seconds is not None:
+            ttfts[key].append(call.ttft_seconds)
+    for key, row in rows.items():
+        row["mean_ttft_seconds"] = sum(ttfts[key]) / len(ttfts[key]) if ttfts[key] else None
+    return list(rows.values())
+
+def export_prometheus(jsonl_path: str) -> str:
+    """Aggregate a JSONL sink (possibly written by several processes) into Prometheus text."""
+    telemetry = Telemetry(enabled=False)
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                telemetry._aggregate(CallRecord(**json.loads(line)))
+            except (json.JSONDecodeError, TypeError):
+                continue  # torn last line from a crashed writer
+    return telemetry.prometheus_text()
+
+if __name__ == "__main__":
+    import sys
+    print(export_prometheus(sys.argv[1] if len(sys.argv) > 1 else LLM_TELEMETRY_PATH), end="")
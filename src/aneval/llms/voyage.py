@@ -0,0 +1,66 @@
+import asyncio
+import os
+from typing import List, Sequence
+import numpy as np
+from aneval.llms.embedding_cache import EmbeddingCache, get_embedding_cache
+from aneval.llms.rate_limit import get_rate_limiter
+from aneval.llms.retry import RetryPolicy, call_with_retries_async
+from aneval.llms.telemetry import estimate_cost, track_call
+
+VOYAGE_DEFAULT_MODEL = "voyage-3.5-lite"
+# Texts per embedding request (the API accepts up to 1000, with a per-request token limit)
+VOYAGE_BATCH_SIZE = int(os.getenv("VOYAGE_BATCH_SIZE", 128))
+
+class VoyageEmbedder:
+    provider = "voyage"
+
+    def __init__(self, api_key: str = None, model_name: str = None, client=None, cache: EmbeddingCache = None,
+                 retry_policy: RetryPolicy = None, batch_size: int = None):
+        if model_name is None:
+            model_name = os.getenv("VOYAGE_EMBED_MODEL", VOYAGE_DEFAULT_MODEL)
+        if client is None:
+            import voyageai
+            # Retries are handled by aneval.llms.retry so they share the adaptive limiter
+            client = voyageai.AsyncClient(api_key=api_key or os.getenv("VOYAGE_API_KEY"), max_retries=0)
+        self.client = client
+        self.model_name = model_name
+        self.cache = cache if cache is not None else get_embedding_cache()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.batch_size = batch_size or VOYAGE_BATCH_SIZE
+        self.limiter = get_rate_limiter(self.provider, self.model_name)
+
+    async def embed_async(self, texts: Sequence[str], input_type: str = "document",
+                          operation: str = "embed") -> np.ndarray:
+        """Unit-length embeddings, shape (len(texts), dim).
+
+        Cached texts are not sent again; the rest are deduplicated and sent in concurrent batches.
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        vectors = self.cache.get_many(self.provider, self.model_name, input_type, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if not missing:
+            with track_call(self.provider, self.model_name, operation) as call:
+                call.cache_hit = True
+        else:
+            batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+            results = await asyncio.gather(*(self._embed_batch(b, input_type, operation) for b in batches))
+            fresh = [v for batch in results for v in batch]
+            self.cache.set_many(self.provider, self.model_name, input_type, missing, fresh)
+            by_text = dict(zip(missing, fresh))
+            vectors = [v if v is not None else by_text[t] for t, v in zip(texts, vectors)]
+        matrix = np.stack(vectors).astype(np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    async def _embed_batch(self, texts: List[str], input_type: str, operation: str) -> List[np.ndarray]:
+        with track_call(self.provider, self.model_name, operation) as call:
+            def attempt():
+                call.attempts += 1
+                return self.client.embed(texts, model=self.model_name, input_type=input_type)
+            response = await call_with_retries_async(attempt, policy=self.retry_policy, limiter=self.limiter,
+                                                     label="Voyage")
+            call.input_tokens = getattr(response, "total_tokens", None)
+            call.cost_usd = estimate_cost(self.model_name, call.input_tokens, 0)
+        return [np.asarray(e, dtype=np.float32) for e in response.embeddings]
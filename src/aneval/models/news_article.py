@@ -1,7 +1,10 @@
+from typing import Optional
 from pydantic import BaseModel
 
 class NewsArticle(BaseModel):
     title: str
     link: str
     ticker: str
-    full_text: str
\ No newline at end of file
+    full_text: str
+    # Shared by near-duplicate articles (see news_service.dedupe_articles)
+    cluster_id: Optional[str] = None
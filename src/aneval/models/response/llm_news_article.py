@@ -1,8 +1,13 @@
+from typing import Optional
 from pydantic import BaseModel
 
+# Written as the summary of an article every summarization attempt failed for
+FAILED_SUMMARY = "AI could not generate"
+
 class LLMNewsArticle(BaseModel):
     title: str
     link: str
     ticker: str
     full_text: str
-    summary: str
\ No newline at end of file
+    summary: str
+    cluster_id: Optional[str] = None
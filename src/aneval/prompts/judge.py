@@ -7,6 +7,14 @@ LLM_JUDGE_PROMPT = (
     "If the answer is not present in the context, state \"Not specified in the context.\""
 )
 
+LLM_JUDGE_DEFAULT_QUESTIONS = [
+    "What is the main event or announcement described in the article?",
+    "Which companies or key stakeholders are most affected, and how?",
+    "What are the short-term and long-term implications for investors?",
+    "Are there any notable risks, controversies, or uncertainties mentioned?",
+    "What is the overall sentiment or outlook expressed in the article?",
+]
+
 LLM_JUDGE_COMPARE_PROMPT = """
 You are an expert financial news evaluator.
 
@@ -31,3 +39,11 @@ Summary Answers:
 Article Answers:
 {article_answers}
 """
+
+LLM_JUDGE_BATCH_INSTRUCTIONS = """
+Answer every question below using only the context above, following the same rules for each answer.
+Return a JSON object of the form {{"answers": ["<answer 1>", "<answer 2>", ...]}} with exactly {count} answers, in the same order as the questions.
+
+Questions:
+{questions}
+"""
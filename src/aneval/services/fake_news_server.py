@@ -0,0 +1,173 @@
+import hashlib
+import random
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List
+from xml.sax.saxutils import escape
+
+WORDS = ("shares revenue guidance analysts quarter margin growth demand outlook investors chip cloud "
+         "subscribers earnings forecast market rally dividend buyback segment pricing supply").split()
+
+class FakeNewsServer:
+    """Local HTTP stand-in for a news feed and its article pages, for offline ingestion runs.
+
+    `GET /rss/<ticker>` returns an RSS feed, newest item first, with an ETag and a Last-Modified header; a
+    request whose If-None-Match or If-Modified-Since still matches gets an empty 304. `GET /news/<ticker>/<n>`
+    returns an HTML article page after sleeping `latency` seconds. `publish` adds items to a feed; with
+    `copy_of`, their pages are near-copies of an earlier item's (the same story syndicated under a new URL).
+
+        with FakeNewsServer(["AAPL", "MSFT"], items=10) as server:
+            ingest(["AAPL", "MSFT"], path, feed_url=server.feed_url)
+            server.publish("AAPL", 2)
+    """
+
+    def __init__(self, tickers: Iterable[str] = ("AAPL",), items: int = 10, latency: float = 0.05,
+                 paragraphs: int = 6):
+        self.latency = latency
+        self.paragraphs = paragraphs
+        # ticker -> [(n, published_at)], oldest first
+        self.feeds: Dict[str, List[tuple]] = {}
+        # (ticker, n) -> the item whose story it repeats
+        self.copies: Dict[tuple, int] = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.pages = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        for ticker in tickers:
+            self.publish(ticker, items, published_at=time.time() - 3600)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def feed_url(self) -> str:
+        """Feed URL template with a `{ticker}` placeholder, as in NEWS_FEED_URL."""
+        return self.base_url + "/rss/{ticker}"
+
+    def publish(self, ticker: str, count: int = 1, published_at: float = None, copy_of: int = None) -> None:
+        """Add `count` new items to the ticker's feed, near-copies of item `copy_of` if given."""
+        with self._lock:
+            feed = self.feeds.setdefault(ticker, [])
+            # Whole seconds: Last-Modified cannot say anything finer
+            stamp = int(published_at if published_at is not None else time.time())
+            for _ in range(count):
+                if copy_of is not None:
+                    self.copies[(ticker, len(feed))] = copy_of
+                feed.append((len(feed), stamp))
+
+    def page_text(self, ticker: str, n: int) -> List[str]:
+        source = self.copies.get((ticker, n), n)
+        rng = random.Random(f"{ticker}-{source}")
+        paragraphs = [f"{ticker} story {source}: " + " ".join(rng.choice(WORDS) for _ in range(40)) + "."
+                      for _ in range(self.paragraphs)]
+        if source != n:
+            paragraphs.append(f"Republished as story {n}.")
+        return paragraphs
+
+    def _feed(self, ticker: str):
+        items = list(reversed(self.feeds.get(ticker, [])))
+        body = "".join(
+            f"<item><title>{escape(f'{ticker} story {n}')}</title><link>{self.base_url}/news/{ticker}/{n}</link>"
+            f"<pubDate>{formatdate(stamp, usegmt=True)}</pubDate></item>"
+            for n, stamp in items
+        )
+        xml = f'<?xml version="1.0"?><rss version="2.0"><channel><title>{ticker}</title>{body}</channel></rss>'
+        etag = '"' + hashlib.sha1(repr(items).encode("utf-8")).hexdigest()[:16] + '"'
+        last_modified = max((stamp for _, stamp in items), default=0)
+        return xml.encode("utf-8"), etag, last_modified
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                parts = self.path.strip("/").split("/")
+                if len(parts) == 2 and parts[0] == "rss":
+                    self._feed(parts[1])
+                elif len(parts) == 3 and parts[0] == "news" and parts[2].isdigit():
+                    self._page(parts[1], int(parts[2]))
+                else:
+                    self._reply(404, b"not found", "text/plain")
+
+            def _feed(self, ticker):
+                with server._lock:
+                    known = ticker in server.feeds
+                    body, etag, last_modified = server._feed(ticker)
+                if not known:
+                    self._reply(404, b"unknown ticker", "text/plain")
+                    return
+                headers = {"ETag": etag, "Last-Modified": formatdate(last_modified, usegmt=True)}
+                if_none_match = self.headers.get("If-None-Match")
+                if_modified_since = self.headers.get("If-Modified-Since")
+                if if_none_match is not None:
+                    unchanged = if_none_match == etag
+                elif if_modified_since is not None:
+                    try:
+                        unchanged = parsedate_to_datetime(if_modified_since).timestamp() >= last_modified
+                    except (TypeError, ValueError):
+                        unchanged = False
+                else:
+                    unchanged = False
+                if unchanged:
+                    with server._lock:
+                        server.not_modified += 1
+                    self._reply(304, b"", None, headers)
+                    return
+                self._reply(200, body, "application/rss+xml", headers)
+
+            def _page(self, ticker, n):
+                with server._lock:
+                    known = n < len(server.feeds.get(ticker, []))
+                if not known:
+                    self._reply(404, b"not found", "text/plain")
+                    return
+                time.sleep(server.latency)
+                paragraphs = "".join(f"<p>{escape(p)}</p>" for p in server.page_text(ticker, n))
+                html = (f"<html><head><title>{ticker} story {n}</title><script>var ads = 1;</script></head><body>"
+                        f"<nav><p>Markets | News</p></nav><article><h1>{ticker} story {n}</h1>{paragraphs}</article>"
+                        f"<footer><p>Copyright</p></footer></body></html>")
+                with server._lock:
+                    server.pages += 1
+                self._reply(200, html.encode("utf-8"), "text/html; charset=utf-8")
+
+            def _reply(self, status, payload, content_type, headers=None):
+                self.send_response(status)
+                if content_type:
+                    self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+                with server._lock:
+                    server.bytes_sent += len(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeNewsServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,150 @@
+import asyncio
+import math
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+from aneval.prompts.summeval import (
+    COHERENCE_PROMPT,
+    CONSISTENCY_PROMPT,
+    FLUENCY_PROMPT,
+    RELEVANCE_PROMPT,
+)
+from aneval.services.retrieval import compact_context, split_passages
+
+load_dotenv()
+
+GEVAL_METRICS = {
+    "Coherence": COHERENCE_PROMPT,
+    "Consistency": CONSISTENCY_PROMPT,
+    "Fluency": FLUENCY_PROMPT,
+    "Relevance": RELEVANCE_PROMPT,
+}
+
+# Sampled Geval: up to GEVAL_SAMPLES draws per metric, stopping once the 95% confidence interval of the
+# mean is at most GEVAL_TOLERANCE wide on either side (never before GEVAL_MIN_SAMPLES draws). Even when every
+# draw agrees, that takes ceil(Z_95 / GEVAL_TOLERANCE) draws: 7 at 0.3, so 8 in waves of 4.
+GEVAL_SAMPLES = int(os.getenv("GEVAL_SAMPLES", 20))
+GEVAL_MIN_SAMPLES = int(os.getenv("GEVAL_MIN_SAMPLES", 4))
+GEVAL_SAMPLE_WAVE = int(os.getenv("GEVAL_SAMPLE_WAVE", 4))
+GEVAL_TOLERANCE = float(os.getenv("GEVAL_TOLERANCE", 0.3))
+Z_95 = 1.96
+
+# Passages at the start of the article that stand for its main topic when compacting the Geval document
+GEVAL_LEAD_PASSAGES = 2
+
+def fill_geval_prompt(prompt_template: str, document: str, summary: str) -> str:
+    return prompt_template.replace("{{Document}}", document).replace("{{Summary}}", summary)
+
+def geval_document(document: str, context_budget: Optional[int] = None) -> str:
+    """The document as sent to the grader: with a token budget, the article's lead and the passages closest to it.
+
+    The summary is not used to pick passages: the grader would then only see what the summary already covers,
+    which inflates Consistency and hides the key points Relevance should penalise it for missing.
+    """
+    lead = " ".join(split_passages(document)[:GEVAL_LEAD_PASSAGES])
+    return compact_context(document, lead, context_budget)
+
+def geval_prompts(document: str, summary: str, context_budget: Optional[int] = None) -> Dict[str, str]:
+    document = geval_document(document, context_budget)
+    return {metric: fill_geval_prompt(template, document, summary) for metric, template in GEVAL_METRICS.items()}
+
+async def run_geval_parallel(llm, document: str, summary: str, context_budget: Optional[int] = None) -> dict:
+    """Score one summary on all four Geval metrics concurrently."""
+    prompts = geval_prompts(document, summary, context_budget)
+    results = await asyncio.gather(*(llm.answer_prompt_async(p) for p in prompts.values()))
+    return dict(zip(prompts, results))
+
+@dataclass
+class GevalEstimate:
+    """Sampled ranks of one metric for one summary, against a fixed budget of `max_samples` calls.
+
+    The mean of the samples estimates G-Eval's probability-weighted score, the sum of p(rank) * rank.
+    """
+    ranks: List[int]
+    max_samples: int
+
+    @property
+    def samples(self) -> int:
+        return len(self.ranks)
+
+    @property
+    def mean(self) -> float:
+        return float(np.mean(self.ranks))
+
+    @property
+    def rank(self) -> float:
+        # Same attribute as GevalRank, so callers that store or show a rank take the estimate as is
+        return self.mean
+
+    @property
+    def half_width(self) -> float:
+        """Half-width of the normal-approximation 95% confidence interval of the mean.
+
+        The variance is never taken below 1/n, that of n draws with one of them a rank off: n draws cannot rule
+        out a rank that comes up less than once in n. So n identical draws give Z_95 / n rather than a zero-width
+        interval that would stop sampling at once.
+        """
+        if self.samples < 2:
+            return math.inf
+        variance = max(float(np.var(self.ranks, ddof=1)), 1 / self.samples)
+        return Z_95 * math.sqrt(variance / self.samples)
+
+    @property
+    def distribution(self) -> Dict[int, float]:
+        values, counts = np.unique(self.ranks, return_counts=True)
+        return {int(v): c / self.samples for v, c in zip(values, counts)}
+
+    def to_dict(self) -> dict:
+        return {
+            "mean": self.mean,
+            "ci_low": self.mean - self.half_width,
+            "ci_high": self.mean + self.half_width,
+            "distribution": self.distribution,
+            "samples": self.samples,
+            "max_samples": self.max_samples,
+            "calls_saved": self.max_samples - self.samples,
+        }
+
+async def sample_geval_metric(llm, prompt: str, max_samples: int = None, min_samples: int = None,
+                              wave: int = None, tolerance: float = None) -> GevalEstimate:
+    """Draw ranks for one prompt in concurrent waves until the mean is stable within `tolerance`.
+
+    The first wave is `min_samples` draws; each later wave adds `wave` more, up to `max_samples`.
+    """
+    max_samples = max_samples or GEVAL_SAMPLES
+    min_samples = min(min_samples or GEVAL_MIN_SAMPLES, max_samples)
+    wave = wave or GEVAL_SAMPLE_WAVE
+    tolerance = GEVAL_TOLERANCE if tolerance is None else tolerance
+    estimate = GevalEstimate([], max_samples)
+    while estimate.samples < max_samples:
+        size = min(min_samples if not estimate.samples else wave, max_samples - estimate.samples)
+        results = await asyncio.gather(*(
+            llm.answer_prompt_async(prompt, sample=estimate.samples + i) for i in range(size)
+        ))
+        estimate.ranks += [result.rank for result in results]
+        if estimate.samples >= min_samples and estimate.half_width <= tolerance:
+            break
+    return estimate
+
+async def run_geval_sampled(llm, document: str, summary: str, context_budget: Optional[int] = None,
+                            **sampling) -> Dict[str, GevalEstimate]:
+    """Sampled estimate of all four Geval metrics; the metrics are sampled concurrently.
+
+    `sampling` is passed to `sample_geval_metric` (max_samples, min_samples, wave, tolerance).
+    """
+    prompts = geval_prompts(document, summary, context_budget)
+    results = await asyncio.gather(*(sample_geval_metric(llm, p, **sampling) for p in prompts.values()))
+    return dict(zip(prompts, results))
+
+def sampling_report(estimates: Dict[str, GevalEstimate]) -> dict:
+    """Calls each metric used against the fixed-N baseline of `max_samples` calls per metric."""
+    used = {metric: e.samples for metric, e in estimates.items()}
+    fixed = sum(e.max_samples for e in estimates.values())
+    return {
+        "calls_used": used,
+        "calls_total": sum(used.values()),
+        "calls_fixed": fixed,
+        "calls_saved": 1 - sum(used.values()) / fixed if fixed else 0.0,
+    }
@@ -0,0 +1,203 @@
+"""Background evaluation jobs: LLM-as-a-Judge and Geval runs on a worker pool in the app process.
+
+Jobs and their results are kept in the evaluation store, so they survive Streamlit reruns and page
+reloads, and every session looking at the same summary sees the same job. Submitting a job that is
+already queued or running with the same parameters returns the existing job instead.
+
+    queue = get_job_queue()
+    job_id = queue.submit_geval(summary_id, context_budget=400)
+    queue.get(job_id)  # {"status": "running", "done": 2, "total": 4, "result": None, ...}
+
+Judge jobs stream their LLM replies: while one runs, `get` and `latest` also return the answers so far
+under "partial" (kept in memory only).
+
+One app process should own a store: jobs it finds unfinished at startup are marked as failed.
+"""
+import atexit
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from aneval.llms.registry import LLMRegistry, get_llm_registry
+from aneval.llms.telemetry import collect_calls, summarize_calls
+from aneval.prompts.judge import LLM_JUDGE_COMPARE_PROMPT, LLM_JUDGE_PROMPT
+from aneval.services.geval_service import GEVAL_METRICS, run_geval_parallel, run_geval_sampled, sampling_report
+from aneval.services.judge_service import JudgeStats, embedding_compare_id, run_llm_judge
+from aneval.services.store import EvalStore, get_eval_store
+
+load_dotenv()
+
+# Evaluations running at once; each one still fans out its own LLM calls concurrently
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+
+def judge_call_count(questions: List[str], batched: bool) -> int:
+    # Two answer calls (or one per question and side) plus the comparison; fallbacks can add more
+    return 3 if batched else 2 * len(questions) + 1
+
+class JobQueue:
+    def __init__(self, store: EvalStore = None, registry: LLMRegistry = None, workers: int = None):
+        self.store = store or get_eval_store()
+        self.registry = registry or get_llm_registry()
+        self._pool = ThreadPoolExecutor(max_workers=workers or JOB_WORKERS, thread_name_prefix="aneval-job")
+        self._lock = threading.Lock()
+        # job_id -> CallRecords of the LLM calls finished so far, for live progress
+        self._live: Dict[str, list] = {}
+        # job_id -> judge answers streamed so far: {"summary": [...], "article": [...], "compare": ""}
+        self._partial: Dict[str, dict] = {}
+
+    def submit_judge(self, summary_id: str, questions: List[str], judge_prompt: str = LLM_JUDGE_PROMPT,
+                     compare_prompt: str = LLM_JUDGE_COMPARE_PROMPT, batched: bool = True,
+                     context_budget: Optional[int] = None, compare_mode: str = "llm") -> str:
+        """`compare_mode` "embedding" replaces the LLM comparison with embedding similarity of the answers."""
+        total = judge_call_count(questions, batched)
+        if compare_mode == "embedding":
+            compare_prompt = embedding_compare_id(self.registry.voyage())
+        params = {
+            "model": self.registry.gemini().model_name,
+            "questions": list(questions),
+            "judge_prompt": judge_prompt,
+            "compare_prompt": compare_prompt,
+            "compare_mode": compare_mode,
+            "batched": bool(batched),
+            "context_budget": context_budget or 0,
+        }
+        return self._submit("judge", summary_id, params, total)
+
+    def submit_geval(self, summary_id: str, context_budget: Optional[int] = None, samples: int = 1) -> str:
+        """With `samples` > 1, each metric is the mean of up to that many sampled ranks (see `run_geval_sampled`).
+
+        The job's total is then the most calls it can make; it is set to the calls actually made when it finishes.
+        """
+        params = {"model": self.registry.openai().model_name, "context_budget": context_budget or 0}
+        if samples > 1:
+            params["samples"] = samples
+        return self._submit("geval", summary_id, params, len(GEVAL_METRICS) * samples)
+
+    def _submit(self, kind: str, summary_id: str, params: dict, total: int) -> str:
+        with self._lock:
+            existing = self.store.active_job(kind, summary_id, params)
+            if existing is not None:
+                return existing["job_id"]
+            job_id = uuid.uuid4().hex
+            self.store.add_job(job_id, kind, summary_id, params, total)
+        self._pool.submit(self._run, job_id, kind, summary_id, params)
+        return job_id
+
+    def _run(self, job_id: str, kind: str, summary_id: str, params: dict) -> None:
+        self.store.update_job(job_id, status="running")
+        try:
+            article = self.store.summary_article(summary_id)
+            if article is None:
+                raise LookupError(f"Summary {summary_id} is not in the store")
+            with collect_calls() as calls:
+                self._live[job_id] = calls
+                if kind == "judge":
+                    result = self._judge(job_id, summary_id, article, params)
+                else:
+                    result = self._geval(summary_id, article, params)
+            result["calls"] = summarize_calls(calls)
+            # The submitted total is an estimate (sampled Geval usually stops early): a finished job made all its calls
+            self.store.update_job(job_id, status="done", done=len(calls), total=len(calls), result=result)
+        except Exception as e:
+            print(f"Job {job_id} ({kind}) failed: {e}")
+            self.store.update_job(job_id, status="failed", error=f"{e.__class__.__name__}: {e}")
+        finally:
+            self._live.pop(job_id, None)
+            self._partial.pop(job_id, None)
+
+    def _judge(self, job_id: str, summary_id: str, article, params: dict) -> dict:
+        llm = self.registry.gemini(params["model"])
+        stats = JudgeStats()
+        count = len(params["questions"])
+        partial = self._partial[job_id] = {"summary": [""] * count, "article": [""] * count, "compare": ""}
+        def on_answer(side, index, text):
+            if side == "compare":
+                partial["compare"] = text
+            else:
+                partial[side][index] = text
+        summary_answers, article_answers, compare_result = self.registry.run(run_llm_judge(
+            llm, article.summary, article.full_text, params["questions"], params["judge_prompt"],
+            params["compare_prompt"], batched=params["batched"], stats=stats,
+            context_budget=params["context_budget"] or None,
+            embedder=self.registry.voyage() if params.get("compare_mode") == "embedding" else None,
+            on_answer=on_answer,
+        ))
+        self.store.add_judge_result(
+            summary_id, llm.model_name, params["judge_prompt"], params["compare_prompt"], params["questions"],
+            summary_answers, article_answers, compare_result, params["context_budget"],
+        )
+        return {
+            "questions": params["questions"],
+            "summary_answers": summary_answers,
+            "article_answers": article_answers,
+            "compare_result": compare_result,
+            "stats": vars(stats),
+        }
+
+    def _geval(self, summary_id: str, article, params: dict) -> dict:
+        llm = self.registry.openai(params["model"])
+        samples = params.get("samples", 1)
+        if samples > 1:
+            results = self.registry.run(run_geval_sampled(
+                llm, article.full_text, article.summary, params["context_budget"] or None, max_samples=samples
+            ))
+        else:
+            results = self.registry.run(run_geval_parallel(
+                llm, article.full_text, article.summary, params["context_budget"] or None
+            ))
+        ranks = {metric: result.rank for metric, result in results.items()}
+        # Sampled estimates are stored whole, with their interval and distribution
+        self.store.add_geval_scores(
+            [(summary_id, metric, GEVAL_METRICS[metric], result if samples > 1 else result.rank)
+             for metric, result in results.items()],
+            llm.model_name, params["context_budget"], samples,
+        )
+        if samples > 1:
+            return {"ranks": ranks, "samples": {metric: result.to_dict() for metric, result in results.items()},
+                    "sampling": sampling_report(results)}
+        return {"ranks": ranks}
+
+    # --- Polling ---
+    def _with_progress(self, job: Optional[dict]) -> Optional[dict]:
+        calls = self._live.get(job["job_id"]) if job is not None else None
+        if calls is not None:
+            job["done"] = len(calls)
+            job["total"] = max(job["total"], job["done"])
+        partial = self._partial.get(job["job_id"]) if job is not None else None
+        if partial is not None:
+            # Copied: the job's event loop keeps updating it while the caller renders
+            job["partial"] = {side: list(texts) if isinstance(texts, list) else texts for side, texts in partial.items()}
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self._with_progress(self.store.get_job(job_id))
+
+    def latest(self, kind: str, summary_id: str) -> Optional[dict]:
+        return self._with_progress(self.store.latest_job(kind, summary_id))
+
+    def recent(self, limit: int = 50) -> List[dict]:
+        return [self._with_progress(job) for job in self.store.recent_jobs(limit)]
+
+    def close(self) -> None:
+        """Stop taking jobs; jobs still queued stay queued and are failed on the next startup."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+def is_active(job: Optional[dict]) -> bool:
+    return job is not None and job["status"] in ("queued", "running")
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_job_queue(store: EvalStore = None, registry: LLMRegistry = None) -> JobQueue:
+    """Process-wide job queue, shared by every Streamlit session."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(store, registry)
+            failed = _queue.store.fail_unfinished_jobs("Interrupted: the app stopped before the job finished")
+            if failed:
+                print(f"Marked {failed} unfinished job(s) from a previous run as failed.")
+            atexit.register(_queue.close)
+        return _queue
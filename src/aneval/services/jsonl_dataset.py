@@ -0,0 +1,115 @@
+"""JSONL datasets with a sidecar byte-offset index for random access.
+
+`<name>.jsonl` holds one article per line; `<name>.jsonl.idx` holds the byte offset of every
+line as little-endian uint64. With the index, `get(i)` and `page(n)` seek straight to the
+lines they need instead of parsing the whole file.
+
+    python -m aneval.services.jsonl_dataset stock_news_summarized.json stock_news_summarized.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Type
+from pydantic import BaseModel
+from aneval.models.response.llm_news_article import LLMNewsArticle
+from aneval.services.news_service import iter_json_records
+
+def index_path_for(jsonl_path) -> Path:
+    jsonl_path = Path(jsonl_path)
+    return jsonl_path.with_name(jsonl_path.name + ".idx")
+
+def _save_index(offsets: array, jsonl_path) -> None:
+    if sys.byteorder != "little":
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+    tmp_path = index_path_for(jsonl_path).with_suffix(".idx.tmp")
+    with open(tmp_path, "wb") as f:
+        offsets.tofile(f)
+    os.replace(tmp_path, index_path_for(jsonl_path))
+
+def write_jsonl(records: Iterable, jsonl_path) -> int:
+    """Write records (dicts or pydantic models) to `jsonl_path` and its offset index; returns the count."""
+    offsets = array("Q")
+    with open(jsonl_path, "wb") as f:
+        for record in records:
+            if isinstance(record, BaseModel):
+                record = record.model_dump()
+            offsets.append(f.tell())
+            f.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+    _save_index(offsets, jsonl_path)
+    return len(offsets)
+
+def build_index(jsonl_path) -> array:
+    """Scan a JSONL file once and (re)write its offset index."""
+    offsets = array("Q")
+    with open(jsonl_path, "rb") as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                offsets.append(offset)
+            offset += len(line)
+    _save_index(offsets, jsonl_path)
+    return offsets
+
+def load_index(jsonl_path) -> array:
+    """Load the sidecar index, rebuilding it if it is missing or older than the data file."""
+    idx_path = index_path_for(jsonl_path)
+    if not idx_path.exists() or idx_path.stat().st_mtime < Path(jsonl_path).stat().st_mtime:
+        return build_index(jsonl_path)
+    offsets = array("Q")
+    with open(idx_path, "rb") as f:
+        offsets.frombytes(f.read())
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return offsets
+
+class JsonlDataset:
+    """Random-access view over an indexed JSONL file, parsing only the rows that are asked for."""
+
+    def __init__(self, jsonl_path, model: Type[BaseModel] = LLMNewsArticle):
+        self.path = Path(jsonl_path)
+        self.model = model
+        self.offsets = load_index(self.path)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _read(self, f, i: int):
+        f.seek(self.offsets[i])
+        return self.model(**json.loads(f.readline()))
+
+    def get(self, i: int):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"Article index {i} out of range for {len(self)} articles")
+        with open(self.path, "rb") as f:
+            return self._read(f, i)
+
+    def page(self, page: int, page_size: int = 10, indices: Optional[List[int]] = None) -> list:
+        """Return the 1-based `page`, either over the whole file or over a subset of row `indices`."""
+        rows = range(len(self)) if indices is None else indices
+        selected = rows[(page - 1) * page_size : page * page_size]
+        with open(self.path, "rb") as f:
+            return [self._read(f, i) for i in selected]
+
+    def __iter__(self) -> Iterator:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield self.model(**json.loads(line))
+
+def convert_to_jsonl(json_path, jsonl_path) -> int:
+    """Convert a ticker-keyed input file or a summarized output array to indexed JSONL."""
+    return write_jsonl(iter_json_records(str(json_path)), jsonl_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a news JSON file to indexed JSONL.")
+    parser.add_argument("source", help="stock_news.json or stock_news_summarized.json")
+    parser.add_argument("target", help="Output .jsonl path; the .idx sidecar is written next to it.")
+    args = parser.parse_args()
+    count = convert_to_jsonl(args.source, args.target)
+    print(f"Wrote {count} articles to {args.target} (index: {index_path_for(args.target)})")
@@ -0,0 +1,318 @@
+import asyncio
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+from pydantic import ValidationError
+from aneval.llms.gemini import build_question_prompt
+from aneval.models.response.judge_answers import JudgeAnswers
+from aneval.prompts.judge import LLM_JUDGE_BATCH_INSTRUCTIONS
+from aneval.services.retrieval import ContextCompactor, estimate_tokens
+
+load_dotenv()
+
+# "Relevance: 4 - ..." / "**Consistency:** 5" in the comparison reply (embedding scores have decimals)
+COMPARE_SCORE_RE = re.compile(r"\b(relevance|consistency)\W{0,4}:\W{0,4}([1-5](?:\.\d+)?)\b", re.IGNORECASE)
+# The judge prompt's answer when the context does not cover a question
+NOT_SPECIFIED_RE = re.compile(r"not specified in the context", re.IGNORECASE)
+# Cosine similarity that maps to a score of 1 (and 1.0 to 5) in the embedding comparison
+EMBED_SIMILARITY_FLOOR = float(os.getenv("EMBED_SIMILARITY_FLOOR", 0.5))
+
+@dataclass
+class JudgeStats:
+    calls: int = 0
+    prompt_tokens: int = 0
+    fallbacks: int = 0
+    latency_seconds: float = 0.0
+
+    def record(self, prompt: str) -> None:
+        self.calls += 1
+        self.prompt_tokens += estimate_tokens(prompt)
+
+def judge_context(judge_prompt_text: str, context: str) -> str:
+    return f"{judge_prompt_text}\n\nContext:\n{context}"
+
+def question_contexts(judge_prompt_text: str, text: str, questions: List[str],
+                      context_budget: Optional[int] = None) -> List[str]:
+    """Judge context per question; with a token budget, only the passages most relevant to that question."""
+    if not context_budget or estimate_tokens(text) <= context_budget:
+        return [judge_context(judge_prompt_text, text)] * len(questions)
+    compactor = ContextCompactor(text)
+    return [judge_context(judge_prompt_text, compactor.compact(q, context_budget)) for q in questions]
+
+def build_compare_prompt(summary_answers, article_answers, compare_prompt_template) -> str:
+    return compare_prompt_template.format(
+        summary_answers="\n".join(f"{i+1}. {a}" for i, a in enumerate(summary_answers)),
+        article_answers="\n".join(f"{i+1}. {a}" for i, a in enumerate(article_answers)),
+    )
+
+def evaluate_summary_vs_article(llm, summary_answers, article_answers, compare_prompt_template, stats=None):
+    prompt = build_compare_prompt(summary_answers, article_answers, compare_prompt_template)
+    if stats is not None:
+        stats.record(build_question_prompt(prompt, ""))
+    # Use the same LLM as for the Q&A (Gemini)
+    return llm.answer_question(prompt, "", operation="judge-compare")
+
+async def evaluate_summary_vs_article_async(llm, summary_answers, article_answers, compare_prompt_template,
+                                            stats=None, on_text=None):
+    prompt = build_compare_prompt(summary_answers, article_answers, compare_prompt_template)
+    if stats is not None:
+        stats.record(build_question_prompt(prompt, ""))
+    if on_text is not None:
+        return await stream_text(llm.stream_answer_async(prompt, "", operation="judge-compare"), on_text)
+    return await llm.answer_question_async(prompt, "", operation="judge-compare")
+
+async def stream_text(pieces: AsyncIterator[str], on_text: Callable[[str], None]) -> str:
+    """Consume a streamed reply, passing the text so far to `on_text` after every piece; returns the whole reply."""
+    text = ""
+    async for piece in pieces:
+        text += piece
+        on_text(text.strip())
+    return text.strip()
+
+def side_callback(on_answer, side: str):
+    """`on_answer(side, index, text)` bound to one side ("summary" or "article"), or None."""
+    if on_answer is None:
+        return None
+    return lambda index, text: on_answer(side, index, text)
+
+@dataclass
+class EmbeddingComparison:
+    similarities: List[float]
+    relevance: Optional[float]
+    consistency: Optional[float]
+    article_answered: int
+    summary_answered: int
+
+    def __str__(self) -> str:
+        # Same "Name: score - justification" layout as the LLM comparison, so it parses and stores the same way
+        lines = []
+        if self.relevance is not None:
+            lines.append(f"Relevance: {self.relevance:.2f} - mean answer similarity over the "
+                         f"{self.article_answered} question(s) the article answers")
+        if self.consistency is not None:
+            lines.append(f"Consistency: {self.consistency:.2f} - mean answer similarity over the "
+                         f"{self.summary_answered} question(s) the summary answers")
+        per_question = ", ".join(f"Q{i + 1} {s:.2f}" for i, s in enumerate(self.similarities))
+        return "\n\n".join(lines + [f"Cosine similarity per question: {per_question}"])
+
+def similarity_score(similarity: float, floor: float = None) -> float:
+    """Map a cosine similarity onto the judge's 1-5 scale (linear from `floor` to 1.0)."""
+    floor = EMBED_SIMILARITY_FLOOR if floor is None else floor
+    return 1 + 4 * float(np.clip((similarity - floor) / (1 - floor), 0.0, 1.0))
+
+def embedding_compare_id(embedder) -> str:
+    """Stands in for the comparison prompt when verdicts from the embedding comparison are stored."""
+    return f"embedding-similarity:{embedder.provider}/{embedder.model_name}:floor={EMBED_SIMILARITY_FLOOR}"
+
+async def compare_answers_embedding(embedder, summary_answers: List[str],
+                                    article_answers: List[str]) -> EmbeddingComparison:
+    """Numeric comparison of the two answer sets from per-question cosine similarity (one batched embed call).
+
+    Relevance: how well the summary covers what the article answers. It is the mean score over the
+    questions the article answers; a question the summary cannot answer scores 1.
+    Consistency: whether what the summary does say agrees with the article. It is the mean score over
+    the questions the summary answers.
+    """
+    vectors = await embedder.embed_async(list(summary_answers) + list(article_answers), operation="judge-embed")
+    n = len(summary_answers)
+    similarities = np.einsum("ij,ij->i", vectors[:n], vectors[n:]) if n else np.zeros(0)
+    summary_has = np.array([not NOT_SPECIFIED_RE.search(a) for a in summary_answers], dtype=bool)
+    article_has = np.array([not NOT_SPECIFIED_RE.search(a) for a in article_answers], dtype=bool)
+    scores = np.array([similarity_score(s) for s in similarities])
+    coverage = np.where(summary_has, scores, 1.0)[article_has]
+    agreement = scores[summary_has]
+    return EmbeddingComparison(
+        similarities=[float(s) for s in similarities],
+        relevance=float(coverage.mean()) if len(coverage) else None,
+        consistency=float(agreement.mean()) if len(agreement) else None,
+        article_answered=int(article_has.sum()),
+        summary_answered=int(summary_has.sum()),
+    )
+
+async def answer_question(llm, context: str, question: str, stats: Optional[JudgeStats] = None,
+                          on_text=None) -> str:
+    """With `on_text`, the answer is streamed and `on_text(text so far)` is called as it grows."""
+    if stats is not None:
+        stats.record(build_question_prompt(context, question))
+    if on_text is not None:
+        return await stream_text(llm.stream_answer_async(context, question), on_text)
+    return await llm.answer_question_async(context, question)
+
+def index_callback(on_answer, index: int):
+    if on_answer is None:
+        return None
+    return lambda text: on_answer(index, text)
+
+async def answer_questions(llm, context: str, questions: List[str], stats: Optional[JudgeStats] = None,
+                           on_answer=None) -> List[str]:
+    """One call per question, each re-sending the full context."""
+    return list(await asyncio.gather(*(answer_question(llm, context, q, stats, index_callback(on_answer, i))
+                                       for i, q in enumerate(questions))))
+
+# --- Async runner for LLM-as-a-Judge (parallelizes all LLM calls) ---
+async def run_llm_judge_parallel(llm, summary, article, questions, judge_prompt_text, stats=None,
+                                 context_budget=None, on_answer=None):
+    # Summary and article questions go out in one gather, so the whole fan-out costs about one round trip
+    summary_contexts = question_contexts(judge_prompt_text, summary, questions, context_budget)
+    article_contexts = question_contexts(judge_prompt_text, article, questions, context_budget)
+    on_summary, on_article = side_callback(on_answer, "summary"), side_callback(on_answer, "article")
+    answers = await asyncio.gather(
+        *(answer_question(llm, c, q, stats, index_callback(on_summary, i))
+          for i, (c, q) in enumerate(zip(summary_contexts, questions))),
+        *(answer_question(llm, c, q, stats, index_callback(on_article, i))
+          for i, (c, q) in enumerate(zip(article_contexts, questions))),
+    )
+    return list(answers[:len(questions)]), list(answers[len(questions):])
+
+def build_batch_prompt(context: str, questions: List[str]) -> str:
+    numbered = "\n".join(f"{i+1}. {q}" for i, q in enumerate(questions))
+    return f"Context:\n{context}\n" + LLM_JUDGE_BATCH_INSTRUCTIONS.format(count=len(questions), questions=numbered)
+
+def parse_batch_answers(text: str, count: int) -> Optional[List[str]]:
+    """Validate a batched reply into `JudgeAnswers`; None if it is malformed or has the wrong number of answers."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        parsed = JudgeAnswers.model_validate_json(text)
+    except (ValidationError, json.JSONDecodeError, ValueError):
+        return None
+    if len(parsed.answers) != count:
+        return None
+    return [a.strip() for a in parsed.answers]
+
+def _decode_partial_string(raw: str) -> str:
+    # Body of a JSON string that may be cut off mid-escape
+    for body in (raw, re.sub(r"\\(u[0-9a-fA-F]{0,3})?$", "", raw)):
+        try:
+            return json.loads(f'"{body}"')
+        except json.JSONDecodeError:
+            continue
+    return raw
+
+def partial_batch_answers(text: str) -> List[str]:
+    """Answers readable so far from a batched reply that is still streaming; the last one may be cut off."""
+    key = text.find('"answers"')
+    start = text.find("[", key) if key >= 0 else -1
+    if start < 0:
+        return []
+    answers, i = [], start + 1
+    while True:
+        while i < len(text) and text[i] in " \t\r\n,":
+            i += 1
+        if i >= len(text) or text[i] != '"':
+            return answers
+        end = i + 1
+        while end < len(text) and text[end] != '"':
+            end += 2 if text[end] == "\\" else 1
+        answers.append(_decode_partial_string(text[i + 1:min(end, len(text))]).strip())
+        i = end + 1
+
+async def answer_questions_batched(llm, context: str, questions: List[str],
+                                   stats: Optional[JudgeStats] = None, on_answer=None) -> List[str]:
+    """Answer all questions for one context in a single JSON-mode call, falling back to per-question calls.
+
+    With `on_answer`, the reply is streamed and `on_answer(index, text so far)` is called for each answer
+    as the JSON arrives.
+    """
+    if not questions:
+        return []
+    prompt = build_batch_prompt(context, questions)
+    if stats is not None:
+        stats.record(prompt)
+    def show_partial(text):
+        for i, answer in enumerate(partial_batch_answers(text)[:len(questions)]):
+            on_answer(i, answer)
+    try:
+        if on_answer is not None:
+            reply = await stream_text(llm.stream_async(prompt, json_mode=True, operation="judge-answer"), show_partial)
+        else:
+            reply = await llm.generate_async(prompt, json_mode=True, operation="judge-answer")
+        answers = parse_batch_answers(reply, len(questions))
+    except Exception as e:
+        print(f"Batched judge call failed: {e}")
+        answers = None
+    if answers is not None:
+        return answers
+    if stats is not None:
+        stats.fallbacks += 1
+    return await answer_questions(llm, context, questions, stats, on_answer)
+
+async def answer_context_batched(llm, text, questions, judge_prompt_text, stats=None, context_budget=None,
+                                 on_answer=None):
+    # One shared context, so passages are ranked against all questions at once
+    context = question_contexts(judge_prompt_text, text, [" ".join(questions)], context_budget)[0]
+    return await answer_questions_batched(llm, context, questions, stats, on_answer)
+
+async def run_llm_judge_batched(llm, summary, article, questions, judge_prompt_text, stats=None,
+                                context_budget=None, on_answer=None):
+    return tuple(await asyncio.gather(
+        answer_context_batched(llm, summary, questions, judge_prompt_text, stats, context_budget,
+                               side_callback(on_answer, "summary")),
+        answer_context_batched(llm, article, questions, judge_prompt_text, stats, context_budget,
+                               side_callback(on_answer, "article")),
+    ))
+
+async def answer_context(llm, text, questions, judge_prompt_text, batched=True, stats=None, context_budget=None,
+                         on_answer=None):
+    """Answers to `questions` from one context (the summary or the article)."""
+    if batched:
+        return await answer_context_batched(llm, text, questions, judge_prompt_text, stats, context_budget,
+                                            on_answer)
+    contexts = question_contexts(judge_prompt_text, text, questions, context_budget)
+    return list(await asyncio.gather(*(answer_question(llm, c, q, stats, index_callback(on_answer, i))
+                                       for i, (c, q) in enumerate(zip(contexts, questions)))))
+
+async def run_llm_judge(llm, summary, article, questions, judge_prompt_text, compare_prompt_template,
+                        batched=True, stats=None, context_budget=None, article_answers=None, embedder=None,
+                        on_answer=None):
+    """Full judge flow: answers from both contexts, then the relevance/consistency comparison.
+
+    With `context_budget` (tokens), each context is compacted to the passages relevant to the questions.
+    Pass `article_answers` to reuse answers already computed for this article (they do not depend on
+    the summary); only the summary side and the comparison are then sent to the LLM. With an `embedder`,
+    the comparison is `compare_answers_embedding` instead of an LLM call.
+
+    With `on_answer(side, index, text)`, every LLM reply is streamed and reported as it grows: side is
+    "summary" or "article" with the question index, or "compare" (index 0) for the comparison.
+    """
+    stats = stats if stats is not None else JudgeStats()
+    start = time.perf_counter()
+    if article_answers is not None:
+        summary_answers = await answer_context(llm, summary, questions, judge_prompt_text, batched, stats,
+                                               context_budget, side_callback(on_answer, "summary"))
+    else:
+        runner = run_llm_judge_batched if batched else run_llm_judge_parallel
+        summary_answers, article_answers = await runner(llm, summary, article, questions, judge_prompt_text, stats,
+                                                        context_budget, on_answer)
+    # The comparison starts as soon as the last answer is complete
+    if embedder is not None:
+        compare_result = str(await compare_answers_embedding(embedder, summary_answers, article_answers))
+    else:
+        on_compare = index_callback(side_callback(on_answer, "compare"), 0)
+        compare_result = await evaluate_summary_vs_article_async(
+            llm, summary_answers, article_answers, compare_prompt_template, stats, on_compare
+        )
+    stats.latency_seconds += time.perf_counter() - start
+    return summary_answers, article_answers, compare_result
+
+def parse_compare_scores(compare_result: str) -> Dict[str, int]:
+    """`{"Relevance": x, "Consistency": x}` from a comparison reply (whichever scores it contains)."""
+    return {name.capitalize(): float(score) for name, score in COMPARE_SCORE_RE.findall(compare_result or "")}
+
+def compare_judge_modes(per_question: JudgeStats, batched: JudgeStats) -> dict:
+    """Savings of the batched mode relative to the per-question mode."""
+    def saved(before, after):
+        return 1 - after / before if before else 0.0
+    return {
+        "per_question": vars(per_question),
+        "batched": vars(batched),
+        "calls_saved": saved(per_question.calls, batched.calls),
+        "prompt_tokens_saved": saved(per_question.prompt_tokens, batched.prompt_tokens),
+        "latency_saved": saved(per_question.latency_seconds, batched.latency_seconds),
+    }
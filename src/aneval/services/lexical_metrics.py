@@ -0,0 +1,210 @@
+"""Local lexical metrics for a whole corpus of (summary, article) pairs, used to gate Geval.
+
+ROUGE-1/2/L, compression ratio, novel n-gram fractions and lengths are computed in one batch:
+n-grams of every document are encoded as integer ids and counted with NumPy, and ROUGE-L runs the
+LCS recurrence one summary token at a time over the whole article row. No models are involved.
+
+`GevalGates` uses them to skip summaries that are not worth a GPT-5 call: failed placeholders, empty
+or very short text, near-copies of the article and summaries longer than their source.
+
+    python -m aneval.services.lexical_metrics            # metrics and gate savings for the stored summaries
+"""
+import argparse
+import os
+from collections import Counter
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from dotenv import load_dotenv
+from aneval.models.response.llm_news_article import FAILED_SUMMARY
+from aneval.services.retrieval import TOKEN_RE
+
+load_dotenv()
+
+def _optional_float(name: str) -> Optional[float]:
+    value = os.getenv(name, "")
+    return float(value) if value else None
+
+# Geval gates (see GevalGates); set GEVAL_GATES=0 to send every summary to the LLM
+GEVAL_GATES = os.getenv("GEVAL_GATES", "1").lower() not in ("0", "false", "no", "")
+GEVAL_GATE_MIN_TOKENS = int(os.getenv("GEVAL_GATE_MIN_TOKENS", 5))
+GEVAL_GATE_MIN_COMPRESSION = float(os.getenv("GEVAL_GATE_MIN_COMPRESSION", 1.0))
+GEVAL_GATE_MAX_ROUGE2 = float(os.getenv("GEVAL_GATE_MAX_ROUGE2", 0.9))
+GEVAL_GATE_MAX_NOVEL_TRIGRAMS = _optional_float("GEVAL_GATE_MAX_NOVEL_TRIGRAMS")
+
+@dataclass
+class LexicalMetrics:
+    """One value per (summary, article) pair, in input order."""
+    summary_tokens: np.ndarray
+    article_tokens: np.ndarray
+    compression_ratio: np.ndarray     # article tokens / summary tokens (inf for an empty summary)
+    rouge1: np.ndarray                # F1, article as reference
+    rouge2: np.ndarray
+    rougeL: np.ndarray
+    novel_unigrams: np.ndarray        # fraction of summary n-grams that never occur in the article
+    novel_bigrams: np.ndarray
+    novel_trigrams: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.summary_tokens)
+
+    def row(self, i: int) -> Dict[str, float]:
+        return {f.name: float(getattr(self, f.name)[i]) for f in fields(self)}
+
+    def describe(self) -> Dict[str, Dict[str, float]]:
+        """Corpus statistics (mean, p50, p95, min, max) of every metric."""
+        stats = {}
+        for f in fields(self):
+            values = getattr(self, f.name)
+            values = values[np.isfinite(values)]
+            if not len(values):
+                continue
+            stats[f.name] = {
+                "mean": float(values.mean()), "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)), "min": float(values.min()), "max": float(values.max()),
+            }
+        return stats
+
+def encode(texts: Sequence[str], vocab: Dict[str, int]) -> List[np.ndarray]:
+    """Lowercased word tokens of each text as int64 ids (the vocabulary grows as needed)."""
+    return [np.array([vocab.setdefault(t, len(vocab)) for t in TOKEN_RE.findall(text.lower())], dtype=np.int64)
+            for text in texts]
+
+def _ngrams(seqs: List[np.ndarray], n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(document index, n-gram rows of shape (count, n)) for every n-gram of every sequence."""
+    windows = [np.lib.stride_tricks.sliding_window_view(s, n) for s in seqs if len(s) >= n]
+    docs = [np.full(len(s) - n + 1, i, dtype=np.int64) for i, s in enumerate(seqs) if len(s) >= n]
+    if not windows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, n), dtype=np.int64)
+    return np.concatenate(docs), np.concatenate(windows)
+
+def ngram_overlap(summaries: List[np.ndarray], articles: List[np.ndarray], n: int) -> Tuple[np.ndarray, ...]:
+    """Per pair: (summary n-grams, article n-grams, clipped overlap, summary n-grams absent from the article)."""
+    count = len(summaries)
+    s_doc, s_rows = _ngrams(summaries, n)
+    a_doc, a_rows = _ngrams(articles, n)
+    # Dense ids shared by both sides, then one (document, n-gram) key per occurrence
+    rows = np.concatenate([s_rows, a_rows])
+    vocab_size = int(rows.max()) + 1 if rows.size else 1
+    if vocab_size ** n < 2 ** 62:
+        # Pack each n-gram into one integer: a 1-D unique is much faster than a row-wise one
+        packed = rows @ (vocab_size ** np.arange(n - 1, -1, -1, dtype=np.int64))
+        _, gram = np.unique(packed, return_inverse=True)
+    else:
+        _, gram = np.unique(rows, axis=0, return_inverse=True)
+    gram = gram.reshape(-1)
+    n_grams = int(gram.max()) + 1 if len(gram) else 1
+    s_keys, s_counts = np.unique(s_doc * n_grams + gram[:len(s_doc)], return_counts=True)
+    a_keys, a_counts = np.unique(a_doc * n_grams + gram[len(s_doc):], return_counts=True)
+    common, si, ai = np.intersect1d(s_keys, a_keys, assume_unique=True, return_indices=True)
+    overlap = np.bincount(common // n_grams, weights=np.minimum(s_counts[si], a_counts[ai]), minlength=count)
+    novel_mask = ~np.isin(s_keys, a_keys, assume_unique=True)
+    novel = np.bincount(s_keys[novel_mask] // n_grams, weights=s_counts[novel_mask], minlength=count)
+    return (np.bincount(s_doc, minlength=count).astype(float), np.bincount(a_doc, minlength=count).astype(float),
+            overlap, novel)
+
+def lcs_length(a: np.ndarray, b: np.ndarray) -> int:
+    """Longest common subsequence of two token arrays, one vectorized DP row per token of `a`."""
+    if not len(a) or not len(b):
+        return 0
+    prev = np.zeros(len(b) + 1, dtype=np.int32)
+    for token in a:
+        # curr[j] = prev[j-1] + 1 on a match, else max(prev[j], curr[j-1]); rows never decrease, so
+        # the curr[j-1] term is a running maximum
+        candidates = np.where(b == token, prev[:-1] + 1, prev[1:])
+        prev = np.concatenate(([0], np.maximum.accumulate(candidates)))
+    return int(prev[-1])
+
+def _f1(overlap: np.ndarray, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    total = first + second
+    return np.divide(2 * overlap, total, out=np.zeros_like(total, dtype=float), where=total > 0)
+
+def _fraction(part: np.ndarray, whole: np.ndarray) -> np.ndarray:
+    return np.divide(part, whole, out=np.zeros_like(whole, dtype=float), where=whole > 0)
+
+def compute_metrics(summaries: Sequence[str], articles: Sequence[str]) -> LexicalMetrics:
+    """Lexical metrics of every summary against its article, for the whole corpus at once."""
+    vocab: Dict[str, int] = {}
+    s_ids, a_ids = encode(summaries, vocab), encode(articles, vocab)
+    s_len = np.array([len(s) for s in s_ids], dtype=float)
+    a_len = np.array([len(a) for a in a_ids], dtype=float)
+    rouge, novel = {}, {}
+    for n in (1, 2, 3):
+        s_total, a_total, overlap, novel_count = ngram_overlap(s_ids, a_ids, n)
+        rouge[n] = _f1(overlap, s_total, a_total)
+        novel[n] = _fraction(novel_count, s_total)
+    lcs = np.array([lcs_length(s, a) for s, a in zip(s_ids, a_ids)], dtype=float)
+    return LexicalMetrics(
+        summary_tokens=s_len,
+        article_tokens=a_len,
+        compression_ratio=np.divide(a_len, s_len, out=np.full_like(a_len, np.inf), where=s_len > 0),
+        rouge1=rouge[1],
+        rouge2=rouge[2],
+        rougeL=_f1(lcs, s_len, a_len),
+        novel_unigrams=novel[1],
+        novel_bigrams=novel[2],
+        novel_trigrams=novel[3],
+    )
+
+@dataclass
+class GevalGates:
+    """Which summaries are worth scoring with the LLM; each gate can be turned off with None."""
+    min_summary_tokens: Optional[int] = GEVAL_GATE_MIN_TOKENS
+    min_compression: Optional[float] = GEVAL_GATE_MIN_COMPRESSION   # below 1: longer than the article
+    max_rouge2: Optional[float] = GEVAL_GATE_MAX_ROUGE2             # above: a near-copy of the article
+    max_novel_trigrams: Optional[float] = GEVAL_GATE_MAX_NOVEL_TRIGRAMS
+
+    def reasons(self, summaries: Sequence[str], metrics: LexicalMetrics) -> List[Optional[str]]:
+        """Why each summary is skipped, or None if it should be scored."""
+        checks = [
+            ("empty", metrics.summary_tokens == 0),
+            ("too short", metrics.summary_tokens < (self.min_summary_tokens or 0)),
+            ("longer than article", metrics.compression_ratio < self.min_compression
+             if self.min_compression is not None else None),
+            ("near-copy of article", metrics.rouge2 > self.max_rouge2 if self.max_rouge2 is not None else None),
+            ("mostly novel text", metrics.novel_trigrams > self.max_novel_trigrams
+             if self.max_novel_trigrams is not None else None),
+        ]
+        reasons = []
+        for i, summary in enumerate(summaries):
+            if summary.strip() == FAILED_SUMMARY:
+                reasons.append("failed placeholder")
+                continue
+            reasons.append(next((name for name, mask in checks if mask is not None and mask[i]), None))
+        return reasons
+
+def gate_report(reasons: List[Optional[str]], calls_per_summary: int) -> dict:
+    skipped = Counter(r for r in reasons if r is not None)
+    total_skipped = sum(skipped.values())
+    return {
+        "summaries": len(reasons),
+        "sent_to_llm": len(reasons) - total_skipped,
+        "skipped": total_skipped,
+        "skipped_by_reason": dict(skipped),
+        "llm_calls_saved": total_skipped * calls_per_summary,
+        "llm_calls_saved_fraction": total_skipped / len(reasons) if reasons else 0.0,
+    }
+
+if __name__ == "__main__":
+    import json
+    import time
+    from aneval.services.geval_service import GEVAL_METRICS
+    from aneval.services.store import get_eval_store
+
+    parser = argparse.ArgumentParser(description="Lexical metrics and Geval gate savings for the stored summaries.")
+    parser.add_argument("--db", default=None, help="Evaluation store (default: EVAL_DB_PATH).")
+    parser.add_argument("--summary-model", default=None, help="Only summaries made by this model.")
+    parser.add_argument("--show-skipped", action="store_true", help="List the summaries the gates skip.")
+    args = parser.parse_args()
+    rows = list(get_eval_store(args.db).iter_summaries(model=args.summary_model))
+    texts = [article.summary for _, article in rows]
+    start = time.perf_counter()
+    metrics = compute_metrics(texts, [article.full_text for _, article in rows])
+    elapsed = time.perf_counter() - start
+    reasons = GevalGates().reasons(texts, metrics)
+    print(json.dumps({"pairs": len(metrics), "seconds": round(elapsed, 3), "metrics": metrics.describe(),
+                      "gates": gate_report(reasons, len(GEVAL_METRICS))}, indent=2))
+    if args.show_skipped:
+        for (summary_id, article), reason in zip(rows, reasons):
+            if reason:
+                print(f"{reason:>22}: {article.title[:70]}")
@@ -0,0 +1,380 @@
+"""Incremental news ingestion: refreshes the ticker-keyed `stock_news.json` that the ETL summarizes.
+
+    python -m aneval.services.news_ingest --tickers AAPL,MSFT,NVDA
+    python -m aneval.services.news_ingest --source yfinance
+
+For each ticker, the news list is fetched (the RSS feed at `NEWS_FEED_URL`, or yfinance's news list) and
+every link not seen before is downloaded, keeping the text of its paragraphs. All requests share one pooled
+`requests.Session` and at most `INGEST_CONCURRENCY` are in flight; a ticker's article downloads start as
+soon as its list arrives. Feed requests are conditional: the ETag and Last-Modified of the last full
+response are sent back, and an unchanged feed costs one empty 304. The validators and the known links are
+kept in `INGEST_STATE_PATH`, so a rerun only downloads new items. A feed's validators are only saved once
+every new item in it was downloaded; after a transient failure, or when `INGEST_MAX_PER_TICKER` left some
+for later, the next run fetches the list again.
+Links that fail with a 4xx are remembered and not retried.
+
+New articles are appended under their ticker; existing items are never rewritten. An article whose text is a
+near-copy of one already listed under the same ticker (a syndicated story under another URL) is not added:
+each ticker's items seed a `NearDuplicateIndex` that every new text goes through. The same story under
+another ticker is kept, and the summarization ETL clusters it. The ETL then only summarizes articles without a
+stored summary.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from aneval.llms.retry import RetryPolicy, call_with_retries_async, is_retryable
+from aneval.services.news_service import NEWS_FIELDS, NearDuplicateIndex, iter_json_records
+
+load_dotenv()
+
+NEWS_FEED_URL = os.getenv("NEWS_FEED_URL",
+                          "https://feeds.finance.yahoo.com/rss/2.0/headline?s={ticker}&region=US&lang=en-US")
+NEWS_TICKERS = [t.strip() for t in os.getenv("NEWS_TICKERS", "AAPL,MSFT,AMZN,NFLX,NVDA,INTC,IBM").split(",")
+                if t.strip()]
+INGEST_STATE_PATH = Path(os.getenv("INGEST_STATE_PATH", ".aneval_cache/ingest.sqlite"))
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", 8))
+INGEST_MAX_PER_TICKER = int(os.getenv("INGEST_MAX_PER_TICKER", 20))
+INGEST_TIMEOUT = float(os.getenv("INGEST_TIMEOUT", 20))
+# News sites turn away the default python-requests agent
+INGEST_USER_AGENT = os.getenv("INGEST_USER_AGENT", "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                                                   "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+# Pages with less text than this (consent walls, video-only pages) are remembered but not added
+MIN_ARTICLE_CHARS = int(os.getenv("INGEST_MIN_ARTICLE_CHARS", 200))
+# Drop new articles that near-duplicate one already listed under the same ticker (threshold: DEDUP_THRESHOLD)
+INGEST_DEDUP = os.getenv("INGEST_DEDUP", "1").lower() not in ("0", "false", "no", "")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS links (
+    ticker TEXT NOT NULL,
+    link TEXT NOT NULL,
+    status TEXT NOT NULL,         -- 'added', 'empty' (too little text), 'duplicate' (near-copy) or 'gone' (4xx)
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (ticker, link)
+);
+"""
+
+class IngestState:
+    """Conditional-request validators per feed URL and every link already downloaded, in SQLite."""
+
+    def __init__(self, path=None):
+        self.path = Path(path or INGEST_STATE_PATH)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def validators(self, url: str) -> Tuple[Optional[str], Optional[str]]:
+        with self._lock:
+            row = self.conn.execute("SELECT etag, last_modified FROM feeds WHERE url = ?", (url,)).fetchone()
+        return row or (None, None)
+
+    def known_links(self) -> set:
+        with self._lock:
+            return set(self.conn.execute("SELECT ticker, link FROM links").fetchall())
+
+    def save(self, feeds: Dict[str, Tuple[Optional[str], Optional[str]]], links: List[Tuple[str, str, str]]) -> None:
+        """Record `{url: (etag, last_modified)}` and `(ticker, link, status)` rows in one transaction."""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO feeds (url, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?)",
+                    [(url, etag, modified, now) for url, (etag, modified) in feeds.items()],
+                )
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO links (ticker, link, status, fetched_at) VALUES (?, ?, ?, ?)",
+                    [(ticker, link, status, now) for ticker, link, status in links],
+                )
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+class _ParagraphParser(HTMLParser):
+    """Collects the text of <p> elements, only those inside <article> when the page has one."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs, self.in_article = [], []
+        self._depth = {"p": 0, "article": 0, "script": 0, "style": 0}
+        self._current = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._depth:
+            self._depth[tag] += 1
+        if tag == "p" and self._current is None:
+            self._current = []
+
+    def handle_endtag(self, tag):
+        if tag in self._depth and self._depth[tag]:
+            self._depth[tag] -= 1
+        if tag == "p" and self._current is not None and not self._depth["p"]:
+            text = " ".join("".join(self._current).split())
+            if text:
+                self.paragraphs.append(text)
+                self.in_article.append(self._depth["article"] > 0)
+            self._current = None
+
+    def handle_data(self, data):
+        if self._current is not None and not self._depth["script"] and not self._depth["style"]:
+            self._current.append(data)
+
+def extract_text(html: str) -> str:
+    parser = _ParagraphParser()
+    parser.feed(html)
+    parser.close()
+    paragraphs = parser.paragraphs
+    if any(parser.in_article):
+        paragraphs = [p for p, inside in zip(parser.paragraphs, parser.in_article) if inside]
+    return " ".join(paragraphs)
+
+def parse_rss(xml: bytes) -> List[Tuple[str, str]]:
+    """`(title, link)` of every item in an RSS 2.0 feed, in feed order (newest first)."""
+    items = []
+    for item in ET.fromstring(xml).iter("item"):
+        title, link = item.findtext("title"), item.findtext("link")
+        if title and link:
+            items.append((title.strip(), link.strip()))
+    return items
+
+def yfinance_news(ticker: str) -> List[Tuple[str, str]]:
+    """`(title, link)` from yfinance's news list, which has no conditional requests."""
+    import yfinance as yf
+    items = []
+    for entry in yf.Ticker(ticker).news or []:
+        # Newer yfinance nests the item under "content"
+        content = entry.get("content") or entry
+        url = (content.get("canonicalUrl") or content.get("clickThroughUrl") or {}).get("url") or content.get("link")
+        if content.get("title") and url:
+            items.append((content["title"], url))
+    return items
+
+def make_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = INGEST_USER_AGENT
+    return session
+
+def load_dataset(path) -> Dict[str, List[dict]]:
+    """The ticker-keyed dataset as `{ticker: [item, ...]}` (flat arrays and JSONL are grouped by ticker)."""
+    dataset = defaultdict(list)
+    if Path(path).exists():
+        for item in iter_json_records(str(path)):
+            dataset[item["ticker"]].append(item)
+    return dataset
+
+def save_dataset(dataset: Dict[str, List[dict]], path) -> None:
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(dataset, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+@dataclass
+class IngestReport:
+    tickers: int = 0
+    feeds_fetched: int = 0
+    feeds_not_modified: int = 0
+    feeds_failed: int = 0
+    listed: int = 0
+    new_links: int = 0
+    downloaded: int = 0
+    bytes_downloaded: int = 0
+    added: int = 0
+    duplicates: int = 0
+    empty: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"Ingest: {self.tickers} tickers, feeds {self.feeds_fetched} fetched / {self.feeds_not_modified} "
+                f"not modified / {self.feeds_failed} failed; {self.listed} items listed, {self.new_links} new; "
+                f"{self.downloaded} pages ({self.bytes_downloaded / 1024:.0f} KiB) -> {self.added} added, "
+                f"{self.duplicates} near-duplicates, {self.empty} without text, {self.failed} failed "
+                f"in {self.seconds:.1f}s")
+
+class NewsIngester:
+    """One ingestion run: lists and article pages fetched concurrently over a shared pooled session."""
+
+    def __init__(self, state: IngestState = None, source: str = "rss", feed_url: str = None,
+                 concurrency: int = None, max_per_ticker: int = None, session: requests.Session = None,
+                 policy: RetryPolicy = None, dedupe: bool = None):
+        self.state = state or IngestState()
+        self.source = source
+        self.feed_url = feed_url or NEWS_FEED_URL
+        self.concurrency = concurrency or INGEST_CONCURRENCY
+        self.max_per_ticker = INGEST_MAX_PER_TICKER if max_per_ticker is None else max_per_ticker
+        self.session = session or make_session(self.concurrency)
+        self.policy = policy or RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=10)
+        self.dedupe = INGEST_DEDUP if dedupe is None else dedupe
+
+    async def _get(self, url: str, headers: dict = None) -> requests.Response:
+        def get():
+            response = self.session.get(url, headers=headers, timeout=INGEST_TIMEOUT)
+            response.raise_for_status()
+            return response
+        async with self._semaphore:
+            return await call_with_retries_async(lambda: asyncio.to_thread(get), policy=self.policy, label="Ingest")
+
+    async def _list(self, ticker: str):
+        """`(items, validators)`: items is None when the feed is unchanged; validators to save once it is done."""
+        if self.source == "yfinance":
+            async with self._semaphore:
+                return await asyncio.to_thread(yfinance_news, ticker), None
+        url = self.feed_url.format(ticker=ticker)
+        etag, last_modified = self.state.validators(url)
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        response = await self._get(url, headers)
+        if response.status_code == 304:
+            return None, None
+        validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return parse_rss(response.content), (url, validators)
+
+    async def _download(self, link: str) -> str:
+        response = await self._get(link)
+        self.report.downloaded += 1
+        self.report.bytes_downloaded += len(response.content)
+        return extract_text(response.text)
+
+    async def _ingest_ticker(self, ticker: str, known: set, pages: Dict[str, asyncio.Task]):
+        try:
+            items, validators = await self._list(ticker)
+        except Exception as e:
+            print(f"  {ticker}: news list failed ({e.__class__.__name__}: {e})")
+            self.report.feeds_failed += 1
+            return ticker, [], None
+        if items is None:
+            self.report.feeds_not_modified += 1
+            return ticker, [], None
+        self.report.feeds_fetched += 1
+        self.report.listed += len(items)
+        new, seen = [], set()
+        for title, link in items:
+            if (ticker, link) not in known and link not in seen:
+                seen.add(link)
+                new.append((title, link))
+        if self.max_per_ticker and len(new) > self.max_per_ticker:
+            # The rest waits for the next run, so the feed must not answer it with a 304
+            new, validators = new[:self.max_per_ticker], None
+        self.report.new_links += len(new)
+        for _, link in new:
+            # The same story is often listed under several tickers: download it once, or not at all if the
+            # dataset already has it under another ticker
+            if link not in pages:
+                text = self._texts.get(link)
+                pages[link] = asyncio.create_task(self._download(link) if text is None else asyncio.sleep(0, text))
+        texts = await asyncio.gather(*(pages[link] for _, link in new), return_exceptions=True)
+        return ticker, list(zip(new, texts)), validators
+
+    @staticmethod
+    def _near_duplicate(indexes: Dict[str, NearDuplicateIndex], dataset: Dict[str, List[dict]], ticker: str,
+                        text: str) -> bool:
+        """Whether `text` near-duplicates an item listed under `ticker`, including ones added in this run."""
+        index = indexes.get(ticker)
+        if index is None:
+            # Seeded on first use, before anything new is appended under the ticker
+            index = indexes[ticker] = NearDuplicateIndex()
+            for item in dataset[ticker]:
+                index.add(item["full_text"])
+        return not index.add(text)[1]
+
+    async def run_async(self, tickers: List[str], dataset_path) -> IngestReport:
+        self.report = IngestReport(tickers=len(tickers))
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        dataset = load_dataset(dataset_path)
+        known = self.state.known_links() | {(t, item["link"]) for t, items in dataset.items() for item in items}
+        self._texts = {item["link"]: item["full_text"] for items in dataset.values() for item in items}
+        pages: Dict[str, asyncio.Task] = {}
+        results = await asyncio.gather(*(self._ingest_ticker(t, known, pages) for t in tickers))
+
+        feeds, links = {}, []
+        indexes: Dict[str, NearDuplicateIndex] = {}
+        for ticker, fetched, validators in results:
+            complete = True
+            for (title, link), text in fetched:
+                if isinstance(text, BaseException):
+                    print(f"  {ticker}: {link} failed ({text.__class__.__name__}: {text})")
+                    self.report.failed += 1
+                    if is_retryable(text):
+                        complete = False
+                    else:
+                        links.append((ticker, link, "gone"))
+                elif len(text) < MIN_ARTICLE_CHARS:
+                    self.report.empty += 1
+                    links.append((ticker, link, "empty"))
+                elif self.dedupe and self._near_duplicate(indexes, dataset, ticker, text):
+                    self.report.duplicates += 1
+                    links.append((ticker, link, "duplicate"))
+                else:
+                    item = {"title": title, "link": link, "ticker": ticker, "full_text": text}
+                    dataset[ticker].append({field: item[field] for field in NEWS_FIELDS})
+                    self.report.added += 1
+                    links.append((ticker, link, "added"))
+            if validators is not None and complete:
+                feeds[validators[0]] = validators[1]
+        # Dataset first: if the process dies before the state is saved, the next run still skips these links
+        if self.report.added:
+            save_dataset(dataset, dataset_path)
+        self.state.save(feeds, links)
+        self.report.seconds = time.perf_counter() - start
+        return self.report
+
+def ingest(tickers: List[str] = None, dataset_path=None, **kwargs) -> IngestReport:
+    """Fetch new articles for `tickers` and merge them into `dataset_path` (default: the ETL's input file)."""
+    from aneval.etl.news_summarizer_etl import INPUT_PATH
+    ingester = NewsIngester(**kwargs)
+    try:
+        return asyncio.run(ingester.run_async(tickers or NEWS_TICKERS, dataset_path or INPUT_PATH))
+    finally:
+        ingester.session.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch new news articles into the ticker-keyed input file.")
+    parser.add_argument("--tickers", default=",".join(NEWS_TICKERS), help="Comma-separated tickers.")
+    parser.add_argument("--output", default=None, help="Dataset to update (default: STOCK_NEWS_INPUT_PATH).")
+    parser.add_argument("--source", choices=("rss", "yfinance"), default="rss")
+    parser.add_argument("--feed-url", default=NEWS_FEED_URL, help="RSS URL template with {ticker}.")
+    parser.add_argument("--state", default=str(INGEST_STATE_PATH))
+    parser.add_argument("--concurrency", type=int, default=INGEST_CONCURRENCY)
+    parser.add_argument("--max-per-ticker", type=int, default=INGEST_MAX_PER_TICKER,
+                        help="New items per ticker (0 = all).")
+    parser.add_argument("--no-dedup", dest="dedupe", action="store_false", default=INGEST_DEDUP,
+                        help="Also add near-copies of articles already listed under the ticker.")
+    args = parser.parse_args()
+    tickers = [t.strip() for t in args.tickers.split(",") if t.strip()]
+    print(ingest(tickers, args.output, state=IngestState(args.state), source=args.source, feed_url=args.feed_url,
+                 concurrency=args.concurrency, max_per_ticker=args.max_per_ticker, dedupe=args.dedupe))
@@ -1,15 +1,234 @@
+import hashlib
 import json
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
 from aneval.models.news_article import NewsArticle
+from aneval.models.response.llm_news_article import LLMNewsArticle
 
-def load_news_articles(json_path: str) -> List[NewsArticle]:
-    with open(json_path, "r") as f:
-        data = json.load(f)
-    articles = []
-    for ticker, news_list in data.items():
-        for item in news_list:
-            # Defensive: skip if any field is missing
-            if all(k in item for k in ("title", "link", "ticker", "full_text")):
-                articles.append(NewsArticle(**item))
-    return articles
\ No newline at end of file
+load_dotenv()
+
+NEWS_FIELDS = ("title", "link", "ticker", "full_text")
+CHUNK_SIZE = 64 * 1024
+# Estimated Jaccard similarity of word shingles above which two articles count as the same story
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.8))
+
+class _JsonStream:
+    """Minimal incremental reader for the two dataset layouts: `{ticker: [item, ...]}` and `[item, ...]`.
+
+    Only the container punctuation is walked by hand; every key and item is decoded with
+    `json.JSONDecoder.raw_decode`, so at most one item plus one read chunk is held in memory.
+    """
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, got {ch!r}")
+        self.pos += 1
+        return ch
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            self.pos = end
+            return value
+
+    def items(self, close: str) -> Iterator:
+        """Yield the elements of the array whose opening bracket was just consumed."""
+        if self.peek() == close:
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect("," + close) == close:
+                return
+
+def iter_json_records(json_path: str) -> Iterator[dict]:
+    """Stream every item of a ticker-keyed object, a flat JSON array or a JSONL file."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        if Path(json_path).suffix == ".jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        stream = _JsonStream(f)
+        if stream.expect("{[") == "[":
+            yield from stream.items("]")
+            return
+        if stream.peek() == "}":
+            return
+        while True:
+            stream.value()  # ticker key
+            stream.expect(":")
+            stream.expect("[")
+            yield from stream.items("]")
+            if stream.expect(",}") == "}":
+                return
+
+# --- Near-duplicate detection (MinHash + LSH over word shingles of full_text) ---
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+LSH_BANDS = 16  # 16 bands x 8 rows: pairs above ~0.7 similarity almost always share a bucket
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def minhash_signature(text: str, num_perm: int = NUM_PERM) -> Tuple[int, ...]:
+    """One-permutation MinHash: each shingle is hashed once into one of `num_perm` bins, keeping the min per bin.
+
+    Empty bins borrow the next non-empty bin's value (rotation densification), so short texts still
+    get a full signature. Cost is linear in the number of shingles instead of shingles x permutations.
+    """
+    empty = 1 << 64
+    bins = [empty] * num_perm
+    for shingle in shingles(text):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        b = h % num_perm
+        value = h // num_perm
+        if value < bins[b]:
+            bins[b] = value
+    if all(v == empty for v in bins):
+        return tuple(bins)
+    for i in range(num_perm):
+        j, offset = i, 0
+        while bins[j] == empty:
+            j = (j + 1) % num_perm
+            offset += 1
+        if offset:
+            bins[i] = bins[j] + offset * empty  # offset keeps borrowed values from colliding with real ones
+    return tuple(bins)
+
+def estimate_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+def content_id(text: str) -> str:
+    """sha256 of a text; the id of an article (and of the cluster it represents) in the store."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class NearDuplicateIndex:
+    """Incremental LSH index: `add` returns the cluster of the first near-identical text seen, or a new one.
+
+    The first article of each cluster is its representative, so the result depends only on input
+    order and new articles can be added one at a time (e.g. while ingesting).
+    """
+
+    def __init__(self, threshold: float = None, num_perm: int = NUM_PERM, bands: int = LSH_BANDS):
+        self.threshold = DEDUP_THRESHOLD if threshold is None else threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = defaultdict(list)
+        self.signatures: Dict[str, Tuple[int, ...]] = {}
+        self.exact: Dict[str, str] = {}
+
+    def add(self, text: str) -> Tuple[str, bool]:
+        """Return (cluster_id, is_new_cluster) for `text`."""
+        exact_id = content_id(text)
+        if exact_id in self.exact:
+            return self.exact[exact_id], False
+        signature = minhash_signature(text, self.num_perm)
+        band_keys = [(b, signature[b * self.rows:(b + 1) * self.rows]) for b in range(self.bands)]
+        candidates = {cid for key in band_keys for cid in self.buckets.get(key, ())}
+        best = max(candidates, key=lambda cid: estimate_similarity(signature, self.signatures[cid]), default=None)
+        if best is not None and estimate_similarity(signature, self.signatures[best]) >= self.threshold:
+            self.exact[exact_id] = best
+            return best, False
+        self.signatures[exact_id] = signature
+        self.exact[exact_id] = exact_id
+        for key in band_keys:
+            self.buckets[key].append(exact_id)
+        return exact_id, True
+
+@dataclass
+class DedupReport:
+    articles: int = 0
+    clusters: int = 0
+
+    @property
+    def duplicates(self) -> int:
+        # Each duplicate is one summarization/evaluation call that no longer has to be made
+        return self.articles - self.clusters
+
+    @property
+    def dedup_ratio(self) -> float:
+        return self.duplicates / self.articles if self.articles else 0.0
+
+    def __str__(self) -> str:
+        return (f"Dedup: {self.articles} articles -> {self.clusters} clusters "
+                f"({self.dedup_ratio:.1%} near-duplicates, {self.duplicates} LLM calls saved)")
+
+def dedupe_articles(articles: Iterable, threshold: float = None, report: Optional[DedupReport] = None) -> Iterator:
+    """Yield copies of `articles` with `cluster_id` set; near-identical `full_text`s share one cluster id."""
+    index = NearDuplicateIndex(threshold)
+    report = report if report is not None else DedupReport()
+    for article in articles:
+        cluster_id, new = index.add(article.full_text)
+        report.articles += 1
+        report.clusters += new
+        yield article.model_copy(update={"cluster_id": cluster_id})
+
+def iter_news_articles(json_path: str, dedupe: bool = False, report: Optional[DedupReport] = None) -> Iterator[NewsArticle]:
+    articles = (NewsArticle(**item) for item in iter_json_records(json_path)
+                # Defensive: skip if any field is missing
+                if all(k in item for k in NEWS_FIELDS))
+    if dedupe:
+        articles = dedupe_articles(articles, report=report)
+    yield from articles
+
+def iter_summarized_articles(json_path: str, unique: bool = False) -> Iterator[LLMNewsArticle]:
+    """Stream summarized articles; with `unique`, only the first article of each near-duplicate cluster."""
+    seen = set()
+    for item in iter_json_records(json_path):
+        article = LLMNewsArticle(**item)
+        if unique and article.cluster_id is not None:
+            if article.cluster_id in seen:
+                continue
+            seen.add(article.cluster_id)
+        yield article
+
+def load_news_articles(json_path: str, dedupe: bool = False, report: Optional[DedupReport] = None) -> List[NewsArticle]:
+    return list(iter_news_articles(json_path, dedupe, report))
+
+def load_summarized_articles(json_path: str, unique: bool = False) -> List[LLMNewsArticle]:
+    return list(iter_summarized_articles(json_path, unique))
@@ -0,0 +1,339 @@
+"""Columnar copy of the evaluation scores, for aggregate analytics across every evaluated summary.
+
+    python -m aneval.services.result_columns sync
+    python -m aneval.services.result_columns report --metric Consistency --by ticker
+    python -m aneval.services.result_columns compare <run A> <run B> --metric Consistency
+
+Every Geval rank and every score parsed from a judge verdict becomes one row. The columns are NumPy arrays
+saved to `EVAL_COLUMNS_PATH` (.npz). Text columns (ticker, prompts, models, metric, run) are dictionary
+encoded: each row holds an int32 code into a vocabulary, so a group-by is an `np.bincount` over the codes.
+`sync` appends the rows written to the evaluation store since the previous sync: those with a newer
+`created_at`, which the store stamps inside the write transaction, so a row can never commit behind one
+already synced. Rows are never rewritten, so a summary that was scored again keeps its older rows. The
+analytics use the newest row per run, article and metric.
+
+A run is one evaluation setup: the summary model and prompt, plus the evaluator's kind, model and context
+budget (and, for the judge, its prompts and questions; for Geval, its sampling mode).
+"""
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from dotenv import load_dotenv
+from aneval.services.geval_service import GEVAL_METRICS
+from aneval.services.judge_service import parse_compare_scores
+from aneval.services.store import EvalStore, content_key, get_eval_store
+
+load_dotenv()
+
+EVAL_COLUMNS_PATH = Path(os.getenv("EVAL_COLUMNS_PATH", "eval_columns.npz"))
+
+CATEGORICAL = ("kind", "metric", "ticker", "article", "title", "summary_prompt", "summary_model", "eval_model",
+               "eval_prompt", "run")
+NUMERIC = {"score": np.float64, "latency": np.float64, "created_at": np.float64, "context_budget": np.int32}
+# Columns the analytics can group by
+GROUP_COLUMNS = ("ticker", "summary_prompt", "summary_model", "eval_model", "run")
+# Geval ranks and judge scores (LLM and embedding comparison alike) are on a 1-5 scale
+SCORES = (1, 2, 3, 4, 5)
+
+# Newest done job of the same kind whose lifetime covers the score's write: its LLM seconds become the latency
+JOB_RESULT = """(SELECT result FROM jobs j WHERE j.summary_id = {table}.summary_id AND j.kind = '{kind}'
+    AND j.status = 'done' AND {table}.created_at BETWEEN j.created_at AND j.updated_at
+    ORDER BY j.updated_at DESC LIMIT 1)"""
+# Ticker and title of the article's first listing
+FIRST_LISTING = "(SELECT {column} FROM article_refs WHERE article_id = s.article_id ORDER BY ref_id LIMIT 1)"
+LISTING = f"{FIRST_LISTING.format(column='ticker')}, {FIRST_LISTING.format(column='title')}"
+
+GEVAL_ROWS = f"""
+SELECT g.created_at, g.metric, g.rank, {LISTING}, s.article_id, s.prompt_id, s.model, g.model, g.prompt_id,
+       g.context_budget, g.max_samples, {JOB_RESULT.format(table="g", kind="geval")}
+FROM geval_scores g JOIN summaries s ON s.summary_id = g.summary_id
+WHERE g.created_at > ? ORDER BY g.created_at
+"""
+JUDGE_ROWS = f"""
+SELECT v.created_at, v.verdict, {LISTING}, s.article_id, s.prompt_id, s.model, v.model, v.judge_prompt_id,
+       v.compare_prompt_id, v.questions_id, v.context_budget, {JOB_RESULT.format(table="v", kind="judge")}
+FROM judge_verdicts v JOIN summaries s ON s.summary_id = v.summary_id
+WHERE v.created_at > ? ORDER BY v.created_at
+"""
+
+def job_seconds(result_json: Optional[str]) -> float:
+    """Seconds spent in LLM calls by a finished job (NaN when the score came from a batch run)."""
+    if not result_json:
+        return float("nan")
+    return sum(row["latency_seconds"] for row in json.loads(result_json).get("calls", []))
+
+def run_label(kind, eval_model, context_budget, summary_model, summary_prompt, setup=None, samples=1) -> str:
+    label = f"{kind} {eval_model}"
+    if context_budget:
+        label += f" ctx {context_budget}"
+    if samples > 1:
+        label += f" samples {samples}"
+    if setup:
+        label += f" setup {setup[:8]}"
+    return f"{label} | {summary_model} prompt {summary_prompt[:8]}"
+
+class ResultColumns:
+    """Append-only, dictionary-encoded score columns. Thread-safe for one writer and many readers."""
+
+    def __init__(self, path=None):
+        self.path = Path(path or EVAL_COLUMNS_PATH)
+        self.columns: Dict[str, np.ndarray] = {name: np.empty(0, np.int32) for name in CATEGORICAL}
+        self.columns.update({name: np.empty(0, dtype) for name, dtype in NUMERIC.items()})
+        self.vocab: Dict[str, List[str]] = {name: [] for name in CATEGORICAL}
+        self._index: Dict[str, Dict[str, int]] = {name: {} for name in CATEGORICAL}
+        # created_at of the newest store row already copied, per source table
+        self.watermarks = {"geval": 0.0, "judge": 0.0}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.columns["score"])
+
+    # --- Encoding ---
+    def _encode(self, name: str, values: Sequence[str]) -> np.ndarray:
+        unique, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        index, vocab = self._index[name], self.vocab[name]
+        for value in unique:
+            if value not in index:
+                index[value] = len(vocab)
+                vocab.append(value)
+        return np.array([index[value] for value in unique], dtype=np.int32)[inverse]
+
+    def code(self, name: str, value: str) -> int:
+        """Code of `value` in a text column (-1 if it never occurs)."""
+        return self._index[name].get(value, -1)
+
+    def labels(self, name: str) -> np.ndarray:
+        return np.array(self.vocab[name], dtype=str)
+
+    def decode(self, name: str, rows=slice(None)) -> np.ndarray:
+        return self.labels(name)[self.columns[name][rows]]
+
+    def mask(self, **equals) -> np.ndarray:
+        """Rows whose text columns equal the given values, e.g. `mask(kind="geval", metric="Fluency")`."""
+        selected = np.ones(len(self), dtype=bool)
+        for name, value in equals.items():
+            if value is not None:
+                selected &= self.columns[name] == self.code(name, value)
+        return selected
+
+    # --- Writes ---
+    def append(self, rows: Dict[str, Sequence]) -> int:
+        """Append equally long columns; text columns are given as strings."""
+        count = len(rows["score"])
+        if not count:
+            return 0
+        with self._lock:
+            new = {name: self._encode(name, rows[name]) for name in CATEGORICAL}
+            new.update({name: np.asarray(rows[name], dtype=dtype) for name, dtype in NUMERIC.items()})
+            self.columns = {name: np.concatenate([self.columns[name], new[name]]) for name in self.columns}
+        return count
+
+    def sync(self, store: EvalStore = None) -> int:
+        """Append the scores written to the store since the last sync; returns the number of new rows."""
+        store = store or get_eval_store()
+        rows = {name: [] for name in (*CATEGORICAL, *NUMERIC)}
+        def add(kind, metric, score, ticker, title, article, summary_prompt, summary_model, eval_model, eval_prompt,
+                budget, seconds, created_at, setup=None, samples=1):
+            # Summary prompt ids are shortened to 8 hex digits, as in run labels
+            values = dict(kind=kind, metric=metric, score=score, ticker=ticker or "", title=title or "",
+                          article=article, summary_prompt=summary_prompt[:8], summary_model=summary_model,
+                          eval_model=eval_model, eval_prompt=eval_prompt, context_budget=budget, latency=seconds,
+                          created_at=created_at,
+                          run=run_label(kind, eval_model, budget, summary_model, summary_prompt, setup, samples))
+            for name, value in values.items():
+                rows[name].append(value)
+
+        geval = store._query(GEVAL_ROWS, (self.watermarks["geval"],))
+        for row in geval:
+            created_at, metric, rank, ticker, title, article, s_prompt, s_model, model, prompt, budget, samples, \
+                result = row
+            # A Geval job scores every metric; each row gets its share of the job's LLM time
+            add("geval", metric, rank, ticker, title, article, s_prompt, s_model, model, prompt, budget,
+                job_seconds(result) / len(GEVAL_METRICS), created_at, samples=samples)
+        judge = store._query(JUDGE_ROWS, (self.watermarks["judge"],))
+        for row in judge:
+            created_at, verdict, ticker, title, article, s_prompt, s_model, model, judge_id, compare_id, questions_id, \
+                budget, result = row
+            scores = parse_compare_scores(verdict)
+            setup = content_key(judge_id, compare_id, questions_id)
+            for metric, score in scores.items():
+                add("judge", metric, score, ticker, title, article, s_prompt, s_model, model, compare_id, budget,
+                    job_seconds(result) / len(scores), created_at, setup)
+
+        added = self.append(rows)
+        if geval:
+            self.watermarks["geval"] = geval[-1][0]
+        if judge:
+            self.watermarks["judge"] = judge[-1][0]
+        return added
+
+    # --- Persistence ---
+    def save(self) -> None:
+        arrays = {f"col_{name}": values for name, values in self.columns.items()}
+        arrays.update({f"vocab_{name}": self.labels(name) for name in CATEGORICAL})
+        arrays["watermarks"] = np.array([self.watermarks["geval"], self.watermarks["judge"]])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp.npz")
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, self.path)
+
+    @classmethod
+    def load(cls, path=None) -> "ResultColumns":
+        columns = cls(path)
+        if columns.path.exists():
+            with np.load(columns.path) as data:
+                for name in columns.columns:
+                    columns.columns[name] = data[f"col_{name}"]
+                for name in CATEGORICAL:
+                    columns.vocab[name] = data[f"vocab_{name}"].tolist()
+                    columns._index[name] = {value: i for i, value in enumerate(columns.vocab[name])}
+                columns.watermarks["geval"], columns.watermarks["judge"] = data["watermarks"].tolist()
+        return columns
+
+_columns: Dict[Path, ResultColumns] = {}
+_columns_lock = threading.Lock()
+
+def get_result_columns(path=None, store: EvalStore = None) -> ResultColumns:
+    """Process-wide columns for `path`, synced with the store (and saved if anything new was appended)."""
+    path = Path(path or EVAL_COLUMNS_PATH).resolve()
+    with _columns_lock:
+        columns = _columns.get(path)
+        if columns is None:
+            columns = _columns[path] = ResultColumns.load(path)
+        if columns.sync(store):
+            columns.save()
+        return columns
+
+# --- Vectorized analytics ---
+def latest_rows(columns: ResultColumns, mask: np.ndarray) -> np.ndarray:
+    """Indices of the newest row per (run, article, metric) among the masked rows."""
+    rows = np.flatnonzero(mask)
+    c = columns.columns
+    order = rows[np.lexsort((c["created_at"][rows], c["metric"][rows], c["article"][rows], c["run"][rows]))]
+    if not len(order):
+        return order
+    keys = np.stack([c["run"][order], c["article"][order], c["metric"][order]])
+    last = np.r_[np.any(keys[:, 1:] != keys[:, :-1], axis=0), True]
+    return order[last]
+
+def group_scores(columns: ResultColumns, by: str, mask: np.ndarray) -> Dict[str, np.ndarray]:
+    """Count, mean, standard deviation and mean latency of the score per value of `by`, worst mean first."""
+    rows = latest_rows(columns, mask)
+    groups = columns.columns[by][rows]
+    scores = columns.columns["score"][rows]
+    latency = columns.columns["latency"][rows]
+    size = len(columns.vocab[by])
+    count = np.bincount(groups, minlength=size)
+    total = np.bincount(groups, weights=scores, minlength=size)
+    squares = np.bincount(groups, weights=scores ** 2, minlength=size)
+    timed = ~np.isnan(latency)
+    latency_count = np.bincount(groups[timed], minlength=size)
+    latency_total = np.bincount(groups[timed], weights=latency[timed], minlength=size)
+    present = np.flatnonzero(count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total[present] / count[present]
+        std = np.sqrt(np.maximum(squares[present] / count[present] - mean ** 2, 0.0))
+        mean_latency = latency_total[present] / latency_count[present]
+    order = np.argsort(mean, kind="stable")
+    return {
+        by: columns.labels(by)[present][order],
+        "count": count[present][order],
+        "mean": mean[order],
+        "std": std[order],
+        "mean_latency_seconds": mean_latency[order],
+    }
+
+def score_distribution(columns: ResultColumns, mask: np.ndarray, by: Optional[str] = None):
+    """`(labels, counts)`: how many scores round to 1, 2, 3, 4 and 5, per value of `by` (or "all" without it)."""
+    rows = latest_rows(columns, mask)
+    bucket = np.clip(np.rint(columns.columns["score"][rows]).astype(np.int64), 1, len(SCORES)) - 1
+    if by is None:
+        return np.array(["all"]), np.bincount(bucket, minlength=len(SCORES))[None, :]
+    groups = columns.columns[by][rows]
+    size = len(columns.vocab[by])
+    counts = np.bincount(groups * len(SCORES) + bucket, minlength=size * len(SCORES)).reshape(size, len(SCORES))
+    present = np.flatnonzero(counts.sum(axis=1))
+    return columns.labels(by)[present], counts[present]
+
+def compare_runs(columns: ResultColumns, run_a: str, run_b: str, metric: str, by: str = "ticker") -> dict:
+    """Score changes from run A to run B on the articles both scored on `metric`.
+
+    Returns the paired count, both means, the mean change, the share of articles that got worse or better,
+    the mean change per value of `by`, and the articles sorted by change (largest drop first).
+    """
+    rows_a = latest_rows(columns, columns.mask(run=run_a, metric=metric))
+    rows_b = latest_rows(columns, columns.mask(run=run_b, metric=metric))
+    c = columns.columns
+    _, in_a, in_b = np.intersect1d(c["article"][rows_a], c["article"][rows_b], assume_unique=True,
+                                   return_indices=True)
+    rows_a, rows_b = rows_a[in_a], rows_b[in_b]
+    before, after = c["score"][rows_a], c["score"][rows_b]
+    delta = after - before
+    groups = c[by][rows_b]
+    size = len(columns.vocab[by])
+    count = np.bincount(groups, minlength=size)
+    present = np.flatnonzero(count)
+    group_delta = np.bincount(groups, weights=delta, minlength=size)[present] / count[present]
+    group_order = np.argsort(group_delta, kind="stable")
+    order = np.argsort(delta, kind="stable")
+    paired = len(delta)
+    return {
+        "paired": paired,
+        "mean_a": float(before.mean()) if paired else None,
+        "mean_b": float(after.mean()) if paired else None,
+        "mean_change": float(delta.mean()) if paired else None,
+        "worse": float((delta < 0).mean()) if paired else None,
+        "better": float((delta > 0).mean()) if paired else None,
+        "by_group": {by: columns.labels(by)[present][group_order], "paired": count[present][group_order],
+                     "mean_change": group_delta[group_order]},
+        "articles": {"title": columns.decode("title", rows_b[order]),
+                     "ticker": columns.decode("ticker", rows_b[order]),
+                     "score_a": before[order], "score_b": after[order], "change": delta[order]},
+    }
+
+def table_rows(table: Dict[str, np.ndarray]) -> List[dict]:
+    """Column arrays as a list of row dicts, for printing or `st.dataframe`."""
+    names = list(table)
+    return [dict(zip(names, values)) for values in zip(*(np.asarray(table[n]).tolist() for n in names))]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar evaluation scores and their aggregates.")
+    parser.add_argument("--path", default=str(EVAL_COLUMNS_PATH))
+    parser.add_argument("--db", default=None, help="Evaluation store (default: EVAL_DB_PATH).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync", help="Append the scores added to the store since the last sync.")
+    report = sub.add_parser("report", help="Scores grouped by a column, worst first.")
+    report.add_argument("--by", choices=GROUP_COLUMNS, default="ticker")
+    report.add_argument("--kind", choices=("geval", "judge"), default=None)
+    report.add_argument("--metric", default="Consistency")
+    compare = sub.add_parser("compare", help="Per-article score changes between two runs.")
+    compare.add_argument("run_a")
+    compare.add_argument("run_b")
+    compare.add_argument("--metric", default="Consistency")
+    compare.add_argument("--top", type=int, default=10, help="Largest drops to list.")
+    args = parser.parse_args()
+    store = EvalStore(args.db) if args.db else get_eval_store()
+    columns = ResultColumns.load(args.path)
+    added = columns.sync(store)
+    if added:
+        columns.save()
+    if args.command == "sync":
+        print(f"Appended {added} rows; {len(columns)} rows, {len(columns.vocab['run'])} runs in {args.path}")
+        for run in columns.vocab["run"]:
+            print(f"  {run}")
+    elif args.command == "report":
+        for row in table_rows(group_scores(columns, args.by, columns.mask(kind=args.kind, metric=args.metric))):
+            print(json.dumps(row))
+    else:
+        result = compare_runs(columns, args.run_a, args.run_b, args.metric)
+        articles = result.pop("articles")
+        by_group = result.pop("by_group")
+        print(json.dumps(result, indent=2))
+        for row in table_rows(by_group):
+            print(json.dumps(row))
+        for row in table_rows(articles)[:args.top]:
+            print(json.dumps(row))
@@ -0,0 +1,101 @@
+"""Question-aware context compaction: keep only the article passages that matter for a question.
+
+The article is split into sentence-aligned passages and ranked with an in-memory BM25 index built
+once per article. The best passages that fit a token budget are returned in their original order.
+"""
+import math
+import os
+import re
+from collections import Counter
+from typing import List
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Default token budget for a compacted article context (0 = send the full article)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 0))
+PASSAGE_TOKENS = 60
+GAP_MARKER = "\n[...]\n"
+
+TOKEN_RE = re.compile(r"\w+")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from has have how in is it its of on or that the this to "
+    "was were what when which who why will with".split()
+)
+
+def estimate_tokens(text: str) -> int:
+    # Rough chars-per-token heuristic; good enough to compare prompt sizes between modes
+    return max(1, len(text) // 4)
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+def split_passages(text: str, max_tokens: int = PASSAGE_TOKENS) -> List[str]:
+    """Group consecutive sentences into passages of at most ~`max_tokens` (a long sentence stays whole)."""
+    passages, current = [], []
+    for sentence in SENTENCE_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and estimate_tokens(" ".join(current + [sentence])) > max_tokens:
+            passages.append(" ".join(current))
+            current = []
+        current.append(sentence)
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+class BM25Index:
+    def __init__(self, passages: List[str], k1: float = 1.5, b: float = 0.75):
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(tokenize(p)) for p in passages]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        n = len(passages)
+        doc_freqs = Counter(term for tf in self.term_freqs for term in tf)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freqs.items()}
+
+    def scores(self, query: str) -> List[float]:
+        terms = [t for t in set(tokenize(query)) if t in self.idf]
+        scores = []
+        for tf, length in zip(self.term_freqs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+            scores.append(sum(self.idf[t] * tf[t] * (self.k1 + 1) / (tf[t] + norm) for t in terms if t in tf))
+        return scores
+
+class ContextCompactor:
+    """BM25 index over one article, reused for every question asked about it."""
+
+    def __init__(self, text: str, passage_tokens: int = PASSAGE_TOKENS):
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        self.index = BM25Index(split_passages(text, passage_tokens))
+
+    def compact(self, query: str, token_budget: int = None) -> str:
+        """Best-scoring passages for `query` within `token_budget`, in article order; the full text if it fits."""
+        if not token_budget or self.tokens <= token_budget or not self.index.passages:
+            return self.text
+        scores = self.index.scores(query)
+        # Ties (including no matching terms at all) go to the earliest passage, i.e. the article's lead
+        ranked = sorted(range(len(scores)), key=lambda i: (-scores[i], i))
+        chosen, used = [], 0
+        for i in ranked:
+            cost = estimate_tokens(self.index.passages[i])
+            if used + cost <= token_budget:
+                chosen.append(i)
+                used += cost
+        if not chosen:
+            chosen = ranked[:1]
+        chosen.sort()
+        parts = [self.index.passages[chosen[0]]]
+        for prev, i in zip(chosen, chosen[1:]):
+            parts.append((" " if i == prev + 1 else GAP_MARKER) + self.index.passages[i])
+        return "".join(parts)
+
+def compact_context(text: str, query: str, token_budget: int = None) -> str:
+    if not token_budget or estimate_tokens(text) <= token_budget:
+        return text
+    return ContextCompactor(text).compact(query, token_budget)
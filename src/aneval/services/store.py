@@ -0,0 +1,573 @@
+"""Normalized, content-addressed SQLite store for articles, summaries and evaluations.
+
+Each article text is stored once, keyed by the sha256 of its `full_text`. The ticker/link listings
+that point at it are kept separately. Summaries reference an article plus the prompt and model that
+produced them. Judge answers, judge verdicts and Geval scores reference a summary plus their own
+prompt and model. Near-duplicate articles point at their cluster representative, and only the
+representative is summarized and evaluated.
+
+    python -m aneval.services.store import stock_news_summarized.json
+    python -m aneval.services.store export stock_news_summarized.json
+    python -m aneval.services.store stats
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+from aneval.models.response.llm_news_article import FAILED_SUMMARY, LLMNewsArticle
+from aneval.services.news_service import content_id, iter_summarized_articles
+
+load_dotenv()
+
+EVAL_DB_PATH = Path(os.getenv("EVAL_DB_PATH", "aneval.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    article_id TEXT PRIMARY KEY,  -- sha256 of full_text
+    full_text TEXT NOT NULL,
+    cluster_id TEXT               -- article_id of the near-duplicate representative
+);
+CREATE TABLE IF NOT EXISTS article_refs (
+    ref_id INTEGER PRIMARY KEY,   -- ingest order, used for stable paging
+    ticker TEXT NOT NULL,
+    link TEXT NOT NULL,
+    title TEXT NOT NULL,
+    article_id TEXT NOT NULL REFERENCES articles (article_id),
+    UNIQUE (ticker, link)
+);
+CREATE INDEX IF NOT EXISTS article_refs_article ON article_refs (article_id);
+CREATE TABLE IF NOT EXISTS prompts (
+    prompt_id TEXT PRIMARY KEY,   -- sha256 of text
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS summaries (
+    summary_id TEXT PRIMARY KEY,
+    article_id TEXT NOT NULL REFERENCES articles (article_id),
+    prompt_id TEXT NOT NULL REFERENCES prompts (prompt_id),
+    model TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (article_id, prompt_id, model)
+);
+CREATE TABLE IF NOT EXISTS judge_answers (
+    summary_id TEXT NOT NULL REFERENCES summaries (summary_id),
+    judge_prompt_id TEXT NOT NULL REFERENCES prompts (prompt_id),
+    model TEXT NOT NULL,
+    context_budget INTEGER NOT NULL DEFAULT 0,
+    question TEXT NOT NULL,
+    side TEXT NOT NULL,           -- 'summary' or 'article': which context the answer came from
+    answer TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (summary_id, judge_prompt_id, model, context_budget, question, side)
+);
+CREATE TABLE IF NOT EXISTS judge_verdicts (
+    summary_id TEXT NOT NULL REFERENCES summaries (summary_id),
+    judge_prompt_id TEXT NOT NULL REFERENCES prompts (prompt_id),
+    compare_prompt_id TEXT NOT NULL REFERENCES prompts (prompt_id),
+    questions_id TEXT NOT NULL REFERENCES prompts (prompt_id),
+    model TEXT NOT NULL,
+    context_budget INTEGER NOT NULL DEFAULT 0,
+    verdict TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (summary_id, judge_prompt_id, compare_prompt_id, questions_id, model, context_budget)
+);
+CREATE TABLE IF NOT EXISTS article_answers (
+    -- Article-side judge answers depend only on the article, never on the summary being judged
+    article_id TEXT NOT NULL REFERENCES articles (article_id),
+    judge_prompt_id TEXT NOT NULL REFERENCES prompts (prompt_id),
+    questions_id TEXT NOT NULL REFERENCES prompts (prompt_id),
+    model TEXT NOT NULL,
+    context_budget INTEGER NOT NULL DEFAULT 0,
+    batched INTEGER NOT NULL,
+    answers TEXT NOT NULL,        -- JSON list, one answer per question
+    created_at REAL NOT NULL,
+    PRIMARY KEY (article_id, judge_prompt_id, questions_id, model, context_budget, batched)
+);
+CREATE TABLE IF NOT EXISTS geval_scores (
+    summary_id TEXT NOT NULL REFERENCES summaries (summary_id),
+    metric TEXT NOT NULL,
+    prompt_id TEXT NOT NULL REFERENCES prompts (prompt_id),
+    model TEXT NOT NULL,
+    context_budget INTEGER NOT NULL DEFAULT 0,
+    max_samples INTEGER NOT NULL DEFAULT 1,  -- sampling mode: 1 = one rank, N = mean of up to N sampled ranks
+    rank REAL NOT NULL,           -- the rank, or the mean of the sampled ranks
+    samples INTEGER NOT NULL DEFAULT 1,      -- ranks drawn (sampling may stop before max_samples)
+    half_width REAL,              -- half-width of the mean's 95% confidence interval; NULL for one rank
+    distribution TEXT,            -- JSON {rank: share of the samples}; NULL for one rank
+    created_at REAL NOT NULL,
+    PRIMARY KEY (summary_id, metric, prompt_id, model, context_budget, max_samples)
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,           -- 'judge' or 'geval'
+    summary_id TEXT NOT NULL REFERENCES summaries (summary_id),
+    params TEXT NOT NULL,         -- JSON: model, prompts, questions, context budget
+    status TEXT NOT NULL,         -- 'queued', 'running', 'done' or 'failed'
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    result TEXT,                  -- JSON, shown by the app
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_summary ON jobs (summary_id, kind, created_at);
+"""
+
+# Tables rebuilt on open when their stored columns differ from SCHEMA; the shared columns are copied over
+MIGRATED_TABLES = ("geval_scores",)
+
+JOB_COLUMNS = "job_id, kind, summary_id, params, status, done, total, result, error, created_at, updated_at"
+
+# Listing + the newest summary of the article's cluster representative (optionally for one prompt/model)
+ARTICLE_ROWS = """
+SELECT r.ref_id, r.title, r.link, r.ticker, a.full_text, a.cluster_id, s.summary
+FROM article_refs r
+JOIN articles a ON a.article_id = r.article_id
+JOIN summaries s ON s.summary_id = (
+    SELECT summary_id FROM summaries
+    WHERE article_id = COALESCE(a.cluster_id, a.article_id) {summary_filter}
+    ORDER BY created_at DESC LIMIT 1
+)
+"""
+
+def content_key(*parts) -> str:
+    """Stable sha256 over the given parts; identical inputs map to the same key."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part if part is not None else "").encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+def summary_key(article_id: str, prompt_id: str, model: str) -> str:
+    return content_key(article_id, prompt_id, model)
+
+def geval_score_columns(score) -> tuple:
+    """`(rank, samples, half_width, distribution)` of a rank or of a sampled `GevalEstimate`."""
+    if not hasattr(score, "distribution"):
+        return float(score), 1, None, None
+    half_width = score.half_width if math.isfinite(score.half_width) else None
+    return score.mean, score.samples, half_width, json.dumps(score.distribution)
+
+def migrate(conn: sqlite3.Connection) -> None:
+    """Rebuild each of MIGRATED_TABLES whose columns (name, type, default, key) predate SCHEMA."""
+    for table in MIGRATED_TABLES:
+        create = re.search(rf"CREATE TABLE IF NOT EXISTS {table} \(.*?\n\);", SCHEMA, re.S).group(0)
+        scratch = sqlite3.connect(":memory:")
+        scratch.execute(create)
+        expected = [row[1:] for row in scratch.execute(f"PRAGMA table_info({table})")]
+        scratch.close()
+        stored = [row[1:] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if stored == expected:
+            continue
+        shared = ", ".join(c[0] for c in expected if c[0] in {s[0] for s in stored})
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+            conn.execute(create)
+            conn.execute(f"INSERT INTO {table} ({shared}) SELECT {shared} FROM {table}_old")
+            conn.execute(f"DROP TABLE {table}_old")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+class EvalStore:
+    """Single-file store shared by the ETL, the batch evaluators and the app.
+
+    The connection is opened on first use; writes are serialized and each bulk call is one transaction.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or EVAL_DB_PATH)
+        self._conn = None
+        self._lock = threading.RLock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            migrate(self._conn)
+        return self._conn
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # --- Writes ---
+    def add_prompts(self, conn, texts: Iterable[str]) -> List[str]:
+        ids = []
+        for text in texts:
+            prompt_id = content_id(text)
+            conn.execute("INSERT OR IGNORE INTO prompts (prompt_id, text) VALUES (?, ?)", (prompt_id, text))
+            ids.append(prompt_id)
+        return ids
+
+    def add_articles(self, articles: Iterable) -> List[str]:
+        """Bulk upsert articles and their ticker/link listings; returns the article id of each, in order."""
+        ids, article_rows, ref_rows = [], {}, []
+        for article in articles:
+            article_id = content_id(article.full_text)
+            ids.append(article_id)
+            article_rows.setdefault(article_id, (article_id, article.full_text, getattr(article, "cluster_id", None)))
+            ref_rows.append((article.ticker, article.link, article.title, article_id))
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO articles (article_id, full_text, cluster_id) VALUES (?, ?, ?) "
+                "ON CONFLICT (article_id) DO UPDATE SET cluster_id = COALESCE(excluded.cluster_id, cluster_id)",
+                article_rows.values(),
+            )
+            conn.executemany(
+                "INSERT INTO article_refs (ticker, link, title, article_id) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (ticker, link) DO UPDATE SET title = excluded.title, article_id = excluded.article_id",
+                ref_rows,
+            )
+        return ids
+
+    def add_summaries(self, rows: Iterable[Tuple[str, str]], prompt: str, model: str) -> List[str]:
+        """Bulk insert `(article_id, summary)` rows produced by `prompt` and `model`; returns summary ids."""
+        now = time.time()
+        with self.transaction() as conn:
+            (prompt_id,) = self.add_prompts(conn, [prompt])
+            values = [(summary_key(a, prompt_id, model), a, prompt_id, model, s, now) for a, s in rows]
+            conn.executemany(
+                "INSERT OR REPLACE INTO summaries (summary_id, article_id, prompt_id, model, summary, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                values,
+            )
+        return [v[0] for v in values]
+
+    def add_geval_scores(self, rows: Iterable[Tuple[str, str, str, object]], model: str,
+                         context_budget: Optional[int] = None, max_samples: int = 1) -> None:
+        """Bulk insert `(summary_id, metric, metric_prompt, score)` rows.
+
+        `score` is a rank, or a sampled `GevalEstimate` whose sample count, interval and distribution are kept too.
+        """
+        with self.transaction() as conn:
+            # Stamped while holding the write lock, so created_at follows commit order (see `ResultColumns.sync`)
+            now = time.time()
+            values = [
+                (summary_id, metric, self.add_prompts(conn, [prompt])[0], model, context_budget or 0, max_samples,
+                 *geval_score_columns(score), now)
+                for summary_id, metric, prompt, score in rows
+            ]
+            conn.executemany(
+                "INSERT OR REPLACE INTO geval_scores (summary_id, metric, prompt_id, model, context_budget, "
+                "max_samples, rank, samples, half_width, distribution, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                values,
+            )
+
+    def add_judge_result(self, summary_id: str, model: str, judge_prompt: str, compare_prompt: str,
+                         questions: List[str], summary_answers: List[str], article_answers: List[str],
+                         verdict: str, context_budget: Optional[int] = None) -> None:
+        budget = context_budget or 0
+        with self.transaction() as conn:
+            # Stamped while holding the write lock, as in `add_geval_scores`
+            now = time.time()
+            judge_id, compare_id, questions_id = self.add_prompts(
+                conn, [judge_prompt, compare_prompt, "\n".join(questions)]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO judge_answers "
+                "(summary_id, judge_prompt_id, model, context_budget, question, side, answer, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(summary_id, judge_id, model, budget, q, side, answer, now)
+                 for side, answers in (("summary", summary_answers), ("article", article_answers))
+                 for q, answer in zip(questions, answers)],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO judge_verdicts (summary_id, judge_prompt_id, compare_prompt_id, questions_id, "
+                "model, context_budget, verdict, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (summary_id, judge_id, compare_id, questions_id, model, budget, verdict, now),
+            )
+
+    def add_article_answers(self, article_id: str, model: str, judge_prompt: str, questions: List[str],
+                            answers: List[str], batched: bool, context_budget: Optional[int] = None) -> None:
+        with self.transaction() as conn:
+            judge_id, questions_id = self.add_prompts(conn, [judge_prompt, "\n".join(questions)])
+            conn.execute(
+                "INSERT OR REPLACE INTO article_answers (article_id, judge_prompt_id, questions_id, model, "
+                "context_budget, batched, answers, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (article_id, judge_id, questions_id, model, context_budget or 0, int(batched), json.dumps(answers),
+                 time.time()),
+            )
+
+    # --- Background jobs (see aneval.services.jobs) ---
+    def add_job(self, job_id: str, kind: str, summary_id: str, params: dict, total: int) -> None:
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, summary_id, params, status, total, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, summary_id, json.dumps(params, sort_keys=True), total, now, now),
+            )
+
+    def update_job(self, job_id: str, **fields) -> None:
+        """Set `status`, `done`, `total`, `result` (JSON-encoded here) and/or `error` of a job."""
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        fields["updated_at"] = time.time()
+        with self.transaction() as conn:
+            conn.execute(f"UPDATE jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE job_id = ?",
+                         [*fields.values(), job_id])
+
+    def _jobs(self, where: str, params: Sequence, limit: Optional[int] = None) -> List[dict]:
+        sql = (f"SELECT {JOB_COLUMNS}, (SELECT r.title FROM summaries s JOIN article_refs r ON r.article_id = s.article_id "
+               f"WHERE s.summary_id = jobs.summary_id ORDER BY r.ref_id LIMIT 1) FROM jobs WHERE {where} "
+               f"ORDER BY created_at DESC")
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        jobs = []
+        for row in self._query(sql, params):
+            job = dict(zip(JOB_COLUMNS.split(", ") + ["title"], row))
+            job["params"] = json.loads(job["params"])
+            job["result"] = json.loads(job["result"]) if job["result"] else None
+            jobs.append(job)
+        return jobs
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        jobs = self._jobs("job_id = ?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def latest_job(self, kind: str, summary_id: str) -> Optional[dict]:
+        """Newest job of `kind` for this summary, whoever submitted it."""
+        jobs = self._jobs("kind = ? AND summary_id = ?", (kind, summary_id), limit=1)
+        return jobs[0] if jobs else None
+
+    def active_job(self, kind: str, summary_id: str, params: dict) -> Optional[dict]:
+        """A queued or running job with exactly these parameters, if any."""
+        jobs = self._jobs("kind = ? AND summary_id = ? AND params = ? AND status IN ('queued', 'running')",
+                          (kind, summary_id, json.dumps(params, sort_keys=True)), limit=1)
+        return jobs[0] if jobs else None
+
+    def recent_jobs(self, limit: int = 50) -> List[dict]:
+        return self._jobs("1", (), limit=limit)
+
+    def fail_unfinished_jobs(self, error: str) -> int:
+        """Mark jobs left queued or running (e.g. by a process that exited) as failed."""
+        with self.transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE status IN ('queued', 'running')",
+                (error, time.time()),
+            ).rowcount
+
+    # --- Lookups ---
+    def summary_article(self, summary_id: str) -> Optional[LLMNewsArticle]:
+        """The summarized article behind a stored summary, with its first listing."""
+        rows = self._query(
+            "SELECT r.title, r.link, r.ticker, a.full_text, a.cluster_id, s.summary "
+            "FROM summaries s JOIN articles a ON a.article_id = s.article_id "
+            "JOIN article_refs r ON r.ref_id = (SELECT MIN(ref_id) FROM article_refs WHERE article_id = s.article_id) "
+            "WHERE s.summary_id = ?",
+            (summary_id,),
+        )
+        if not rows:
+            return None
+        title, link, ticker, full_text, cluster_id, summary = rows[0]
+        return LLMNewsArticle(title=title, link=link, ticker=ticker, full_text=full_text, summary=summary,
+                              cluster_id=cluster_id)
+
+    def summaries_for(self, article_ids: Iterable[str], prompt: str, model: str) -> Dict[str, str]:
+        """`{article_id: summary}` for the given articles, prompt and model."""
+        prompt_id = content_id(prompt)
+        found = {}
+        ids = list(dict.fromkeys(article_ids))
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            found.update(self._query(
+                f"SELECT article_id, summary FROM summaries WHERE prompt_id = ? AND model = ? "
+                f"AND article_id IN ({','.join('?' * len(chunk))})",
+                [prompt_id, model, *chunk],
+            ))
+        return found
+
+    def summary_id_for(self, full_text: str, summary: str) -> Optional[str]:
+        """Id of the stored summary with this text for this article (or its cluster representative)."""
+        rows = self._query(
+            "SELECT s.summary_id FROM articles a JOIN summaries s ON s.article_id = COALESCE(a.cluster_id, a.article_id) "
+            "WHERE a.article_id = ? AND s.summary = ? ORDER BY s.created_at DESC LIMIT 1",
+            (content_id(full_text), summary),
+        )
+        return rows[0][0] if rows else None
+
+    def iter_summaries(self, model: Optional[str] = None, prompt: Optional[str] = None,
+                       limit: Optional[int] = None) -> Iterator[Tuple[str, LLMNewsArticle]]:
+        """`(summary_id, article)` for every stored summary, each with its article's first listing."""
+        sql = (
+            "SELECT s.summary_id, r.title, r.link, r.ticker, a.full_text, a.cluster_id, s.summary "
+            "FROM summaries s JOIN articles a ON a.article_id = s.article_id "
+            "JOIN article_refs r ON r.ref_id = (SELECT MIN(ref_id) FROM article_refs WHERE article_id = s.article_id) "
+            "WHERE (? IS NULL OR s.model = ?) AND (? IS NULL OR s.prompt_id = ?) ORDER BY r.ref_id"
+        )
+        prompt_id = content_id(prompt) if prompt is not None else None
+        params = [model, model, prompt_id, prompt_id]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for summary_id, title, link, ticker, full_text, cluster_id, summary in self._query(sql, params):
+            yield summary_id, LLMNewsArticle(title=title, link=link, ticker=ticker, full_text=full_text,
+                                             summary=summary, cluster_id=cluster_id)
+
+    def article_answers(self, article_id: str, model: str, judge_prompt: str, questions: List[str],
+                        batched: bool, context_budget: Optional[int] = None) -> Optional[List[str]]:
+        """Memoized article-side judge answers for these questions, prompt, model and settings."""
+        rows = self._query(
+            "SELECT answers FROM article_answers WHERE article_id = ? AND judge_prompt_id = ? AND questions_id = ? "
+            "AND model = ? AND context_budget = ? AND batched = ?",
+            (article_id, content_id(judge_prompt), content_id("\n".join(questions)), model, context_budget or 0,
+             int(batched)),
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def judge_verdict(self, summary_id: str, model: str, judge_prompt: str, compare_prompt: str,
+                      questions: List[str], context_budget: Optional[int] = None) -> Optional[str]:
+        """Stored verdict for exactly this judge configuration, if any."""
+        rows = self._query(
+            "SELECT verdict FROM judge_verdicts WHERE summary_id = ? AND judge_prompt_id = ? AND compare_prompt_id = ? "
+            "AND questions_id = ? AND model = ? AND context_budget = ?",
+            (summary_id, content_id(judge_prompt), content_id(compare_prompt), content_id("\n".join(questions)),
+             model, context_budget or 0),
+        )
+        return rows[0][0] if rows else None
+
+    def geval_done(self, model: str, context_budget: Optional[int] = None, max_samples: int = 1) -> set:
+        """`(summary_id, metric, prompt_id)` of every Geval score already stored for this model, budget and sampling."""
+        return set(self._query(
+            "SELECT summary_id, metric, prompt_id FROM geval_scores "
+            "WHERE model = ? AND context_budget = ? AND max_samples = ?",
+            (model, context_budget or 0, max_samples),
+        ))
+
+    def geval_scores(self, summary_id: str) -> Dict[str, float]:
+        rows = self._query("SELECT metric, rank FROM geval_scores WHERE summary_id = ? ORDER BY created_at", (summary_id,))
+        return dict(rows)
+
+    def mean_geval_ranks(self, model: Optional[str] = None, max_samples: Optional[int] = None) -> Dict[str, float]:
+        return dict(self._query(
+            "SELECT metric, AVG(rank) FROM geval_scores WHERE (? IS NULL OR model = ?) "
+            "AND (? IS NULL OR max_samples = ?) GROUP BY metric",
+            (model, model, max_samples, max_samples),
+        ))
+
+    def judge_verdicts(self, summary_id: str) -> List[str]:
+        return [r[0] for r in self._query(
+            "SELECT verdict FROM judge_verdicts WHERE summary_id = ? ORDER BY created_at DESC", (summary_id,)
+        )]
+
+    # --- Dashboard listing ---
+    @staticmethod
+    def _summary_filter(prompt: Optional[str], model: Optional[str]) -> Tuple[str, list]:
+        clauses, params = "", []
+        if prompt is not None:
+            clauses += " AND prompt_id = ?"
+            params.append(content_id(prompt))
+        if model is not None:
+            clauses += " AND model = ?"
+            params.append(model)
+        return clauses, params
+
+    @property
+    def tickers(self) -> List[str]:
+        return [r[0] for r in self._query("SELECT DISTINCT ticker FROM article_refs ORDER BY ticker")]
+
+    def count(self, ticker: Optional[str] = None, prompt: Optional[str] = None, model: Optional[str] = None) -> int:
+        """Number of summarized listings, optionally within one ticker."""
+        summary_filter, params = self._summary_filter(prompt, model)
+        sql = f"SELECT COUNT(*) FROM ({ARTICLE_ROWS.format(summary_filter=summary_filter)} WHERE (? IS NULL OR r.ticker = ?))"
+        return self._query(sql, [*params, ticker, ticker])[0][0]
+
+    def page(self, page: int, page_size: int, ticker: Optional[str] = None, prompt: Optional[str] = None,
+             model: Optional[str] = None) -> List[Tuple[int, LLMNewsArticle]]:
+        """`(ref_id, article)` pairs for the 1-based `page`, each with its newest summary."""
+        summary_filter, params = self._summary_filter(prompt, model)
+        sql = (f"{ARTICLE_ROWS.format(summary_filter=summary_filter)} WHERE (? IS NULL OR r.ticker = ?) "
+               f"ORDER BY r.ref_id LIMIT ? OFFSET ?")
+        rows = self._query(sql, [*params, ticker, ticker, page_size, (page - 1) * page_size])
+        return [
+            (ref_id, LLMNewsArticle(title=title, link=link, ticker=t, full_text=text, summary=summary, cluster_id=cid))
+            for ref_id, title, link, t, text, cid, summary in rows
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        tables = ("articles", "article_refs", "prompts", "summaries", "judge_answers", "judge_verdicts", "geval_scores",
+                  "article_answers", "jobs")
+        return {table: self._query(f"SELECT COUNT(*) FROM {table}")[0][0] for table in tables}
+
+    # --- Import / export of the legacy JSON files ---
+    def import_summarized_json(self, path, prompt: str, model: str) -> int:
+        """Load a summarized JSON/JSONL file (e.g. `stock_news_summarized.json`) produced by `prompt` and `model`."""
+        articles = list(iter_summarized_articles(str(path)))
+        ids = self.add_articles(articles)
+        rows = {a_id: a.summary for a_id, a in zip(ids, articles) if a.summary != FAILED_SUMMARY}
+        self.add_summaries(rows.items(), prompt, model)
+        return len(rows)
+
+    def export_summarized_json(self, path, prompt: Optional[str] = None, model: Optional[str] = None) -> int:
+        """Write every summarized listing as the legacy JSON array (for tools that still read the file)."""
+        articles = [a.model_dump() for _, a in self.page(1, -1, prompt=prompt, model=model)]
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(articles, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+        return len(articles)
+
+_stores: Dict[Path, EvalStore] = {}
+_stores_lock = threading.Lock()
+
+def get_eval_store(path=None) -> EvalStore:
+    """Process-wide store for `path` (default `EVAL_DB_PATH`), shared across Streamlit sessions and threads."""
+    path = Path(path or EVAL_DB_PATH).resolve()
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = EvalStore(path)
+        return store
+
+if __name__ == "__main__":
+    from aneval.llms.gemini import GEMINI_DEFAULT_MODEL, NEWS_SUMMARY_PROMPT
+    parser = argparse.ArgumentParser(description="Manage the article/summary/evaluation store.")
+    parser.add_argument("--db", default=str(EVAL_DB_PATH))
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Import a summarized JSON/JSONL file.")
+    imp.add_argument("path")
+    imp.add_argument("--model", default=os.getenv("GEMINI_LLM", GEMINI_DEFAULT_MODEL))
+    imp.add_argument("--prompt-file", default=None, help="Summary prompt used (default: the built-in prompt).")
+    exp = sub.add_parser("export", help="Export summarized articles as a JSON array.")
+    exp.add_argument("path")
+    exp.add_argument("--model", default=None)
+    sub.add_parser("stats", help="Row counts per table.")
+    args = parser.parse_args()
+    store = EvalStore(args.db)
+    if args.command == "import":
+        prompt = Path(args.prompt_file).read_text() if args.prompt_file else NEWS_SUMMARY_PROMPT
+        print(f"Imported {store.import_summarized_json(args.path, prompt, args.model)} summaries into {args.db}")
+    elif args.command == "export":
+        print(f"Exported {store.export_summarized_json(args.path, model=args.model)} articles to {args.path}")
+    else:
+        print(json.dumps(store.stats(), indent=2))
@@ -1,16 +1,29 @@
 import streamlit as st
-from aneval.llms.gemini import GeminiLLM
-from aneval.llms.gpt5o import GPT5oLLM
+from aneval.llms.registry import get_llm_registry
 from aneval.models.response.llm_news_article import LLMNewsArticle
 from aneval.models.response.geval_rank import GevalRank
+import os
 import sys
 import json
 import textwrap
-import asyncio
+import time
 
 sys.path.append("src")
-from aneval.etl.news_summarizer_etl import run_etl, OUTPUT_PATH
-from aneval.prompts.judge import LLM_JUDGE_PROMPT, LLM_JUDGE_COMPARE_PROMPT
+from aneval.services.geval_service import GEVAL_METRICS, fill_geval_prompt, geval_document
+from aneval.services.jobs import get_job_queue, is_active
+from aneval.services.result_columns import (
+    GROUP_COLUMNS,
+    SCORES,
+    compare_runs,
+    get_result_columns,
+    group_scores,
+    score_distribution,
+    table_rows,
+)
+from aneval.services.retrieval import CONTEXT_TOKEN_BUDGET
+from aneval.services.store import get_eval_store
+from aneval.llms.gemini import GEMINI_DEFAULT_MODEL, NEWS_SUMMARY_PROMPT
+from aneval.prompts.judge import LLM_JUDGE_COMPARE_PROMPT, LLM_JUDGE_DEFAULT_QUESTIONS, LLM_JUDGE_PROMPT
 from aneval.prompts.summeval import (
     COHERENCE_PROMPT,
     CONSISTENCY_PROMPT,
@@ -18,14 +31,6 @@ from aneval.prompts.summeval import (
     RELEVANCE_PROMPT,
 )
 
-def evaluate_summary_vs_article(llm, summary_answers, article_answers, compare_prompt_template):
-    prompt = compare_prompt_template.format(
-        summary_answers="\n".join(f"{i+1}. {a}" for i, a in enumerate(summary_answers)),
-        article_answers="\n".join(f"{i+1}. {a}" for i, a in enumerate(article_answers)),
-    )
-    # Use the same LLM as for the Q&A (Gemini)
-    return llm.answer_question(prompt, "")   
-
 st.set_page_config(page_title="Stock News", layout="wide")
 
 st.markdown(
@@ -72,71 +77,201 @@ st.markdown(
     unsafe_allow_html=True,
 )
 PAGE_SIZE = 10
+JOB_POLL_SECONDS = 2
+# Running judge jobs stream their answers, so their results tab refreshes faster
+STREAM_POLL_SECONDS = 0.5
 st.title("Stock News")
-st.caption("Minimalist news dashboard. Showing parsed news from `stock_news_summarized.json`.")
+st.caption("Minimalist news dashboard. Showing summarized news from the evaluation store.")
 
 # --- Load news articles ---
-def load_news_articles(path="stock_news_summarized.json"):
-    with open(path, "r") as f:
-        data = json.load(f)
-    return [LLMNewsArticle(**item) for item in data]
+@st.cache_resource(show_spinner=False)
+def open_article_store():
+    """Process-wide SQLite store of articles, summaries and evaluations, shared by every rerun/session.
 
-articles = load_news_articles("stock_news_summarized.json")
+    An empty store is seeded from the summarized JSON file written by earlier ETL runs. This runs once per
+    process rather than on every rerun, and only then is the ETL module imported.
+    """
+    store = get_eval_store()
+    if not store.count():
+        from aneval.etl.news_summarizer_etl import OUTPUT_PATH
+        if os.path.exists(OUTPUT_PATH):
+            store.import_summarized_json(OUTPUT_PATH, SUMMARY_FILTER["prompt"], SUMMARY_FILTER["model"])
+    return store
+
+# The News tab lists the summaries of the configured prompt and model, not those of whichever prompt sweep
+# variant ran last
+SUMMARY_FILTER = {"prompt": NEWS_SUMMARY_PROMPT, "model": os.getenv("GEMINI_LLM", GEMINI_DEFAULT_MODEL)}
+article_store = open_article_store()
+# Long-lived, keep-alive LLM clients and the event loop they run on, shared the same way
+llm_registry = get_llm_registry()
+# Judge and Geval runs happen in the background; their jobs and results are kept in the store
+job_queue = get_job_queue(article_store, llm_registry)
 
 # --- When "Send to LLM Judge" is clicked, populate both tabs ---
-def send_to_llm_judge(article_obj):
+def load_article(article_obj, summary_id):
     st.session_state["judge_summary_area"] = article_obj.summary
     st.session_state["judge_article_area"] = article_obj.full_text
     st.session_state["judge_question_area"] = ""
     st.session_state["judge_title"] = article_obj.title
+    # Evaluations of this summary are saved against it in the store, and shown to every session viewing it
+    st.session_state["judge_summary_id"] = summary_id
     st.session_state["geval_article_area"] = article_obj.full_text
     st.session_state["geval_summary_area"] = article_obj.summary
 
-    # --- Clear previous results and evaluation flags ---
-    st.session_state.pop("llm_judge_results", None)
-    st.session_state.pop("geval_results", None)
-    st.session_state["llm_judge_evaluating"] = False
-    st.session_state["geval_evaluating"] = False
-
+def send_to_llm_judge(article_obj):
+    summary_id = article_store.summary_id_for(article_obj.full_text, article_obj.summary)
+    load_article(article_obj, summary_id)
+    # Keep the selection in the URL so a page reload comes back to the same article and its results
+    if summary_id:
+        st.query_params["summary"] = summary_id
     st.rerun()
 
-# --- Async runner for LLM-as-a-Judge (parallelizes all LLM calls) ---
-async def run_llm_judge_parallel(llm, summary, article, questions, judge_prompt_text):
-    async def answer_summary(q):
-        return await asyncio.to_thread(
-            llm.answer_question, f"{judge_prompt_text}\n\nContext:\n{summary}", q
+def judge_job_args():
+    return {
+        "questions": [q.strip() for q in st.session_state.get("judge_questions_area", "").split("\n") if q.strip()],
+        "judge_prompt": st.session_state.get("judge_prompt_area", LLM_JUDGE_PROMPT),
+        "compare_prompt": LLM_JUDGE_COMPARE_PROMPT,
+        "batched": st.session_state.get("judge_batched", True),
+        "context_budget": st.session_state.get("judge_context_budget") or None,
+        "compare_mode": st.session_state.get("judge_compare_mode", "llm"),
+    }
+
+if "judge_summary_id" not in st.session_state and st.query_params.get("summary"):
+    restored = article_store.summary_article(st.query_params["summary"])
+    if restored is not None:
+        load_article(restored, st.query_params["summary"])
+
+# --- Tabs at the top ---
+def show_call_breakdown(rows):
+    """Per-operation latency, tokens, cost, cache hits and retries of the LLM calls behind one evaluation."""
+    if not rows:
+        return
+    cost = sum(r["cost_usd"] for r in rows)
+    with st.expander(f"LLM calls: {sum(r['calls'] for r in rows)} · "
+                     f"{sum(r['input_tokens'] + r['output_tokens'] for r in rows):,} tokens · ~${cost:.4f}"):
+        st.dataframe(
+            [{**r, "cost_usd": round(r["cost_usd"], 6), "latency_seconds": round(r["latency_seconds"], 2),
+              "mean_ttft_seconds": None if r.get("mean_ttft_seconds") is None else round(r["mean_ttft_seconds"], 2)}
+             for r in rows],
+            use_container_width=True, hide_index=True,
         )
-    async def answer_article(q):
-        return await asyncio.to_thread(
-            llm.answer_question, f"{judge_prompt_text}\n\nContext:\n{article}", q
+
+def show_job_status(job):
+    """Progress of a queued or running job, or the error of a failed one."""
+    if job["status"] == "failed":
+        st.error(f"Evaluation failed: {job['error']}")
+    elif is_active(job):
+        st.progress(job["done"] / max(job["total"], 1),
+                    text=f"{job['status'].capitalize()}: {job['done']}/{job['total']} LLM calls")
+
+def show_judge_result(result):
+    judge_stats = result.get("stats")
+    if judge_stats:
+        st.caption(
+            f"{judge_stats['calls']} LLM calls · ~{judge_stats['prompt_tokens']:,} prompt tokens · "
+            f"{judge_stats['latency_seconds']:.1f}s"
+            + (f" · {judge_stats['fallbacks']} batched call(s) fell back to per-question" if judge_stats['fallbacks'] else "")
         )
-    summary_tasks = [answer_summary(q) for q in questions]
-    article_tasks = [answer_article(q) for q in questions]
-    summary_answers = await asyncio.gather(*summary_tasks)
-    article_answers = await asyncio.gather(*article_tasks)
-    return summary_answers, article_answers
+    show_call_breakdown(result.get("calls"))
+    show_judge_answers(result["questions"], result["summary_answers"], result["article_answers"],
+                       result.get("compare_result"))
 
-# --- Tabs at the top ---
-tabs = st.tabs(["News", "LLM Judge Results", "Geval Results"])
+def show_judge_answers(questions, summary_answers, article_answers, compare_result, expanded=False):
+    for idx, q in enumerate(questions):
+        with st.expander(f"Q{idx+1}: {q}", expanded=expanded):
+            st.markdown("**Summary Answer:**")
+            st.info(summary_answers[idx] or "…")
+            st.markdown("**Article Answer:**")
+            st.success(article_answers[idx] or "…")
+    # --- Display the LLM's relevance/consistency evaluation at the bottom ---
+    if compare_result:
+        st.markdown("---")
+        st.markdown("#### LLM Evaluation of Summary vs Article (based on answers):")
+        st.info(compare_result)
+
+def show_judge_partial(job):
+    """Answers of a running judge job as they stream in."""
+    partial = job["partial"]
+    show_judge_answers(job["params"]["questions"], partial["summary"], partial["article"], partial["compare"],
+                       expanded=True)
+
+def show_geval_result(result, context_budget):
+    geval_article = st.session_state.get("geval_article_area", "")
+    geval_summary = st.session_state.get("geval_summary_area", "")
+    show_call_breakdown(result.get("calls"))
+    sampling = result.get("sampling")
+    if sampling:
+        st.caption(f"Sampled: {sampling['calls_total']} GPT-5 calls instead of {sampling['calls_fixed']} "
+                   f"({sampling['calls_saved']:.0%} saved by stopping once each mean was stable).")
+    for metric, rank in result["ranks"].items():
+        with st.expander(f"{metric}"):
+            st.markdown("**Prompt Used:**")
+            # Dynamically fill the prompt for traceability
+            prompt_filled = fill_geval_prompt(
+                GEVAL_METRICS.get(metric, ""),
+                geval_document(geval_article, context_budget or None),
+                geval_summary,
+            )
+            st.markdown(
+                f'<div style="max-height:300px;overflow:auto;padding-right:8px">'
+                f'<pre style="white-space:pre-wrap">{prompt_filled}</pre>'
+                f'</div>',
+                unsafe_allow_html=True
+            )
+            st.markdown("**GPT-5 Evaluation Rank:**")
+            estimate = result.get("samples", {}).get(metric)
+            if estimate is None:
+                st.success(rank)
+            else:
+                st.success(f"{estimate['mean']:.2f} (95% CI {estimate['ci_low']:.2f}-{estimate['ci_high']:.2f}, "
+                           f"{estimate['samples']} of {estimate['max_samples']} samples)")
+                st.bar_chart([{"rank": int(r), "share": share} for r, share in estimate["distribution"].items()],
+                             x="rank", y="share")
+
+def show_latest_job(kind, show_result, empty_message, show_partial=None, poll_seconds=JOB_POLL_SECONDS):
+    """Latest job of `kind` for the loaded summary; polls while it is queued or running.
+
+    `show_partial` renders what a running job has streamed so far.
+    """
+    summary_id = st.session_state.get("judge_summary_id")
+    job = job_queue.latest(kind, summary_id) if summary_id else None
+
+    @st.fragment(run_every=poll_seconds if is_active(job) else None)
+    def poll():
+        current = job_queue.latest(kind, summary_id) if summary_id else None
+        if current is None:
+            st.info(empty_message)
+            return
+        show_job_status(current)
+        if current["result"]:
+            show_result(current)
+        elif show_partial is not None and current.get("partial"):
+            show_partial(current)
+        elif is_active(job) and not is_active(current):
+            st.rerun()  # finished since the last full run: refresh the rest of the page too
+    poll()
+
+tabs = st.tabs(["News", "LLM Judge Results", "Geval Results", "Jobs", "Analytics"])
 
 with tabs[0]:
     # --- MAIN CONTENT: News Display ---
-    tickers = sorted(set(article.ticker for article in articles))
-    selected_ticker = st.selectbox("Filter by Ticker", ["All"] + tickers)
-    if selected_ticker != "All":
-        articles = [a for a in articles if a.ticker == selected_ticker]
+    selected_ticker = st.selectbox(
+        "Filter by Ticker",
+        ["All"] + article_store.tickers,
+        format_func=lambda t: t if t == "All" else f"{t} ({article_store.count(t, **SUMMARY_FILTER)})",
+    )
+    ticker_filter = None if selected_ticker == "All" else selected_ticker
 
     # Pagination logic
-    total_articles = len(articles)
+    total_articles = article_store.count(ticker_filter, **SUMMARY_FILTER)
     total_pages = max(1, (total_articles + PAGE_SIZE - 1) // PAGE_SIZE)
     if "page" not in st.session_state:
         st.session_state.page = 1
+    st.session_state.page = min(st.session_state.page, total_pages)
 
-    start_idx = (st.session_state.page - 1) * PAGE_SIZE
-    end_idx = start_idx + PAGE_SIZE
-    articles_to_show = articles[start_idx:end_idx]
+    articles_to_show = article_store.page(st.session_state.page, PAGE_SIZE, ticker_filter, **SUMMARY_FILTER)
 
-    for idx, article in enumerate(articles_to_show):
+    for article_idx, article in articles_to_show:
         preview = article.full_text[:200].replace("\n", " ") + ("..." if len(article.full_text) > 200 else "")
         with st.expander(f"{article.title} — {preview}"):
             st.markdown(
@@ -150,8 +285,29 @@ with tabs[0]:
                 unsafe_allow_html=True,
             )
             # Add button to send to LLM Judge
-            if st.button("Send to LLM Judge", key=f"judge_btn_{start_idx+idx}"):
+            if st.button("Send to LLM Judge", key=f"judge_btn_{article_idx}"):
                 send_to_llm_judge(article)
+            st.checkbox("Select for batch evaluation", key=f"select_{article_idx}")
+
+    # --- Queue background evaluations for the selected articles (sidebar settings apply) ---
+    selected = [
+        summary_id for summary_id in (
+            article_store.summary_id_for(a.full_text, a.summary)
+            for idx, a in articles_to_show if st.session_state.get(f"select_{idx}")
+        ) if summary_id
+    ]
+    queue_cols = st.columns(2)
+    with queue_cols[0]:
+        if st.button(f"Queue LLM Judge for {len(selected)} selected", disabled=not selected):
+            for summary_id in selected:
+                job_queue.submit_judge(summary_id, **judge_job_args())
+            st.toast(f"Queued {len(selected)} LLM Judge job(s). Follow them in the Jobs tab.")
+    with queue_cols[1]:
+        if st.button(f"Queue Geval for {len(selected)} selected", disabled=not selected):
+            for summary_id in selected:
+                job_queue.submit_geval(summary_id, st.session_state.get("geval_context_budget") or None,
+                                       samples=st.session_state.get("geval_samples", 1))
+            st.toast(f"Queued {len(selected)} Geval job(s). Follow them in the Jobs tab.")
 
     # --- Pagination controls (bottom) ---
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -166,121 +322,97 @@ with tabs[0]:
 
 with tabs[1]:
     st.markdown("### LLM-as-a-Judge Results")
-    if st.session_state.get("llm_judge_evaluating", False):
-        with st.spinner("LLM is evaluating answers for summary and article..."):
-            llm = GeminiLLM()
-            questions = [q.strip() for q in st.session_state.get("judge_questions_area", "").split("\n") if q.strip()]
-            summary = st.session_state.get("judge_summary_area", "")
-            article = st.session_state.get("judge_article_area", "")
-            judge_prompt_text = st.session_state.get("judge_prompt_area", LLM_JUDGE_PROMPT)
-            summary_answers, article_answers = asyncio.run(
-                run_llm_judge_parallel(llm, summary, article, questions, judge_prompt_text)
-            )
-            # --- Evaluate summary vs article using the answers ---
-            compare_result = evaluate_summary_vs_article(
-                llm, summary_answers, article_answers, LLM_JUDGE_COMPARE_PROMPT
-            )
-            st.session_state["llm_judge_results"] = {
-                "questions": questions,
-                "summary_answers": summary_answers,
-                "article_answers": article_answers,
-                "compare_result": compare_result,
-            }
-            st.session_state["llm_judge_title"] = st.session_state.get("judge_title", "")
-            st.session_state["llm_judge_evaluating"] = False
-            st.rerun()
-    elif "llm_judge_results" in st.session_state:
-        questions = st.session_state["llm_judge_results"]["questions"]
-        summary_answers = st.session_state["llm_judge_results"]["summary_answers"]
-        article_answers = st.session_state["llm_judge_results"]["article_answers"]
-        compare_result = st.session_state["llm_judge_results"].get("compare_result", "")
-        judge_prompt = st.session_state.get("judge_prompt_area", LLM_JUDGE_PROMPT)
-        for idx, q in enumerate(questions):
-            with st.expander(f"Q{idx+1}: {q}"):
-                st.markdown("**Summary Answer:**")
-                st.info(summary_answers[idx])
-                st.markdown("**Article Answer:**")
-                st.success(article_answers[idx])
-        # --- Display the LLM's relevance/consistency evaluation at the bottom ---
-        if compare_result:
-            st.markdown("---")
-            st.markdown("#### LLM Evaluation of Summary vs Article (based on answers):")
-            st.info(compare_result)
-    else:
-        st.info("No LLM-as-a-Judge results yet. Run an evaluation in the sidebar.")
+    show_latest_job("judge", lambda job: show_judge_result(job["result"]),
+                    "No LLM-as-a-Judge results yet. Run an evaluation in the sidebar.",
+                    show_partial=show_judge_partial, poll_seconds=STREAM_POLL_SECONDS)
 
 with tabs[2]:
     st.markdown("### Geval Results")
-    if st.session_state.get("geval_evaluating", False):
-        with st.spinner("GPT-5 is evaluating Geval prompts in parallel..."):
-            llm = GPT5oLLM()
-            geval_article = st.session_state.get("geval_article_area", "")
-            geval_summary = st.session_state.get("geval_summary_area", "")
-            async def run_geval_parallel(llm, geval_article, geval_summary):
-                tasks = [
-                    llm.answer_prompt_async(COHERENCE_PROMPT.replace("{{Document}}", geval_article).replace("{{Summary}}", geval_summary)),
-                    llm.answer_prompt_async(CONSISTENCY_PROMPT.replace("{{Document}}", geval_article).replace("{{Summary}}", geval_summary)),
-                    llm.answer_prompt_async(FLUENCY_PROMPT.replace("{{Summary}}", geval_summary)),
-                    llm.answer_prompt_async(RELEVANCE_PROMPT.replace("{{Document}}", geval_article).replace("{{Summary}}", geval_summary)),
-                ]
-                results = await asyncio.gather(*tasks)
-                return {
-                    "Coherence": results[0],
-                    "Consistency": results[1],
-                    "Fluency": results[2],
-                    "Relevance": results[3],
-                }
-            geval_results = asyncio.run(run_geval_parallel(llm, geval_article, geval_summary))
-            st.session_state["geval_results"] = geval_results
-            st.session_state["geval_title"] = st.session_state.get("judge_title", "")
-            st.session_state["geval_evaluating"] = False
-            st.rerun()
-    elif "geval_results" in st.session_state:
-        geval_results = st.session_state["geval_results"]
-        geval_article = st.session_state.get("geval_article_area", "")
-        geval_summary = st.session_state.get("geval_summary_area", "")
-        for metric, result in geval_results.items():
-            with st.expander(f"{metric}"):
-                st.markdown("**Prompt Used:**")
-                # Dynamically fill the prompt for traceability
-                if metric == "Coherence":
-                    prompt_template = COHERENCE_PROMPT
-                elif metric == "Consistency":
-                    prompt_template = CONSISTENCY_PROMPT
-                elif metric == "Fluency":
-                    prompt_template = FLUENCY_PROMPT
-                elif metric == "Relevance":
-                    prompt_template = RELEVANCE_PROMPT
-                else:
-                    prompt_template = ""
-                prompt_filled = prompt_template.replace("{{Document}}", geval_article).replace("{{Summary}}", geval_summary)
-                st.markdown(
-                    f'<div style="max-height:300px;overflow:auto;padding-right:8px">'
-                    f'<pre style="white-space:pre-wrap">{prompt_filled}</pre>'
-                    f'</div>',
-                    unsafe_allow_html=True
-                )
-                st.markdown("**GPT-5 Evaluation Rank:**")
-                st.success(result.rank if hasattr(result, "rank") else result)
+    show_latest_job("geval", lambda job: show_geval_result(job["result"], job["params"]["context_budget"]),
+                    "No Geval results yet. Run an evaluation in the sidebar.")
+
+with tabs[3]:
+    st.markdown("### Background Jobs")
+    recent_jobs = job_queue.recent()
+
+    @st.fragment(run_every=JOB_POLL_SECONDS if any(is_active(j) for j in recent_jobs) else None)
+    def show_jobs():
+        jobs = job_queue.recent()
+        if not jobs:
+            st.info("No jobs yet. Run an evaluation in the sidebar, or queue several from the News tab.")
+            return
+        st.dataframe(
+            [{
+                "article": job["title"], "kind": job["kind"], "status": job["status"],
+                "progress": f"{job['done']}/{job['total']}", "model": job["params"]["model"],
+                "submitted": time.strftime("%H:%M:%S", time.localtime(job["created_at"])), "error": job["error"],
+            } for job in jobs],
+            use_container_width=True, hide_index=True,
+        )
+    show_jobs()
+
+with tabs[4]:
+    st.markdown("### Analytics")
+    st.caption("Every stored Geval rank and judge score, newest per run and article. A run is one summary "
+               "model/prompt evaluated by one evaluator setup.")
+    result_columns = get_result_columns(store=article_store)
+    if not len(result_columns):
+        st.info("No evaluation scores yet. Run or queue evaluations, or score the store with the Geval batch.")
     else:
-        st.info("No Geval results yet. Run an evaluation in the sidebar.")
+        filter_cols = st.columns(3)
+        with filter_cols[0]:
+            analytics_kind = st.selectbox("Evaluator", ["All", "geval", "judge"], key="analytics_kind")
+        with filter_cols[1]:
+            analytics_metric = st.selectbox("Metric", sorted(result_columns.vocab["metric"]), key="analytics_metric")
+        with filter_cols[2]:
+            analytics_by = st.selectbox("Group by", GROUP_COLUMNS, format_func=lambda c: c.replace("_", " "),
+                                        key="analytics_by")
+        selection = result_columns.mask(kind=None if analytics_kind == "All" else analytics_kind,
+                                        metric=analytics_metric)
+
+        st.markdown(f"#### {analytics_metric} by {analytics_by.replace('_', ' ')}, worst first")
+        st.dataframe(table_rows(group_scores(result_columns, analytics_by, selection)),
+                     use_container_width=True, hide_index=True)
+
+        st.markdown("#### Score distribution")
+        group_labels, counts = score_distribution(result_columns, selection, analytics_by)
+        st.bar_chart([{"score": score, **dict(zip(group_labels.tolist(), counts[:, i].tolist()))}
+                      for i, score in enumerate(SCORES)], x="score")
+
+        st.markdown("#### Changes between runs")
+        runs = result_columns.vocab["run"]
+        run_cols = st.columns(2)
+        with run_cols[0]:
+            run_a = st.selectbox("Run A (before)", runs, key="analytics_run_a")
+        with run_cols[1]:
+            run_b = st.selectbox("Run B (after)", runs, index=min(1, len(runs) - 1), key="analytics_run_b")
+        comparison = compare_runs(result_columns, run_a, run_b, analytics_metric)
+        if not comparison["paired"]:
+            st.info(f"The two runs have no {analytics_metric} scores for the same articles.")
+        else:
+            delta_cols = st.columns(4)
+            delta_cols[0].metric("Articles in both", comparison["paired"])
+            delta_cols[1].metric(f"Mean {analytics_metric}", f"{comparison['mean_b']:.2f}",
+                                 f"{comparison['mean_change']:+.2f}")
+            delta_cols[2].metric("Got worse", f"{comparison['worse']:.0%}")
+            delta_cols[3].metric("Got better", f"{comparison['better']:.0%}")
+            st.dataframe(table_rows(comparison["by_group"]), use_container_width=True, hide_index=True)
+            st.markdown("Largest drops")
+            st.dataframe(table_rows(comparison["articles"])[:20], use_container_width=True, hide_index=True)
 
 # --- SIDEBAR: LLM-as-a-Judge Evaluator and Geval ---
 st.sidebar.title("Evaluation Panel")
 side_tabs = st.sidebar.tabs(["LLM-as-a-Judge", "Geval"])
 
 # Set initial values if not already set
-default_questions = [
-    "What is the main event or announcement described in the article?",
-    "Which companies or key stakeholders are most affected, and how?",
-    "What are the short-term and long-term implications for investors?",
-    "Are there any notable risks, controversies, or uncertainties mentioned?",
-    "What is the overall sentiment or outlook expressed in the article?"
-]
 st.session_state.setdefault("judge_article_area", "")
 st.session_state.setdefault("judge_summary_area", "")
 st.session_state.setdefault("judge_prompt_area", LLM_JUDGE_PROMPT)
-st.session_state.setdefault("judge_questions_area", "\n".join(default_questions))
+st.session_state.setdefault("judge_questions_area", "\n".join(LLM_JUDGE_DEFAULT_QUESTIONS))
+st.session_state.setdefault("judge_batched", True)
+st.session_state.setdefault("judge_compare_mode", "llm")
+st.session_state.setdefault("judge_context_budget", CONTEXT_TOKEN_BUDGET)
+st.session_state.setdefault("geval_context_budget", CONTEXT_TOKEN_BUDGET)
 
 # --- LLM-as-a-Judge Tab ---
 with side_tabs[0]:
@@ -319,9 +451,32 @@ with side_tabs[0]:
     )
     questions = [q.strip() for q in questions_text.split("\n") if q.strip()]
 
+    st.checkbox(
+        "Batch questions (one call per context)",
+        key="judge_batched",
+        help="Answer all questions for the summary, and for the article, in one structured call each. "
+             "Falls back to one call per question if the reply cannot be parsed.",
+    )
+    st.radio(
+        "Compare answers with",
+        ["llm", "embedding"],
+        format_func={"llm": "LLM (free-text verdict)", "embedding": "Embeddings (Voyage, numeric)"}.get,
+        key="judge_compare_mode",
+        help="Embeddings score relevance and consistency from per-question cosine similarity of the answers, "
+             "with one batched embedding request instead of an LLM call.",
+    )
+    st.number_input(
+        "Context token budget (0 = full article)",
+        min_value=0, step=100, key="judge_context_budget",
+        help="Send only the article passages most relevant to the questions (BM25), up to this many tokens.",
+    )
+
     if st.button("Evaluate with LLM-as-a-Judge"):
-        st.session_state["llm_judge_evaluating"] = True
-        st.rerun()()
+        if st.session_state.get("judge_summary_id"):
+            job_queue.submit_judge(st.session_state["judge_summary_id"], **judge_job_args())
+            st.rerun()
+        else:
+            st.warning("Please load an article from the News section above.")
 
 # --- Geval Tab ---
 with side_tabs[1]:
@@ -344,10 +499,22 @@ Respond only with the structured object.
 
     geval_article = st.session_state.get("geval_article_area", "")
     geval_summary = st.session_state.get("geval_summary_area", "")
+    st.number_input(
+        "Context token budget (0 = full article)",
+        min_value=0, step=100, key="geval_context_budget",
+        help="Send only the article's lead and the passages closest to it (BM25), up to this many tokens.",
+    )
+    st.number_input(
+        "Samples per metric (1 = one rank)",
+        min_value=1, max_value=40, value=1, key="geval_samples",
+        help="Score each metric as the mean of up to this many GPT-5 samples. Sampling stops early once the "
+             "mean is stable, so most metrics use far fewer calls.",
+    )
+    geval_context = geval_document(geval_article, st.session_state.get("geval_context_budget") or None)
 
     # Dynamically fill and display each prompt with the latest article/summary
     def show_prompt(title, prompt_template):
-        prompt_filled = prompt_template.replace("{{Document}}", geval_article).replace("{{Summary}}", geval_summary)
+        prompt_filled = fill_geval_prompt(prompt_template, geval_context, geval_summary)
         with st.expander(title, expanded=False):
             st.markdown(
                 f'<div style="max-height:300px;overflow:auto;padding-right:8px">'
@@ -362,5 +529,10 @@ Respond only with the structured object.
     show_prompt("Relevance Prompt", RELEVANCE_PROMPT)
 
     if st.button("Evaluate with Geval"):
-        st.session_state["geval_evaluating"] = True
-        st.rerun()
\ No newline at end of file
+        if st.session_state.get("judge_summary_id"):
+            job_queue.submit_geval(st.session_state["judge_summary_id"],
+                                   st.session_state.get("geval_context_budget") or None,
+                                   samples=st.session_state.get("geval_samples", 1))
+            st.rerun()
+        else:
+            st.warning("Please load an article from the News section above.")
\ No newline at end of file
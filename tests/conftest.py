@@ -0,0 +1,8 @@
+import pytest
+from aneval.llms.telemetry import telemetry_disabled
+
+@pytest.fixture(autouse=True)
+def offline_telemetry():
+    # Fake-backend calls made by the tests stay out of the production telemetry sink
+    with telemetry_disabled():
+        yield
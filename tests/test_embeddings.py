@@ -0,0 +1,88 @@
+import asyncio
+import numpy as np
+import pytest
+from aneval.llms.embedding_cache import EmbeddingCache
+from aneval.llms.fake import FakeVoyageClient, fake_embedding
+from aneval.llms.voyage import VoyageEmbedder
+from aneval.services.judge_service import compare_answers_embedding
+
+class RecordingVoyageClient(FakeVoyageClient):
+    """Fake Voyage client that keeps the texts of every embed request."""
+
+    def __init__(self, **kwargs):
+        super().__init__(latency=0, **kwargs)
+        self.requests = []
+
+    async def embed(self, texts, model=None, input_type=None):
+        self.requests.append(list(texts))
+        return await super().embed(texts, model=model, input_type=input_type)
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(tmp_path / "embeddings.sqlite", bypass=False)
+
+def embedder(cache, batch_size=128):
+    return VoyageEmbedder(api_key="fake", model_name="fake-voyage", client=RecordingVoyageClient(), cache=cache,
+                          batch_size=batch_size)
+
+def test_partial_cache_hit_sends_only_missing_texts(cache):
+    voyage = embedder(cache)
+    asyncio.run(voyage.embed_async(["alpha", "beta"]))
+    asyncio.run(voyage.embed_async(["beta", "gamma", "alpha", "delta"]))
+    assert voyage.client.requests == [["alpha", "beta"], ["gamma", "delta"]]
+    assert cache.hits == 2
+
+def test_fully_cached_texts_make_no_request(cache):
+    voyage = embedder(cache)
+    first = asyncio.run(voyage.embed_async(["alpha", "beta"]))
+    second = asyncio.run(voyage.embed_async(["beta", "alpha"]))
+    assert len(voyage.client.requests) == 1
+    np.testing.assert_allclose(second, first[::-1])
+
+def test_duplicates_are_sent_once(cache):
+    voyage = embedder(cache)
+    vectors = asyncio.run(voyage.embed_async(["same", "other", "same", "same"]))
+    assert voyage.client.requests == [["same", "other"]]
+    assert vectors.shape[0] == 4
+    np.testing.assert_array_equal(vectors[0], vectors[2])
+
+def test_requests_are_split_at_batch_size(cache):
+    voyage = embedder(cache, batch_size=3)
+    texts = [f"text {i}" for i in range(8)]
+    asyncio.run(voyage.embed_async(texts))
+    assert [len(batch) for batch in voyage.client.requests] == [3, 3, 2]
+    assert [t for batch in voyage.client.requests for t in batch] == texts
+
+def test_rows_are_unit_length_and_in_input_order(cache):
+    voyage = embedder(cache, batch_size=2)
+    texts = ["revenue grew", "shares fell", "revenue grew", "guidance raised", "margins shrank"]
+    # Warm the cache with a later text so hits and fresh vectors are interleaved
+    asyncio.run(voyage.embed_async(["guidance raised"]))
+    vectors = asyncio.run(voyage.embed_async(texts))
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-6)
+    for text, row in zip(texts, vectors):
+        expected = np.asarray(fake_embedding(text), dtype=np.float32)
+        np.testing.assert_allclose(row, expected / np.linalg.norm(expected), rtol=1e-6)
+
+def test_bypassed_cache_always_requests(tmp_path):
+    voyage = embedder(EmbeddingCache(tmp_path / "embeddings.sqlite", bypass=True))
+    asyncio.run(voyage.embed_async(["alpha"]))
+    asyncio.run(voyage.embed_async(["alpha"]))
+    assert voyage.client.requests == [["alpha"], ["alpha"]]
+
+def test_embedding_comparison_scores_are_on_the_judge_scale(cache):
+    voyage = embedder(cache)
+    summary_answers = ["Apple reported record revenue.", "Not specified in the context.", "Investors cheered."]
+    article_answers = ["Apple reported record quarterly revenue.", "Suppliers in Asia.", "Markets were mixed."]
+    comparison = asyncio.run(compare_answers_embedding(voyage, summary_answers, article_answers))
+    assert comparison.article_answered == 3 and comparison.summary_answered == 2
+    assert 1 <= comparison.relevance <= 5 and 1 <= comparison.consistency <= 5
+    # A question the summary cannot answer counts as 1 toward relevance only
+    assert comparison.relevance < comparison.consistency
+    assert all(-1 <= s <= 1 for s in comparison.similarities)
+
+def test_identical_answers_score_five(cache):
+    voyage = embedder(cache)
+    answers = ["Apple reported record revenue.", "Shares rose 3%."]
+    comparison = asyncio.run(compare_answers_embedding(voyage, answers, list(answers)))
+    assert comparison.relevance == pytest.approx(5) and comparison.consistency == pytest.approx(5)
@@ -0,0 +1,33 @@
+import asyncio
+import math
+import pytest
+from aneval.llms.cache import ResponseCache
+from aneval.llms.fake import FakeAsyncOpenAI
+from aneval.llms.gpt5o import GPT5oLLM
+from aneval.services.geval_service import Z_95, GevalEstimate, sample_geval_metric
+
+def grader(rank=4, spread=0.0):
+    return GPT5oLLM(api_key="fake", model_name="fake-gpt", cache=ResponseCache(bypass=True),
+                    client=FakeAsyncOpenAI(0, rank=rank, rank_spread=spread, seed=5))
+
+def sample(llm, **sampling):
+    return asyncio.run(sample_geval_metric(llm, "prompt", max_samples=20, min_samples=4, wave=4, **sampling))
+
+def test_identical_draws_bound_the_interval_by_z_over_n():
+    assert GevalEstimate([3], 20).half_width == math.inf
+    for n in (2, 4, 8):
+        assert GevalEstimate([3] * n, 20).half_width == pytest.approx(Z_95 / n)
+
+def test_one_rank_off_is_the_variance_floor():
+    # One draw in eight a rank off has variance 1/8: the floor adds nothing to it
+    assert GevalEstimate([4] * 7 + [3], 20).half_width == pytest.approx(Z_95 / 8)
+
+def test_agreeing_draws_stop_after_z_over_tolerance_draws():
+    # ceil(1.96 / 0.3) = 7 draws, rounded up to the second wave of 4
+    assert sample(grader(), tolerance=0.3).samples == 8
+    assert sample(grader(), tolerance=0.5).samples == 4
+
+def test_disagreeing_draws_use_the_whole_budget():
+    # A spread of one rank needs about (1.96 / 0.3) ** 2 = 43 draws to meet the tolerance
+    estimate = sample(grader(rank=3, spread=1.0), tolerance=0.3)
+    assert estimate.samples == 20 and estimate.half_width > 0.3
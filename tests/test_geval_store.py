@@ -0,0 +1,73 @@
+import asyncio
+import json
+import pytest
+from aneval.etl.geval_batch import run_geval_batch
+from aneval.llms.cache import ResponseCache
+from aneval.llms.fake import FakeAsyncOpenAI
+from aneval.llms.gpt5o import GPT5oLLM
+from aneval.models.response.llm_news_article import LLMNewsArticle
+from aneval.services.geval_service import GEVAL_METRICS
+from aneval.services.store import EvalStore
+
+ARTICLE = LLMNewsArticle(title="Apple beats estimates", link="https://example.com/aapl", ticker="AAPL",
+                         full_text="Apple reported record revenue. " * 20, summary="Apple reported record revenue.")
+
+@pytest.fixture
+def store(tmp_path):
+    store = EvalStore(tmp_path / "eval.sqlite")
+    (article_id,) = store.add_articles([ARTICLE])
+    store.add_summaries([(article_id, ARTICLE.summary)], "summarize", "fake-gemini")
+    return store
+
+def grader():
+    return GPT5oLLM(api_key="fake", model_name="fake-gpt", cache=ResponseCache(bypass=True),
+                    client=FakeAsyncOpenAI(0, rank=4, rank_spread=0.8, seed=3))
+
+def score(store, samples):
+    return asyncio.run(run_geval_batch(llm=grader(), store=store, gates=False, samples=samples, tolerance=0.0))
+
+def test_sampled_and_single_rank_scores_are_stored_apart(store):
+    assert score(store, 1)["scores_computed"] == len(GEVAL_METRICS)
+    # A single-rank score does not stand in for a sampled one, nor the other way round
+    sampled = score(store, 4)
+    assert sampled["scores_computed"] == len(GEVAL_METRICS)
+    assert sampled["sampling"]["calls_used"] == 4 * len(GEVAL_METRICS)
+    assert score(store, 4)["scores_computed"] == 0
+    assert score(store, 1)["scores_computed"] == 0
+    assert store.stats()["geval_scores"] == 2 * len(GEVAL_METRICS)
+
+def test_sampled_scores_keep_their_interval_and_distribution(store):
+    report = score(store, 4)
+    assert set(report["sampling"]["distribution"]) == set(GEVAL_METRICS)
+    assert all(width > 0 for width in report["sampling"]["mean_half_width"].values())
+    rows = store._query("SELECT rank, samples, half_width, distribution FROM geval_scores WHERE max_samples = 4")
+    assert len(rows) == len(GEVAL_METRICS)
+    for rank, samples, half_width, distribution in rows:
+        shares = {int(r): share for r, share in json.loads(distribution).items()}
+        assert samples == 4 and half_width > 0
+        assert sum(shares.values()) == pytest.approx(1)
+        assert rank == pytest.approx(sum(r * share for r, share in shares.items()))
+
+def test_single_ranks_have_no_interval(store):
+    score(store, 1)
+    rows = store._query("SELECT samples, half_width, distribution FROM geval_scores")
+    assert rows == [(1, None, None)] * len(GEVAL_METRICS)
+
+def test_old_geval_table_is_migrated(store):
+    (summary_id, _), = store.iter_summaries()
+    with store.transaction() as conn:
+        (prompt_id,) = store.add_prompts(conn, [GEVAL_METRICS["Coherence"]])
+        # geval_scores as created before scores were keyed by sampling mode
+        conn.execute("DROP TABLE geval_scores")
+        conn.execute(
+            "CREATE TABLE geval_scores (summary_id TEXT NOT NULL REFERENCES summaries (summary_id), "
+            "metric TEXT NOT NULL, prompt_id TEXT NOT NULL REFERENCES prompts (prompt_id), model TEXT NOT NULL, "
+            "context_budget INTEGER NOT NULL DEFAULT 0, rank INTEGER NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (summary_id, metric, prompt_id, model, context_budget))"
+        )
+        conn.execute("INSERT INTO geval_scores VALUES (?, 'Coherence', ?, 'fake-gpt', 0, 4, 0)", (summary_id, prompt_id))
+    reopened = EvalStore(store.path)
+    # Kept, as a single-rank score
+    assert reopened.geval_done("fake-gpt") == {(summary_id, "Coherence", prompt_id)}
+    assert reopened.geval_done("fake-gpt", max_samples=20) == set()
+    assert reopened.geval_scores(summary_id) == {"Coherence": 4}
@@ -0,0 +1,56 @@
+import time
+import pytest
+from aneval.llms.cache import ResponseCache
+from aneval.llms.fake import FakeAsyncOpenAI
+from aneval.llms.gpt5o import GPT5oLLM
+from aneval.llms.registry import LLMRegistry
+from aneval.models.response.llm_news_article import LLMNewsArticle
+from aneval.services.geval_service import GEVAL_METRICS
+from aneval.services.jobs import JobQueue
+from aneval.services.store import EvalStore
+
+ARTICLE = LLMNewsArticle(title="Apple beats estimates", link="https://example.com/aapl", ticker="AAPL",
+                         full_text="Apple reported record revenue. " * 20, summary="Apple reported record revenue.")
+
+class FakeRegistry(LLMRegistry):
+    """Registry whose GPT-5 client is a fake grader that always gives the same rank."""
+
+    def openai(self, model_name=None, api_key=None):
+        return self._get(("fake-openai",), lambda: GPT5oLLM(
+            api_key="fake", model_name="fake-gpt", cache=ResponseCache(bypass=True), client=FakeAsyncOpenAI(0, rank=4)
+        ))
+
+@pytest.fixture
+def queue(tmp_path):
+    store = EvalStore(tmp_path / "eval.sqlite")
+    (article_id,) = store.add_articles([ARTICLE])
+    store.add_summaries([(article_id, ARTICLE.summary)], "summarize", "fake-gemini")
+    registry = FakeRegistry()
+    queue = JobQueue(store, registry, workers=1)
+    yield queue
+    registry.close()
+
+def wait(queue, job_id):
+    for _ in range(200):
+        job = queue.get(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    raise TimeoutError(job_id)
+
+def test_sampled_job_that_stops_early_finishes_complete(queue):
+    (summary_id, _), = queue.store.iter_summaries()
+    job_id = queue.submit_geval(summary_id, samples=20)
+    assert queue.get(job_id)["total"] == 20 * len(GEVAL_METRICS)
+    job = wait(queue, job_id)
+    assert job["status"] == "done", job["error"]
+    # Agreeing draws stop after 8 samples per metric, not 20
+    assert job["done"] == job["total"] == 8 * len(GEVAL_METRICS)
+    assert job["result"]["sampling"]["calls_total"] == job["total"]
+
+def test_single_rank_job_counts_one_call_per_metric(queue):
+    (summary_id, _), = queue.store.iter_summaries()
+    job = wait(queue, queue.submit_geval(summary_id))
+    assert job["status"] == "done", job["error"]
+    assert job["done"] == job["total"] == len(GEVAL_METRICS)
+    assert set(job["result"]["ranks"].values()) == {4}
@@ -0,0 +1,97 @@
+from collections import Counter
+import numpy as np
+import pytest
+from aneval.models.response.llm_news_article import FAILED_SUMMARY
+from aneval.services.lexical_metrics import GevalGates, compute_metrics, lcs_length, ngram_overlap
+from aneval.services.retrieval import TOKEN_RE
+
+ARTICLE = ("Apple reported record revenue for the quarter as iPhone sales rose in China and India. "
+           "The company said services revenue also grew, and shares rose after the report. "
+           "Analysts had expected revenue to fall, and the company raised its dividend.")
+PAIRS = [
+    ("Apple reported record revenue as iPhone sales rose.", ARTICLE),
+    ("Shares rose after the report; revenue rose and revenue grew.", ARTICLE),
+    ("A completely unrelated sentence about weather patterns.", ARTICLE),
+    ("the the the company the", "the company the company the the"),
+    ("One two", "One two three"),
+]
+
+def tokens(text):
+    return TOKEN_RE.findall(text.lower())
+
+def ngrams(toks, n):
+    return Counter(tuple(toks[i:i + n]) for i in range(len(toks) - n + 1))
+
+def reference_lcs(a, b):
+    table = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i, x in enumerate(a):
+        for j, y in enumerate(b):
+            table[i + 1][j + 1] = table[i][j] + 1 if x == y else max(table[i][j + 1], table[i + 1][j])
+    return table[-1][-1]
+
+def f1(overlap, first, second):
+    return 2 * overlap / (first + second) if first + second else 0.0
+
+def reference_metrics(summary, article):
+    s, a = tokens(summary), tokens(article)
+    row = {}
+    for n in (1, 2, 3):
+        s_grams, a_grams = ngrams(s, n), ngrams(a, n)
+        s_total, a_total = sum(s_grams.values()), sum(a_grams.values())
+        row[f"rouge{n}"] = f1(sum((s_grams & a_grams).values()), s_total, a_total)
+        novel = sum(count for gram, count in s_grams.items() if gram not in a_grams)
+        row[f"novel{n}"] = novel / s_total if s_total else 0.0
+    row["rougeL"] = f1(reference_lcs(s, a), len(s), len(a))
+    return row
+
+def test_metrics_match_a_plain_python_reference():
+    metrics = compute_metrics([s for s, _ in PAIRS], [a for _, a in PAIRS])
+    for i, (summary, article) in enumerate(PAIRS):
+        expected = reference_metrics(summary, article)
+        assert metrics.rouge1[i] == pytest.approx(expected["rouge1"])
+        assert metrics.rouge2[i] == pytest.approx(expected["rouge2"])
+        assert metrics.rougeL[i] == pytest.approx(expected["rougeL"])
+        assert metrics.novel_unigrams[i] == pytest.approx(expected["novel1"])
+        assert metrics.novel_bigrams[i] == pytest.approx(expected["novel2"])
+        assert metrics.novel_trigrams[i] == pytest.approx(expected["novel3"])
+        assert metrics.summary_tokens[i] == len(tokens(summary))
+        assert metrics.compression_ratio[i] == pytest.approx(len(tokens(article)) / len(tokens(summary)))
+
+def test_overlap_is_the_same_without_packed_keys():
+    # Ids this large cannot be packed into one int64 per trigram, so the row-wise unique is used
+    rng = np.random.default_rng(3)
+    summaries = [rng.integers(0, 4, 12) * 10 ** 7 for _ in range(3)]
+    articles = [rng.integers(0, 4, 30) * 10 ** 7 for _ in range(3)]
+    s_total, a_total, overlap, novel = ngram_overlap(summaries, articles, 3)
+    for i, (s, a) in enumerate(zip(summaries, articles)):
+        s_grams, a_grams = ngrams(list(s), 3), ngrams(list(a), 3)
+        assert s_total[i] == sum(s_grams.values()) and a_total[i] == sum(a_grams.values())
+        assert overlap[i] == sum((s_grams & a_grams).values())
+        assert novel[i] == sum(count for gram, count in s_grams.items() if gram not in a_grams)
+
+def test_lcs_length_matches_the_reference():
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        a, b = rng.integers(0, 5, rng.integers(0, 15)), rng.integers(0, 5, rng.integers(0, 15))
+        assert lcs_length(a, b) == reference_lcs(list(a), list(b))
+
+def test_each_gate_reason():
+    summaries = [
+        FAILED_SUMMARY,
+        "   ",
+        "Apple rose.",
+        ARTICLE.split(". ")[0] + ".",
+        ARTICLE + " " + ARTICLE,
+        "Apple reported record revenue as iPhone sales rose in China.",
+    ]
+    articles = [ARTICLE, ARTICLE, ARTICLE, ARTICLE.split(". ")[0] + ". Shares rose.", ARTICLE, ARTICLE]
+    gates = GevalGates(min_summary_tokens=5, min_compression=1.0, max_rouge2=0.9, max_novel_trigrams=None)
+    reasons = gates.reasons(summaries, compute_metrics(summaries, articles))
+    assert reasons == ["failed placeholder", "empty", "too short", "near-copy of article", "longer than article",
+                       None]
+
+def test_mostly_novel_gate_only_applies_when_set():
+    summaries = ["A completely unrelated sentence about weather patterns today."]
+    metrics = compute_metrics(summaries, [ARTICLE])
+    assert GevalGates(max_novel_trigrams=None).reasons(summaries, metrics) == [None]
+    assert GevalGates(max_novel_trigrams=0.95).reasons(summaries, metrics) == ["mostly novel text"]
@@ -0,0 +1,87 @@
+import json
+import pytest
+from aneval.services.fake_news_server import FakeNewsServer
+from aneval.services.news_ingest import IngestState, ingest
+
+@pytest.fixture
+def server():
+    with FakeNewsServer(["AAPL", "MSFT"], items=4, latency=0) as server:
+        yield server
+
+def run(server, state, dataset_path):
+    return ingest(["AAPL", "MSFT"], dataset_path, state=state, feed_url=server.feed_url, concurrency=4,
+                  max_per_ticker=0)
+
+def links(dataset_path):
+    with open(dataset_path) as f:
+        return {ticker: [item["link"] for item in items] for ticker, items in json.load(f).items()}
+
+def test_unchanged_feeds_are_not_downloaded_again(server, tmp_path):
+    state, dataset_path = IngestState(tmp_path / "ingest.sqlite"), tmp_path / "news.json"
+    first = run(server, state, dataset_path)
+    assert first.added == 8 and server.pages == 8
+    second = run(server, state, dataset_path)
+    assert second.feeds_not_modified == 2 and second.feeds_fetched == 0
+    assert server.not_modified == 2 and server.pages == 8
+
+def test_last_modified_alone_gets_a_304(server, tmp_path):
+    state, dataset_path = IngestState(tmp_path / "ingest.sqlite"), tmp_path / "news.json"
+    run(server, state, dataset_path)
+    state.conn.execute("UPDATE feeds SET etag = NULL")
+    report = run(server, state, dataset_path)
+    assert report.feeds_not_modified == 2 and server.pages == 8
+
+def test_items_past_the_cap_are_fetched_by_later_runs(tmp_path):
+    state, dataset_path = IngestState(tmp_path / "ingest.sqlite"), tmp_path / "news.json"
+    with FakeNewsServer(["AAPL"], items=10, latency=0) as server:
+        def capped():
+            return ingest(["AAPL"], dataset_path, state=state, feed_url=server.feed_url, max_per_ticker=4)
+        # The feed's validators are only kept once nothing is left over
+        assert [capped().added for _ in range(3)] == [4, 4, 2]
+        assert server.not_modified == 0
+        report = capped()
+        assert report.feeds_not_modified == 1 and report.added == 0
+    assert len(links(dataset_path)["AAPL"]) == 10
+
+def test_only_new_items_are_downloaded(server, tmp_path):
+    state, dataset_path = IngestState(tmp_path / "ingest.sqlite"), tmp_path / "news.json"
+    run(server, state, dataset_path)
+    server.publish("AAPL", 2)
+    report = run(server, state, dataset_path)
+    assert report.feeds_fetched == 1 and report.feeds_not_modified == 1
+    assert report.listed == 6 and report.new_links == 2 and report.added == 2
+    assert server.pages == 10
+    assert len(links(dataset_path)["AAPL"]) == 6
+
+def test_links_already_in_the_dataset_are_skipped_without_state(server, tmp_path):
+    dataset_path = tmp_path / "news.json"
+    run(server, IngestState(tmp_path / "first.sqlite"), dataset_path)
+    # A fresh state fetches the feeds again, but the dataset already has every link
+    report = run(server, IngestState(tmp_path / "second.sqlite"), dataset_path)
+    assert report.feeds_fetched == 2 and report.listed == 8
+    assert report.new_links == 0 and report.added == 0
+    assert server.pages == 8
+
+def test_near_duplicates_are_rejected(server, tmp_path):
+    state, dataset_path = IngestState(tmp_path / "ingest.sqlite"), tmp_path / "news.json"
+    run(server, state, dataset_path)
+    # Story 1 republished under a new URL, plus a genuinely new story
+    server.publish("AAPL", copy_of=1)
+    server.publish("AAPL")
+    report = run(server, state, dataset_path)
+    assert report.new_links == 2 and report.downloaded == 2
+    assert report.duplicates == 1 and report.added == 1
+    aapl = links(dataset_path)["AAPL"]
+    assert server.base_url + "/news/AAPL/5" in aapl and server.base_url + "/news/AAPL/4" not in aapl
+    status = dict(state.conn.execute("SELECT link, status FROM links WHERE ticker = 'AAPL'").fetchall())
+    assert status[server.base_url + "/news/AAPL/4"] == "duplicate"
+    # Recorded as seen: the copy is not downloaded again
+    server.publish("AAPL")
+    assert run(server, state, dataset_path).new_links == 1
+
+def test_near_duplicates_are_kept_without_dedup(server, tmp_path):
+    dataset_path = tmp_path / "news.json"
+    server.publish("AAPL", copy_of=1)
+    report = ingest(["AAPL"], dataset_path, state=IngestState(tmp_path / "ingest.sqlite"), feed_url=server.feed_url,
+                    max_per_ticker=0, dedupe=False)
+    assert report.added == 5 and report.duplicates == 0
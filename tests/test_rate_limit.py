@@ -0,0 +1,68 @@
+import asyncio
+import time
+import pytest
+from aneval.benchmarks.rate_limit import run
+from aneval.llms.rate_limit import RateLimiter, get_rate_limiter
+
+def test_budget_paces_requests():
+    limiter = RateLimiter(rpm=600)
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire_sync()
+    # The first request goes at once, the other three are 0.1s apart
+    assert time.monotonic() - start == pytest.approx(0.3, abs=0.08)
+
+def test_throttle_halves_the_rate_once_per_cooldown():
+    limiter = RateLimiter(rpm=120)
+    limiter.on_throttle()
+    assert limiter.rpm == 60
+    # In-flight requests failing together count as one throttle
+    limiter.on_throttle()
+    assert limiter.rpm == 60
+    assert limiter.throttles == 2
+
+def test_throttle_never_drops_below_the_floor():
+    limiter = RateLimiter(rpm=10, min_rpm=6)
+    limiter.on_throttle()
+    assert limiter.rpm == 6
+    limiter._last_decrease = float("-inf")
+    limiter.on_throttle()
+    assert limiter.rpm == 6
+
+def test_success_raises_the_rate_additively_up_to_the_budget():
+    limiter = RateLimiter(rpm=120)
+    limiter.on_throttle()
+    # 5% of the budget per second of traffic: 6 rpm per call at one call per second
+    limiter.on_success()
+    assert limiter.rpm == pytest.approx(66)
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rpm == 120
+
+def test_retry_after_holds_the_bucket():
+    limiter = RateLimiter(rpm=0)
+    limiter.on_throttle(retry_after=0.3)
+    start = time.monotonic()
+    asyncio.run(limiter.acquire())
+    assert time.monotonic() - start >= 0.25
+
+def test_open_limiter_learns_a_rate_on_first_throttle():
+    limiter = RateLimiter(rpm=0, min_rpm=6)
+    assert limiter.interval == 0
+    limiter.on_throttle()
+    assert limiter.rpm == 6
+    assert limiter.interval == 10
+
+def test_registry_keeps_a_learned_rate_without_a_budget():
+    limiter = get_rate_limiter("test-provider", "keep-learned", 120)
+    limiter.on_throttle()
+    assert get_rate_limiter("test-provider", "keep-learned", 0).rpm == 60
+    assert get_rate_limiter("test-provider", "keep-learned").rpm == 60
+    assert get_rate_limiter("test-provider", "keep-learned", 300).rpm == 300
+
+def test_limiter_learns_the_server_quota():
+    # Quota of 10 requests per one-second window, and a client that starts with no budget
+    report = run(n_requests=30, server_rpm=600, latency=0.01, concurrency=8, window=1.0)
+    assert report["failed"] == 0
+    assert report["server_429s"] >= 1 and report["client_throttles"] >= 1
+    assert 0 < report["learned_rpm"] < 2000
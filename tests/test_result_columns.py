@@ -0,0 +1,98 @@
+import threading
+import time
+import numpy as np
+import pytest
+from aneval.models.response.llm_news_article import LLMNewsArticle
+from aneval.services.geval_service import GEVAL_METRICS
+from aneval.services.result_columns import ResultColumns, compare_runs, group_scores, latest_rows
+from aneval.services.store import EvalStore
+
+ARTICLES = [
+    LLMNewsArticle(title=f"{ticker} story", link=f"https://example.com/{ticker}", ticker=ticker,
+                   full_text=f"{ticker} reported record revenue for the quarter.", summary=f"{ticker} beat.")
+    for ticker in ("AAPL", "MSFT")
+]
+JUDGE_ARGS = ("judge prompt", "compare prompt", ["What happened?"], ["It beat."], ["Record revenue."])
+
+@pytest.fixture
+def store(tmp_path):
+    store = EvalStore(tmp_path / "eval.sqlite")
+    ids = store.add_articles(ARTICLES)
+    store.add_summaries([(article_id, a.summary) for article_id, a in zip(ids, ARTICLES)], "summarize",
+                        "fake-gemini")
+    return store
+
+def summary_ids(store):
+    return {article.ticker: summary_id for summary_id, article in store.iter_summaries()}
+
+def geval(store, ranks, context_budget=None):
+    """Score each ticker's summary on Coherence: `ranks` maps ticker to rank."""
+    ids = summary_ids(store)
+    store.add_geval_scores([(ids[t], "Coherence", GEVAL_METRICS["Coherence"], rank) for t, rank in ranks.items()],
+                           "fake-gpt", context_budget)
+
+def run_name(columns, prefix):
+    (name,) = [run for run in columns.vocab["run"] if run.startswith(prefix)]
+    return name
+
+def test_sync_only_appends_new_rows(store, tmp_path):
+    columns = ResultColumns(tmp_path / "columns.npz")
+    geval(store, {"AAPL": 4, "MSFT": 2})
+    store.add_judge_result(summary_ids(store)["AAPL"], "fake-gemini", *JUDGE_ARGS, "Relevance: 5\nConsistency: 3")
+    assert columns.sync(store) == 4
+    assert columns.sync(store) == 0
+    geval(store, {"AAPL": 5})
+    assert columns.sync(store) == 1
+    assert len(columns) == 5
+    # The watermarks survive a save and load
+    columns.save()
+    loaded = ResultColumns.load(columns.path)
+    assert loaded.sync(store) == 0 and len(loaded) == 5
+
+def test_a_write_waiting_for_the_lock_is_not_skipped(store, tmp_path):
+    columns = ResultColumns(tmp_path / "columns.npz")
+    row = (summary_ids(store)["MSFT"], "Coherence", GEVAL_METRICS["Coherence"], 3)
+    writer = threading.Thread(target=store.add_geval_scores, args=([row], "fake-gpt"))
+    with store._lock:
+        writer.start()
+        time.sleep(0.1)
+        # While the writer waits for the lock, a later write commits and is synced
+        geval(store, {"AAPL": 4})
+        assert columns.sync(store) == 1
+    writer.join()
+    assert columns.sync(store) == 1
+    assert sorted(columns.decode("ticker").tolist()) == ["AAPL", "MSFT"]
+
+def test_latest_rows_and_group_scores(store, tmp_path):
+    columns = ResultColumns(tmp_path / "columns.npz")
+    geval(store, {"AAPL": 2, "MSFT": 4})
+    columns.sync(store)
+    geval(store, {"AAPL": 5})
+    columns.sync(store)
+    mask = columns.mask(kind="geval", metric="Coherence")
+    rows = latest_rows(columns, mask)
+    # The rescored AAPL row replaces the older one
+    assert sorted(columns.columns["score"][rows].tolist()) == [4, 5]
+    by_ticker = group_scores(columns, "ticker", mask)
+    assert by_ticker["ticker"].tolist() == ["MSFT", "AAPL"]
+    assert by_ticker["count"].tolist() == [1, 1]
+    assert by_ticker["mean"].tolist() == [4, 5]
+    by_run = group_scores(columns, "run", mask)
+    assert by_run["count"].tolist() == [2] and by_run["mean"][0] == pytest.approx(4.5)
+    assert np.isnan(by_run["mean_latency_seconds"][0])
+
+def test_compare_runs_pairs_articles(store, tmp_path):
+    columns = ResultColumns(tmp_path / "columns.npz")
+    geval(store, {"AAPL": 4, "MSFT": 3})
+    geval(store, {"AAPL": 2, "MSFT": 5}, context_budget=200)
+    columns.sync(store)
+    full, compact = run_name(columns, "geval fake-gpt |"), run_name(columns, "geval fake-gpt ctx 200")
+    result = compare_runs(columns, full, compact, "Coherence")
+    assert result["paired"] == 2
+    assert result["mean_a"] == pytest.approx(3.5) and result["mean_b"] == pytest.approx(3.5)
+    assert result["worse"] == pytest.approx(0.5) and result["better"] == pytest.approx(0.5)
+    assert result["by_group"]["ticker"].tolist() == ["AAPL", "MSFT"]
+    assert result["by_group"]["mean_change"].tolist() == [-2, 2]
+    # Largest drop first
+    assert result["articles"]["ticker"].tolist() == ["AAPL", "MSFT"]
+    assert result["articles"]["change"].tolist() == [-2, 2]
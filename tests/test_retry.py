@@ -0,0 +1,93 @@
+import asyncio
+import time
+import pytest
+import requests
+from aneval.llms.fake_server import FakeLLMServer
+from aneval.llms.retry import RetryPolicy, call_with_retries_async, is_retryable, retry_after_seconds
+
+class RecordingPolicy(RetryPolicy):
+    """Retry policy that records every backoff delay it hands out."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delays = []
+
+    def backoff(self, attempt, retry_after=None):
+        delay = super().backoff(attempt, retry_after)
+        self.delays.append((attempt, retry_after, delay))
+        return delay
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+def post(url):
+    def call():
+        response = requests.post(url, json={"prompt": "hello"}, timeout=10)
+        response.raise_for_status()
+        return response.json()
+    return lambda: asyncio.to_thread(call)
+
+def test_backoff_grows_exponentially_and_is_capped(monkeypatch):
+    # Full jitter draws from [0, cap]; take the top of the range to see the cap itself
+    monkeypatch.setattr("aneval.llms.retry.random.uniform", lambda low, high: high)
+    policy = RetryPolicy(max_attempts=8, base_delay=0.5, max_delay=3.0)
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+def test_backoff_jitter_stays_below_cap():
+    policy = RetryPolicy(max_attempts=8, base_delay=0.5, max_delay=3.0)
+    for attempt in range(1, 6):
+        assert all(0 <= policy.backoff(attempt) <= min(3.0, 0.5 * 2 ** (attempt - 1)) for _ in range(50))
+
+def test_retry_after_is_a_floor_capped_at_max_delay():
+    policy = RetryPolicy(base_delay=0.01, max_delay=5.0)
+    assert policy.backoff(1, retry_after=2.0) >= 2.0
+    assert policy.backoff(1, retry_after=30.0) == 5.0
+
+def test_server_errors_are_retried_until_the_budget_runs_out():
+    policy = RecordingPolicy(max_attempts=3, base_delay=0.01, max_delay=0.05)
+    with FakeLLMServer(rpm=0, latency=0, error_rate=1.0) as server:
+        with pytest.raises(requests.HTTPError) as info:
+            asyncio.run(call_with_retries_async(post(server.url), policy=policy))
+    assert info.value.response.status_code == 500
+    assert server.requests == server.errors == 3
+    # No backoff after the last attempt
+    assert [attempt for attempt, _, _ in policy.delays] == [1, 2]
+
+def test_client_errors_are_not_retried():
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        asyncio.run(call_with_retries_async(fail, policy=RetryPolicy(max_attempts=5, base_delay=0)))
+    assert len(calls) == 1
+    assert not is_retryable(StatusError(401))
+    assert is_retryable(StatusError(503)) and is_retryable(TimeoutError())
+
+def test_throttled_call_waits_for_retry_after():
+    policy = RecordingPolicy(max_attempts=3, base_delay=0.01, max_delay=5.0)
+    # One request per one-second window: the second request is throttled until the window moves on
+    with FakeLLMServer(rpm=60, latency=0, window=1.0) as server:
+        asyncio.run(call_with_retries_async(post(server.url), policy=policy))
+        start = time.monotonic()
+        result = asyncio.run(call_with_retries_async(post(server.url), policy=policy))
+        elapsed = time.monotonic() - start
+    assert result == {"text": "ok"}
+    assert server.throttled == 1
+    (attempt, retry_after, delay), = policy.delays
+    assert attempt == 1 and 0.5 < retry_after <= 1.0
+    assert delay >= retry_after and elapsed >= retry_after
+
+def test_retry_after_headers_are_parsed():
+    with FakeLLMServer(rpm=60, latency=0, window=1.0) as server:
+        requests.post(server.url, timeout=10)
+        response = requests.post(server.url, timeout=10)
+    error = requests.HTTPError(response=response)
+    # retry-after-ms is preferred over the whole-second Retry-After header
+    assert response.status_code == 429
+    assert 0 < retry_after_seconds(error) <= 1.0
+    assert retry_after_seconds(error) != float(response.headers["Retry-After"])
@@ -0,0 +1,104 @@
+import asyncio
+import time
+import pytest
+from aneval.etl.sharded_etl import EtlRun, WorkTable, run_worker_async
+from aneval.llms.cache import ResponseCache
+from aneval.llms.fake import FakeGenerativeModel
+from aneval.llms.gemini import GeminiLLM
+from aneval.models.news_article import NewsArticle
+
+LEASE_SECONDS = 0.2
+
+def article(i):
+    return NewsArticle(title=f"Story {i}", link=f"https://example.com/{i}", ticker="AAPL",
+                       full_text=f"Story {i}: Apple reported record revenue.")
+
+@pytest.fixture
+def table(tmp_path):
+    table = WorkTable(tmp_path / "work.sqlite", lease_seconds=LEASE_SECONDS, max_leases=2)
+    run = EtlRun("run", "Summarize.", "fake-gemini", "news.json", False, None)
+    table.create_run(run, [(f"owner-{i}", article(i)) for i in range(4)], batch_size=2)
+    for worker in ("a", "b"):
+        table.register_worker("run", worker, 0, 1)
+    return table
+
+def expire():
+    time.sleep(LEASE_SECONDS * 1.5)
+
+def llm(latency=0.0):
+    return GeminiLLM(api_key="fake", model_name="fake-gemini", temperature=0.0, cache=ResponseCache(bypass=True),
+                     model=FakeGenerativeModel(latency))
+
+def test_pending_batches_are_claimed_in_order_before_expired_ones(table):
+    first, second = table.claim("run", "a"), table.claim("run", "b")
+    assert (first.batch_id, second.batch_id) == (0, 1)
+    assert [owner for owner, _ in first.articles] == ["owner-0", "owner-1"]
+    # Both batches are leased and neither lease has run out
+    assert table.claim("run", "a") is None
+
+def test_an_expired_lease_is_reclaimed(table):
+    lost = table.claim("run", "a")
+    table.claim("run", "b")
+    expire()
+    reclaimed = table.claim("run", "b")
+    assert reclaimed.batch_id == lost.batch_id and reclaimed.reclaimed_from == "a"
+    assert reclaimed.lease_id != lost.lease_id
+    assert {w["worker"]: w["reclaimed"] for w in table.worker_report("run")} == {"a": 0, "b": 1}
+
+def test_a_lost_lease_can_neither_renew_nor_complete(table):
+    lost = table.claim("run", "a")
+    other = table.claim("run", "b")
+    expire()
+    winner = table.claim("run", "b")
+    assert winner.batch_id == lost.batch_id
+    assert not table.renew(lost)
+    assert not table.complete(lost, [("owner-0", "stale")], 0, 1.0)
+    assert table.results("run") == {}
+    assert table.renew(winner)
+    assert table.complete(winner, [("owner-0", "fresh"), ("owner-1", "fresh")], 0, 1.0)
+    assert table.results("run") == {"owner-0": "fresh", "owner-1": "fresh"}
+    assert table.batch_counts("run") == {"done": 1, "leased": 1}
+    # A lease that ran out but was not taken over can still be renewed
+    assert table.renew(other)
+
+def test_renewal_keeps_the_batch(table):
+    lease = table.claim("run", "a")
+    for _ in range(3):
+        time.sleep(LEASE_SECONDS / 2)
+        assert table.renew(lease)
+    assert table.claim("run", "b").batch_id == 1
+
+def test_a_batch_fails_after_max_leases(table):
+    table.claim("run", "a")
+    expire()
+    table.claim("run", "b")
+    table.claim("run", "a")
+    expire()
+    # Batch 0 had its second lease expire: it is marked failed, and the next claim takes batch 1 again
+    assert table.claim("run", "a").batch_id == 1
+    assert table.batch_counts("run") == {"failed": 1, "leased": 1}
+
+def test_release_gives_the_batch_back(table):
+    lease = table.claim("run", "a")
+    table.release(lease)
+    again = table.claim("run", "b")
+    assert again.batch_id == lease.batch_id and again.reclaimed_from is None
+    assert table._query("SELECT leases FROM etl_batches WHERE batch_id = 0") == [(1,)]
+
+def test_worker_summarizes_every_batch(table):
+    report = asyncio.run(run_worker_async(table, "run", "a", llm(), concurrency=2, poll_seconds=0.05))
+    assert report["batches"] == 2 and report["summarized"] == 4
+    assert table.batch_counts("run") == {"done": 2}
+    assert set(table.results("run")) == {f"owner-{i}" for i in range(4)}
+
+def test_cancelled_worker_releases_its_batch(table):
+    async def cancel_midway():
+        worker = asyncio.create_task(run_worker_async(table, "run", "a", llm(latency=5), concurrency=2))
+        await asyncio.sleep(LEASE_SECONDS)
+        worker.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await worker
+
+    asyncio.run(cancel_midway())
+    assert table.batch_counts("run") == {"pending": 2}
+    assert table._query("SELECT SUM(leases) FROM etl_batches") == [(0,)]